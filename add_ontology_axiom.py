@@ -1,20 +1,31 @@
 from owlready2 import *
 from common import ConceptAssertion, RoleAssertion, TBoxAxiom
-from nl_2_owl import make_concept, special_axiom, make_special_axiom
+from io import BytesIO
+from nl_2_owl import make_concept, special_axiom, make_special_axiom, save_ontology
+from owl_functional import DeltaOntology, FunctionalOntology
 from types import new_class
 
 
-def KB_union_unknown_axiom(axiom):
+def KB_union_unknown_axiom(axiom, ontology, cc_ontology_path=None):
+    """Returns the KB ontology (an OwlDocument, see create_ontology) with the axiom
+    added, as saved by save_ontology. A FunctionalOntology is extended with a
+    DeltaOntology instead, which does not copy it."""
     # The axiom would be a false question if KB U {Axiom} -> Inconsistent KB
+    if isinstance(ontology, FunctionalOntology):
+        return DeltaOntology(ontology, axiom)
+
+    # The classes of the KB concepts keep their names
+    names = ontology.names
+
     # Load the current ontology
-    onto = get_ontology("./ALCQ_ontology.owl").load()
+    onto = get_ontology("http://alcq.org/onto.owl").load(fileobj=BytesIO(ontology))
 
     # Add the "unknown" question axiom to it
     with onto:
         if isinstance(axiom, ConceptAssertion):  # Class Assertion ##
             assertion_concept = axiom.concept
             indName = axiom.individual
-            concept, _ = make_concept(onto, assertion_concept)
+            concept, _ = make_concept(onto, assertion_concept, names)
             ind = Thing(str(indName))
             ind.is_a.append(concept)
         elif isinstance(axiom, RoleAssertion):  # Role Assertion ##
@@ -33,13 +44,15 @@ def KB_union_unknown_axiom(axiom):
         elif isinstance(axiom, TBoxAxiom):
             special_check, special_type = special_axiom(axiom)
             if special_check:
-                make_special_axiom(onto, axiom, special_type)
+                make_special_axiom(onto, axiom, special_type, names)
             else:
-                lhs_concept, _ = make_concept(onto, axiom.LHS_concept)
-                rhs_concept, _ = make_concept(onto, axiom.RHS_concept)
+                lhs_concept, _ = make_concept(onto, axiom.LHS_concept, names)
+                rhs_concept, _ = make_concept(onto, axiom.RHS_concept, names)
                 lhs_concept.is_a.append(rhs_concept)
 
         AllDifferent(list(onto.individuals()))
 
-        onto.save(f"./ALCQCC.owl", "rdfxml")
+        cc_ontology = save_ontology(onto, cc_ontology_path)
         onto.destroy(update_is_a=True, update_relation=True)
+
+    return cc_ontology
@@ -1,34 +1,111 @@
 from abc import ABC
-from nl_utils import pluralize
+from nl_utils import pluralize, memoized_nl
+from weakref import WeakValueDictionary
 import random
 
 
-class Concept(ABC):
-    """Class representing a Concept."""
+def freeze(obj, **fields):
+    """Sets the fields of an immutable object; only to be called from its constructor."""
+    for name, value in fields.items():
+        object.__setattr__(obj, name, value)
 
-    def __init__(self):
-        pass
 
+class Immutable:
+    """Base class for the immutable, slotted DL objects.
+    Subclasses list their constructor arguments in `_fields` and compute their hash once,
+    at construction, into `_hash`. Use `replace` to get a modified copy."""
 
-class AtomicConcept(Concept):
-    """Class representing an Atomic Concept."""
+    __slots__ = ()
+    _fields = ()
 
-    def __init__(self, polarity, concept_name):
-        self.polarity = polarity
-        self.concept_name = concept_name
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable, use replace()")
 
-    def __repr__(self):
-        return f"{self.polarity} {self.concept_name}"
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (type(self), tuple(getattr(self, name) for name in self._fields))
+
+    def replace(self, **changes):
+        """Returns a copy of this object with the given fields replaced."""
+        args = [changes.pop(name, getattr(self, name)) for name in self._fields]
+        if changes:
+            raise TypeError(f"{type(self).__name__} has no fields {list(changes)}")
+        return type(self)(*args)
+
+
+def intern_concept(cls, key, **fields):
+    """Returns the live concept of type cls with the given structural key, creating it with fields if there is none."""
+    concept = cls._interned.get(key)
+    if concept is None:
+        concept = object.__new__(cls)
+        freeze(
+            concept,
+            _negation=None,
+            _canonical=None,
+            _nl=None,
+            _hash=hash(key),
+            **fields,
+        )
+        cls._interned[key] = concept
+    return concept
+
+
+class Concept(Immutable, ABC):
+    """Class representing a Concept.
+    Concepts are hash-consed: constructing a concept structurally equal to a live one returns
+    that same object, so equality is identity. Every concept knows its `size` (number of
+    constructors), nesting `depth` and, once computed by `alcq_negate`, its `negation`.
+    Their canonical forms (see `utils.canonicalize`) and NL renderings are memoized."""
+
+    __slots__ = ("_negation", "_canonical", "_nl", "__weakref__")
 
     def __eq__(self, other):
-        return (
-            isinstance(other, AtomicConcept)
-            and self.polarity == other.polarity
-            and self.concept_name == other.concept_name
+        return self is other
+
+    __hash__ = Immutable.__hash__
+
+    @property
+    def negation(self):
+        """The negation of this concept, or None if it has not been computed yet."""
+        return self._negation
+
+    def link_negation(self, negation, involution=True):
+        """Records that negation is the negation of this concept and, if involution,
+        that this concept is the negation of negation."""
+        object.__setattr__(self, "_negation", negation)
+        if involution:
+            object.__setattr__(negation, "_negation", self)
+
+    def link_canonical(self, canonical):
+        """Records canonical as the canonical form of this concept, and of itself."""
+        object.__setattr__(self, "_canonical", canonical)
+        object.__setattr__(canonical, "_canonical", canonical)
+
+
+class AtomicConcept(Concept):
+    """Class representing an Atomic Concept."""
+
+    __slots__ = ("polarity", "concept_name", "size", "depth", "_hash")
+    _fields = ("polarity", "concept_name")
+    _interned = WeakValueDictionary()
+
+    def __new__(cls, polarity, concept_name):
+        return intern_concept(
+            cls,
+            (polarity, concept_name),
+            polarity=polarity,
+            concept_name=concept_name,
+            size=1,
+            depth=0,
         )
 
-    def __hash__(self):
-        return hash((self.polarity, self.concept_name))
+    def __repr__(self):
+        return f"{self.polarity} {self.concept_name}"
 
     @classmethod
     def from_json(cls, json_dict):
@@ -47,6 +124,7 @@ class AtomicConcept(Concept):
             "concept_name": self.concept_name,
         }
 
+    @memoized_nl
     def nl(self):
         concept_nl = self.concept_name
         polarity = self.polarity
@@ -67,32 +145,54 @@ class AtomicConcept(Concept):
 
 
 class JunctionConcept(Concept):
-    """Class representing a con-junction or a dis-junction of two concepts."""
-
-    def __init__(
-        self, lhs_concept, relationship, rhs_concept, atomic_in_lhs, atomic_in_rhs
+    """Class representing a con-junction or a dis-junction of two concepts.
+    Whether each side contains an atomic concept is derived from the operands; the
+    atomic_in_lhs/atomic_in_rhs arguments are accepted for compatibility and ignored."""
+
+    __slots__ = (
+        "lhs_concept",
+        "relationship",
+        "rhs_concept",
+        "atomic_in_lhs",
+        "atomic_in_rhs",
+        "has_atomic",
+        "size",
+        "depth",
+        "_hash",
+    )
+    _fields = ("lhs_concept", "relationship", "rhs_concept")
+    _interned = WeakValueDictionary()
+
+    def __new__(
+        cls,
+        lhs_concept,
+        relationship,
+        rhs_concept,
+        atomic_in_lhs=None,
+        atomic_in_rhs=None,
     ):
-        self.lhs_concept = lhs_concept
-        self.relationship = relationship
-        self.rhs_concept = rhs_concept
-        self.atomic_in_lhs = atomic_in_lhs
-        self.atomic_in_rhs = atomic_in_rhs
-        self.has_atomic = self.atomic_in_lhs or self.atomic_in_rhs
+        atomic_in_lhs = isinstance(lhs_concept, AtomicConcept) or (
+            isinstance(lhs_concept, JunctionConcept) and lhs_concept.has_atomic
+        )
+        atomic_in_rhs = isinstance(rhs_concept, AtomicConcept) or (
+            isinstance(rhs_concept, JunctionConcept) and rhs_concept.has_atomic
+        )
+        return intern_concept(
+            cls,
+            (lhs_concept, relationship, rhs_concept),
+            lhs_concept=lhs_concept,
+            relationship=relationship,
+            rhs_concept=rhs_concept,
+            atomic_in_lhs=atomic_in_lhs,
+            atomic_in_rhs=atomic_in_rhs,
+            has_atomic=atomic_in_lhs or atomic_in_rhs,
+            size=lhs_concept.size + rhs_concept.size + 1,
+            depth=max(lhs_concept.depth, rhs_concept.depth) + 1,
+        )
 
     def __repr__(self):
         return f"( {self.lhs_concept} ) {self.relationship} ( {self.rhs_concept} )"
 
-    def __eq__(self, other):
-        return (
-            isinstance(other, JunctionConcept)
-            and self.lhs_concept == other.lhs_concept
-            and self.relationship == other.relationship
-            and self.rhs_concept == other.rhs_concept
-        )
-
-    def __hash__(self):
-        return hash((self.lhs_concept, self.relationship, self.rhs_concept))
-
     @classmethod
     def from_json(cls, json_dict):
         json_class = json_dict.get("json_class")
@@ -118,6 +218,7 @@ class JunctionConcept(Concept):
         else:
             return f"{LHS_nl} {connective} {pronoun}{RHS_nl}"
 
+    @memoized_nl
     def nl(self, pronoun=""):
         LHS_nl = self.lhs_concept.nl()
         RHS_nl = (
@@ -158,25 +259,24 @@ class RestrictionConcept(Concept):
     where R: Role and C: Concept.
     """
 
-    def __init__(self, restriction, role_name, concept):
-        self.restriction = restriction
-        self.role_name = role_name
-        self.concept = concept
+    __slots__ = ("restriction", "role_name", "concept", "size", "depth", "_hash")
+    _fields = ("restriction", "role_name", "concept")
+    _interned = WeakValueDictionary()
+
+    def __new__(cls, restriction, role_name, concept):
+        return intern_concept(
+            cls,
+            (restriction, role_name, concept),
+            restriction=restriction,
+            role_name=role_name,
+            concept=concept,
+            size=concept.size + 1,
+            depth=concept.depth + 1,
+        )
 
     def __repr__(self):
         return f"{self.restriction} {self.role_name} . ( {self.concept} )"
 
-    def __eq__(self, other):
-        return (
-            isinstance(other, RestrictionConcept)
-            and self.restriction == other.restriction
-            and self.role_name == other.role_name
-            and self.concept == other.concept
-        )
-
-    def __hash__(self):
-        return hash((self.restriction, self.role_name, self.concept))
-
     @classmethod
     def from_json(cls, json_dict):
         json_class = json_dict.get("json_class")
@@ -196,6 +296,7 @@ class RestrictionConcept(Concept):
             "concept": self.concept.to_json(),
         }
 
+    @memoized_nl
     def nl(self):
         restr_concept_nl = str()
         restriction = self.restriction.split()
@@ -272,25 +373,34 @@ class RestrictionConcept(Concept):
         return restr_concept_nl
 
 
-class ConceptAssertion:
+class ConceptAssertion(Immutable):
     """Class representing a Concept Assertion"""
 
+    __slots__ = ("concept", "individual", "size", "depth", "_hash")
+    _fields = ("concept", "individual")
+
     def __init__(self, concept, individual):
-        self.concept = concept
-        self.individual = individual
+        freeze(
+            self,
+            concept=concept,
+            individual=individual,
+            size=concept.size,
+            depth=concept.depth,
+            _hash=hash((concept, individual)),
+        )
 
     def __repr__(self):
         return f"( {self.concept} ) ( {self.individual} )"
 
     def __eq__(self, other):
-        return (
+        return self is other or (
             isinstance(other, ConceptAssertion)
-            and self.concept == other.concept
+            and self._hash == other._hash
             and self.individual == other.individual
+            and self.concept == other.concept
         )
 
-    def __hash__(self):
-        return hash((self.concept, self.individual))
+    __hash__ = Immutable.__hash__
 
     @classmethod
     def from_json(cls, json_dict):
@@ -325,27 +435,36 @@ class ConceptAssertion:
         return assertion_nl
 
 
-class RoleAssertion:
+class RoleAssertion(Immutable):
     """Class representing a Role Assertion"""
 
+    __slots__ = ("RoleName", "Individual_l", "Individual_r", "size", "depth", "_hash")
+    _fields = ("RoleName", "Individual_l", "Individual_r")
+
     def __init__(self, RoleName, Individual_l, Individual_r):
-        self.RoleName = RoleName
-        self.Individual_l = Individual_l
-        self.Individual_r = Individual_r
+        freeze(
+            self,
+            RoleName=RoleName,
+            Individual_l=Individual_l,
+            Individual_r=Individual_r,
+            size=1,
+            depth=0,
+            _hash=hash((RoleName, Individual_l, Individual_r)),
+        )
 
     def __repr__(self):
         return f"{self.RoleName} ( {self.Individual_l} , {self.Individual_r} )"
 
     def __eq__(self, other):
-        return (
+        return self is other or (
             isinstance(other, RoleAssertion)
+            and self._hash == other._hash
             and self.RoleName == other.RoleName
             and self.Individual_l == other.Individual_l
             and self.Individual_r == other.Individual_r
         )
 
-    def __hash__(self):
-        return hash((self.RoleName, self.Individual_l, self.Individual_r))
+    __hash__ = Immutable.__hash__
 
     @classmethod
     def from_json(cls, json_dict):
@@ -372,27 +491,45 @@ class RoleAssertion:
         )
 
 
-class TBoxAxiom:
+class TBoxAxiom(Immutable):
     """Class representing a TBox Axiom (Subsumption or Equivalence)."""
 
+    __slots__ = (
+        "LHS_concept",
+        "Relationship",
+        "RHS_concept",
+        "size",
+        "depth",
+        "_hash",
+        "_nl_variants",
+    )
+    _fields = ("LHS_concept", "Relationship", "RHS_concept")
+
     def __init__(self, LHS_concept, Relationship, RHS_concept):
-        self.LHS_concept = LHS_concept
-        self.Relationship = Relationship
-        self.RHS_concept = RHS_concept
+        freeze(
+            self,
+            LHS_concept=LHS_concept,
+            Relationship=Relationship,
+            RHS_concept=RHS_concept,
+            size=LHS_concept.size + RHS_concept.size,
+            depth=max(LHS_concept.depth, RHS_concept.depth),
+            _hash=hash((LHS_concept, Relationship, RHS_concept)),
+            _nl_variants=None,
+        )
 
     def __repr__(self):
         return f"{self.LHS_concept} {self.Relationship} {self.RHS_concept}"
 
     def __eq__(self, other):
-        return (
+        return self is other or (
             isinstance(other, TBoxAxiom)
-            and self.LHS_concept == other.LHS_concept
+            and self._hash == other._hash
             and self.Relationship == other.Relationship
+            and self.LHS_concept == other.LHS_concept
             and self.RHS_concept == other.RHS_concept
         )
 
-    def __hash__(self):
-        return hash((self.LHS_concept, self.Relationship, self.RHS_concept))
+    __hash__ = Immutable.__hash__
 
     @classmethod
     def from_json(cls, json_dict):
@@ -530,13 +667,31 @@ class TBoxAxiom:
         return f"If {LHS_representation}, then {RHS_representation}"
 
     def nl(self):
+        """Renders one of the three NL templates of the axiom, chosen at random.
+        Each template is rendered once and cached on the axiom."""
+        variants = self._nl_variants
+        if variants is None:
+            variants = [None] * 3
+            object.__setattr__(self, "_nl_variants", variants)
+
+        # The special axiom has a single template, so no choice is drawn for it
+        if self.is_special_axiom():
+            choice = 0
+        else:
+            choice = random.randrange(0, 3)  # 0.33 probability for each template
+
+        axiom_nl = variants[choice]
+        if axiom_nl is None:
+            axiom_nl = variants[choice] = self.render_nl(choice)
+        return axiom_nl
+
+    def render_nl(self, choice):
         LHS_representation = str()
         RHS_representation = str()
 
         if self.is_special_axiom():
             return self.handle_special_axiom()
 
-        choice = random.randrange(0, 3)  # 0.33 probability for each template
         if (choice == 1 or choice == 2) and (
             isinstance(self.LHS_concept, AtomicConcept)
             or isinstance(self.RHS_concept, AtomicConcept)
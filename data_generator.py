@@ -1,29 +1,42 @@
 import signal
 from argparse import ArgumentParser
+from asyncio import FIRST_COMPLETED, Queue, create_task, gather, sleep, wait
+from asyncio import run as run_async
+from collections import deque
+from contextlib import closing, ExitStack
+from functools import partial
+from itertools import count
 from json import load, dump
-from subprocess import Popen, PIPE, TimeoutExpired
-from os import setsid, killpg, remove
-from signal import SIGTERM
-from random import choice, randint
+from multiprocessing import get_context
+from multiprocessing.util import Finalize
+from numpy.random import SeedSequence
+from os import urandom
+from time import monotonic
+from random import randint, shuffle
 from tqdm.auto import tqdm
 from nltk import PCFG
-from owl_2_nl import get_inferred_axioms_with_explanations
+from owl_2_nl import get_explained_axioms, get_inferred_axioms
 from utils import *
 from common import *
 from nl_2_owl import create_ontology
+from owl_functional import FunctionalOntology
+from owl_names import ClassNames
+from kb_builder import KBBuilder
+from nl_utils import set_grammar_role_names
+from reasoner import (
+    DEFAULT_REASONER,
+    AsyncReasoner,
+    OneShotReasoner,
+    ReasonerTimeout,
+    ReasonerError,
+    make_reasoner,
+    run_requests,
+    run_requests_async,
+)
 from grammar_utils import *
 from question_generation import *
 from global_variables import *
-
-
-def extend_with_all_conjunction_sides(concept):
-    if isinstance(concept, AtomicConcept) and concept.concept_name == "⊤":
-        return set()
-    if isinstance(concept, JunctionConcept) and concept.relationship == "⊓":
-        LHS_set = extend_with_all_conjunction_sides(concept.lhs_concept)
-        RHS_set = extend_with_all_conjunction_sides(concept.rhs_concept)
-        return LHS_set.union(RHS_set)
-    return {concept}
+import global_variables
 
 
 def handler(signum, frame):
@@ -31,12 +44,8 @@ def handler(signum, frame):
 
 
 def example_is_valid(context, questions):
-    for x in context:
-        if isinstance(x, ConceptAssertion):
-            neg_x = Concept(x.individual, alcq_negate(x.concept))
-            if neg_x in context:
-                return False
-
+    # Contradicting assertions are already rejected while generating the KB
+    context = set(context)
     for question in questions:
         if (
             question["label"] == "True"
@@ -53,85 +62,39 @@ def example_is_valid(context, questions):
     return True
 
 
-def handle_abox_assertion_case(
-    generated_statement,
-    generated_abox,
-    generated_role_names,
-    generated_abox_concepts,
-    generated_statements,
-    context2NL,
-):
-    generated_abox_assertion = parse_abox_assertion(generated_statement)
-    concept_assertion_constraint_satisfied = True
-
-    if isinstance(generated_abox_assertion, ConceptAssertion):
-        concept_assertion_constraint_satisfied = concept_assertion_constrain_check(
-            generated_abox_assertion, generated_abox
-        )
-        if concept_assertion_constraint_satisfied:
-            generated_abox.add(generated_abox_assertion)
-            generated_abox_concepts.add(generated_abox_assertion.concept)
-            generated_statements.add(generated_statement)
-            context2NL[generated_abox_assertion] = generated_abox_assertion.nl()
-            generated_abox_concepts.update(
-                extend_with_all_conjunction_sides(
-                    generated_abox_assertion.concept,
-                )
-            )
-            return True
-    else:  # RoleAssertion
-        generated_abox.add(generated_abox_assertion)
-        generated_role_names.add(generated_abox_assertion.RoleName)
-        generated_statements.add(generated_statement)
-        context2NL[generated_abox_assertion] = generated_abox_assertion.nl()
-        return True
-
-    return False
+def handle_abox_assertion_case(generated_abox_assertion, kb):
+    if generated_abox_assertion in kb:
+        return False
 
+    if isinstance(
+        generated_abox_assertion, ConceptAssertion
+    ) and not concept_assertion_constrain_check(
+        generated_abox_assertion, kb.negated_concepts
+    ):
+        return False
 
-def handle_tbox_axiom_case(
-    generated_statement,
-    generated_abox_concepts,
-    generated_tbox,
-    lhs_pool,
-    generated_statements,
-    context2NL,
-):
-    generated_tbox_axiom = parse_tbox_axiom(generated_statement)
+    kb.add_abox_assertion(generated_abox_assertion)
+    return True
 
-    if len(lhs_pool) == 0:
-        generated_tbox_axiom.LHS_concept = choice(list(generated_abox_concepts))
-    else:  # The LHS will be sampled from the lhs_pool #
-        generated_tbox_axiom.LHS_concept = choice(tuple(lhs_pool))
 
-    tbox_axiom_constraint_satisfied = tbox_axiom_constrain_check(
-        generated_tbox_axiom, generated_tbox
+def handle_tbox_axiom_case(generated_tbox_axiom, kb):
+    # The LHS is sampled from the TBox RHS concepts, or from the ABox concepts #
+    generated_tbox_axiom = generated_tbox_axiom.replace(
+        LHS_concept=kb.sample_lhs_concept()
     )
 
-    if tbox_axiom_constraint_satisfied:
-        generated_tbox.add(generated_tbox_axiom)
-        generated_statements.add(generated_statement)
-        context2NL[generated_tbox_axiom] = generated_tbox_axiom.nl()
-        lhs_pool.update(
-            extend_with_all_conjunction_sides(generated_tbox_axiom.RHS_concept)
-        )
-        lhs_pool.add(generated_tbox_axiom.RHS_concept)
-        return True
-    else:
+    if generated_tbox_axiom in kb:
         return False
 
+    if not tbox_axiom_constrain_check(generated_tbox_axiom, kb.subsumption_graph):
+        return False
 
-def generate_KB(
-    statement_types,
-    grammar,
-    generated_statements,
-    generated_abox,
-    generated_abox_concepts,
-    generated_role_names,
-    generated_tbox,
-    lhs_pool,
-    context2NL,
-):
+    kb.add_tbox_axiom(generated_tbox_axiom)
+    return True
+
+
+def generate_KB(statement_types, grammar, kb):
+    """Generates the statements of a KB into kb, a KBBuilder."""
     for statement_type in statement_types:
         start_symbol = statement_type["start_symbol"]
         num_statements_range = statement_type["num_statements_range"]
@@ -145,53 +108,41 @@ def generate_KB(
             if num_generation_attempts == max_generation_attempts:
                 break
 
-            # Generate random statement for current start_symbol
-            generated_statement = generate_random_statement(grammar, start_symbol)
+            # Draw a pre-sampled random statement for current start_symbol
+            _, generated_axiom = grammar.pool(start_symbol).pop()
 
-            if generated_statement in generated_statements:
-                num_generation_attempts += 1
-            else:
-                if start_symbol == "TBoxAxiom":
-                    if len(generated_abox_concepts) == 0:
-                        break
-                    if handle_tbox_axiom_case(
-                        generated_statement,
-                        generated_abox_concepts,
-                        generated_tbox,
-                        lhs_pool,
-                        generated_statements,
-                        context2NL,
-                    ):
-                        num_generated_statements += 1
-                        num_generation_attempts = 0
-                    else:
-                        num_generation_attempts += 1
-
-                elif start_symbol == "ABoxAssertion":
-                    if handle_abox_assertion_case(
-                        generated_statement,
-                        generated_abox,
-                        generated_role_names,
-                        generated_abox_concepts,
-                        generated_statements,
-                        context2NL,
-                    ):
-                        num_generated_statements += 1
-                        num_generation_attempts = 0
-                    else:
-                        num_generation_attempts += 1
+            # Semantic duplicates are rejected by the handlers, on canonical keys
+            if start_symbol == "TBoxAxiom":
+                if len(kb.abox_concepts) == 0:
+                    break
+                if handle_tbox_axiom_case(generated_axiom, kb):
+                    num_generated_statements += 1
+                    num_generation_attempts = 0
+                else:
+                    num_generation_attempts += 1
 
+            elif start_symbol == "ABoxAssertion":
+                if handle_abox_assertion_case(generated_axiom, kb):
+                    num_generated_statements += 1
+                    num_generation_attempts = 0
+                else:
+                    num_generation_attempts += 1
 
-def process_ontology_and_inferred_axioms(
-    example_id, generated_abox, generated_tbox, context2NL, all2NL, max_depth
-):
+
+def build_ontology(example_id, generated_abox, generated_tbox):
+    """Returns the KB ontology, built with the ONTOLOGY_BACKEND, or None: its OWL
+    document (see create_ontology), or a FunctionalOntology. Either way its classes
+    are named by a ClassNames table of the KB."""
     try:
         # Set up the signal handler
         signal.signal(signal.SIGALRM, handler)
         signal.alarm(2)  # Set a 1-second timeout
-        if create_ontology(example_id, generated_abox, generated_tbox) == False:
-            print("Couldn't create ontology.")
-            return None, None
+        if global_variables.ONTOLOGY_BACKEND == "direct":
+            ontology = FunctionalOntology(generated_abox, generated_tbox)
+        else:
+            ontology = create_ontology(
+                example_id, generated_abox, generated_tbox, names=ClassNames()
+            )
         # Disable the signal alarm
         signal.alarm(0)
     except Exception as ex:
@@ -201,45 +152,191 @@ def process_ontology_and_inferred_axioms(
         print(f"Owlready exception: {ex}")
         print(generated_abox)
         print(generated_tbox)
-        return None, None
+        return None
+    return ontology
 
-    owlapi_output = str()
-    with Popen(
-        ["java", "-jar", "./Explainer.jar"],
-        stdout=PIPE,
-        universal_newlines=True,
-        preexec_fn=setsid,
-    ) as process:
-        try:
-            owlapi_output = process.communicate(timeout=4.5)[0]
-        except TimeoutExpired:
-            # print("Timeout in Explainer!")
-            killpg(process.pid, SIGTERM)
-            return None, None
 
-    if INCONSISTENCY_MSG in owlapi_output or INCOHERENCE_MSG in owlapi_output:
-        return None, None
+class InferredAxiomsSearch:
+    """
+    Builds the theory of the KB and its useful inferred axioms from the Explainer
+    --infer output of the KB ontology, leaving the explanations to its caller. The
+    depth of an inferred axiom is only known once it is explained, so next_batch
+    returns batches of the inferred axioms (their owl text) in random order, and
+    add_explanation takes the explanations of the Explainer as they arrive, until
+    the explained axioms cover every depth up to max_depth. The classes are decoded
+    with names, the ClassNames table of the KB ontology.
+    """
 
-    theory = Theory(
-        list(generated_abox),
-        list(generated_tbox),
-        list(context2NL.values()) + ["All individuals are different from each other."],
-    )
+    def __init__(
+        self,
+        owlapi_output,
+        generated_abox,
+        generated_tbox,
+        context2NL,
+        known_statement_keys,
+        max_depth,
+        names,
+    ):
+        self.known_statement_keys = known_statement_keys
+        self.names = names
+        self.max_depth = max_depth
+        self.theory = None
+        self.candidates = list()
+        self.explained_axioms = list()
+        self.useful_inferred_axioms = None
+        self.covered = False
+        self.batch_size = EXPLANATION_OVERSAMPLING * (max_depth + 1)
+
+        if INCONSISTENCY_MSG in owlapi_output or INCOHERENCE_MSG in owlapi_output:
+            return
+
+        inferred_axioms = get_inferred_axioms(
+            owlapi_output, known_statement_keys, names
+        )
 
-    inferred_axioms = get_inferred_axioms_with_explanations(owlapi_output, all2NL)
+        if inferred_axioms == None:
+            return
 
-    if inferred_axioms == None:
-        # print("No inferred axioms!")
+        self.theory = Theory(
+            list(generated_abox),
+            list(generated_tbox),
+            list(context2NL.values())
+            + ["All individuals are different from each other."],
+        )
+        # Only the inferred axioms that can be questions at some depth are explained
+        self.candidates = [
+            axiom_owl
+            for axiom, axiom_owl in inferred_axioms
+            if is_valid_axiom(axiom, 1, max_depth)
+        ]
+        shuffle(self.candidates)
+
+    @property
+    def done(self):
+        return self.theory == None or self.covered or not self.candidates
+
+    def next_batch(self):
+        batch = self.candidates[: self.batch_size]
+        del self.candidates[: self.batch_size]
+        return batch
+
+    def add_explanation(self, owlapi_output):
+        """Decodes explanations of the Explainer output (any number of complete
+        blocks). Returns whether the search is done."""
+        explained = get_explained_axioms(
+            owlapi_output, self.known_statement_keys, self.names
+        )
+        if explained == None:
+            self.theory = None
+            return True
+        if explained:
+            self.explained_axioms.extend(explained)
+            # Keep only useful inferred axiom instances from all that are explained
+            self.useful_inferred_axioms = inferred_axioms_constrain_check(
+                self.explained_axioms, self.max_depth
+            )
+            self.covered = self.useful_inferred_axioms != None and covers_depths(
+                self.theory, self.useful_inferred_axioms, self.max_depth
+            )
+        return self.covered
+
+    def result(self):
+        """The theory of the KB and its useful inferred axioms, from the
+        explanations so far."""
+        if self.theory == None:
+            return None, None
+        if self.useful_inferred_axioms == None:  # no inferred axiom reached max depth
+            # print("No useful inferred!")
+            return self.theory, None
+        return self.theory, self.useful_inferred_axioms
+
+
+def search_inferred_axioms(
+    ontology,
+    generated_abox,
+    generated_tbox,
+    context2NL,
+    known_statement_keys,
+    max_depth,
+):
+    """Generator behind process_ontology_and_inferred_axioms, leaving the reasoner
+    requests to run_requests: it requests the inferred axioms of the KB ontology and
+    the explanations of those InferredAxiomsSearch selects, all within the
+    explanation timeout. Returns the theory and the useful inferred axioms."""
+    deadline = monotonic() + EXPLANATION_TIMEOUT
+    try:
+        owlapi_output = yield "infer", ontology, EXPLANATION_TIMEOUT
+        search = InferredAxiomsSearch(
+            owlapi_output,
+            generated_abox,
+            generated_tbox,
+            context2NL,
+            known_statement_keys,
+            max_depth,
+            ontology.names,
+        )
+        while not search.done and monotonic() < deadline:
+            yield (
+                "explain_entailments",
+                ontology,
+                search.next_batch(),
+                deadline - monotonic(),
+                search.add_explanation,
+            )
+    except (ReasonerTimeout, ReasonerError):
+        # print("Timeout in Explainer!")
         return None, None
 
-    # Keep only useful inferred axiom instances from all that owlapi has produced
-    useful_inferred_axioms = inferred_axioms_constrain_check(inferred_axioms, max_depth)
+    return search.result()
+
+
+def process_ontology_and_inferred_axioms(
+    ontology,
+    generated_abox,
+    generated_tbox,
+    context2NL,
+    known_statement_keys,
+    max_depth,
+    reasoner=DEFAULT_REASONER,
+):
+    """Infers the axioms of the KB ontology and explains those InferredAxiomsSearch
+    selects, all within the explanation timeout. The explanations are decoded as
+    they arrive, and those received before the timeout are kept."""
+    return run_requests(
+        search_inferred_axioms(
+            ontology,
+            generated_abox,
+            generated_tbox,
+            context2NL,
+            known_statement_keys,
+            max_depth,
+        ),
+        reasoner,
+    )
 
-    if useful_inferred_axioms == None:  # no inferred axiom reached the max depth
-        # print("No useful inferred!")
-        return theory, None
 
-    return theory, useful_inferred_axioms
+async def process_ontology_and_inferred_axioms_async(
+    ontology,
+    generated_abox,
+    generated_tbox,
+    context2NL,
+    known_statement_keys,
+    max_depth,
+    async_reasoner,
+):
+    """Same as process_ontology_and_inferred_axioms, awaiting the requests of an
+    AsyncReasoner."""
+    return await run_requests_async(
+        search_inferred_axioms(
+            ontology,
+            generated_abox,
+            generated_tbox,
+            context2NL,
+            known_statement_keys,
+            max_depth,
+        ),
+        async_reasoner,
+    )
 
 
 def prepare_pools(theory):
@@ -310,7 +407,9 @@ def generate_example_questions(
     max_depth,
     grammar,
     context2NL,
-    all2NL,
+    known_statement_keys,
+    ontology,
+    reasoner=DEFAULT_REASONER,
 ):
     concept_assertions, lookup_questions_pool = prepare_pools(theory)
 
@@ -327,13 +426,40 @@ def generate_example_questions(
     qID = 2 * (max_depth + 1) + 1
     n_unknown_questions = max_depth + 1
     unknown_questions = generate_unknown_questions(
-        qID, n_unknown_questions, grammar, all2NL
+        qID, n_unknown_questions, grammar, known_statement_keys, ontology, reasoner
     )
 
     if unknown_questions is None:
         # print("No unknown questions!")
         return None
 
+    return assemble_example(
+        example_id,
+        example_id_prefix,
+        theory,
+        useful_inferred,
+        max_depth,
+        context2NL,
+        unknown_questions,
+        concept_assertions,
+        lookup_questions_pool,
+    )
+
+
+def assemble_example(
+    example_id,
+    example_id_prefix,
+    theory,
+    useful_inferred,
+    max_depth,
+    context2NL,
+    unknown_questions,
+    concept_assertions,
+    lookup_questions_pool,
+):
+    """Adds the True and False questions to the unknown ones and builds the example.
+    concept_assertions and lookup_questions_pool are the pools of the theory (see
+    prepare_pools)."""
     questions = generate_true_false_questions(
         lookup_questions_pool,
         useful_inferred,
@@ -375,35 +501,36 @@ def generate_example_questions(
 
 
 def generate_random_example(
-    example_id, example_id_prefix, grammar, statement_types, max_depth
+    example_id,
+    example_id_prefix,
+    grammar,
+    statement_types,
+    max_depth,
+    reasoner=DEFAULT_REASONER,
 ):
     example = None
 
-    generated_statements = set()
-    generated_abox = set()
-    generated_abox_concepts = set()
-    generated_role_names = set()
-    generated_tbox = set()
-    lhs_pool = set()
+    kb = KBBuilder()
+    generate_KB(statement_types, grammar, kb)
+    context2NL = kb.context2NL  # maps a concept statement to its NL representation
 
-    context2NL = dict()  # maps a concept statement to its NL representation
-    generate_KB(
-        statement_types,
-        grammar,
-        generated_statements,
-        generated_abox,
-        generated_abox_concepts,
-        generated_role_names,
-        generated_tbox,
-        lhs_pool,
-        context2NL,
-    )
+    # Canonical keys of all the known statements (context, inferred axioms), which
+    # the Unknown questions must not be
+    known_statement_keys = set(kb.statement_keys)
 
-    # Shallow copy! Will contain all KB sentences to NL (context, inferred axioms)
-    all2NL = context2NL.copy()
+    # The KB ontology is kept in memory for the explanation and consistency checks
+    ontology = build_ontology(example_id, kb.abox, kb.tbox)
+    if ontology is None:
+        return None
 
     theory, useful_inferred = process_ontology_and_inferred_axioms(
-        example_id, generated_abox, generated_tbox, context2NL, all2NL, max_depth
+        ontology,
+        kb.abox,
+        kb.tbox,
+        context2NL,
+        known_statement_keys,
+        max_depth,
+        reasoner,
     )
 
     if theory == None or (useful_inferred == None and max_depth > 0):
@@ -417,7 +544,9 @@ def generate_random_example(
         max_depth,
         grammar,
         context2NL,
-        all2NL,
+        known_statement_keys,
+        ontology,
+        reasoner,
     )
 
     return example
@@ -441,74 +570,347 @@ def count_question_types(example):
     return concept_assertion_questions, role_assertion_questions, tbox_axiom_questions
 
 
-def generate_theory(grammar, config, theory_op_file, num_of_examples, max_depth):
+class ExampleWriter:
+    """Writes the generated examples to the output file, numbering them in the order
+    they are written, and keeps the question statistics."""
+
+    def __init__(self, theory_op_file, num_of_examples, example_id_prefix):
+        self.theory_op_file = theory_op_file
+        self.num_of_examples = num_of_examples
+        self.example_id_prefix = example_id_prefix
+        self.curr_num_examples = 0
+        self.num_true_questions = 0
+        self.num_false_questions = 0
+        self.num_unknown_questions = 0
+        self.total_concept_assertion_uestions = 0
+        self.total_role_assertion_questions = 0
+        self.total_tbox_axiom_questions = 0
+        self.progress_tracker = tqdm(total=num_of_examples)
+        self.progress_tracker.set_description(desc="Generating Examples...")
+
+    @property
+    def done(self):
+        return self.curr_num_examples == self.num_of_examples
+
+    def write(self, example):
+        self.curr_num_examples += 1
+        example.id = format_example_id(self.curr_num_examples, self.example_id_prefix)
+
+        for q in example.theory_assertion_instance.questions:
+            if q["label"] == "True":
+                self.num_true_questions += 1
+            elif q["label"] == "False":
+                self.num_false_questions += 1
+            else:
+                self.num_unknown_questions += 1
+
+        (
+            concept_assertion_uestions,
+            role_assertion_questions,
+            tbox_axiom_questions,
+        ) = count_question_types(example)
+
+        self.total_concept_assertion_uestions += concept_assertion_uestions
+        self.total_role_assertion_questions += role_assertion_questions
+        self.total_tbox_axiom_questions += tbox_axiom_questions
+        dump(example.to_json(), self.theory_op_file, ensure_ascii=False)
+        self.theory_op_file.write("\n")
+
+        self.progress_tracker.update()
+
+    def close(self):
+        self.progress_tracker.close()
+
+        print(f"Generated {self.curr_num_examples} examples.")
+        print(f"  No. of True questions: {self.num_true_questions}")
+        print(f"  No. of False questions: {self.num_false_questions}")
+        print(f"  No. of Unknown questions: {self.num_unknown_questions}")
+        print(
+            f"  No. of Class Assertion questions: {self.total_concept_assertion_uestions}"
+        )
+        print(
+            f"  No. of Role Assertion questions: {self.total_role_assertion_questions}"
+        )
+        print(f"  No. of TBox Axiom questions: {self.total_tbox_axiom_questions}")
+
+
+def attempt_seed(master_seed, attempt):
+    """Seed of one example generation attempt, derived from the master seed so that
+    each attempt is reproducible whichever process runs it."""
+    return int(SeedSequence([master_seed, attempt]).generate_state(1)[0])
+
+
+def generate_example_attempt(
+    attempt,
+    master_seed,
+    example_id_prefix,
+    grammar,
+    statement_types,
+    max_depth,
+    reasoner,
+):
+    """Runs one generation attempt on its own seed. Returns the example, or None."""
+    seed = attempt_seed(master_seed, attempt)
+    random.seed(seed)
+    grammar.reseed(seed)
+
+    return generate_random_example(
+        attempt + 1,  # The final ID is assigned by the writer
+        example_id_prefix,
+        grammar,
+        statement_types,
+        max_depth,
+        reasoner,
+    )
+
+
+worker_state = dict()  # set in every worker process by init_worker
+
+
+def init_worker(
+    pcfg, reasoner_factory, role_names, verify_parser, ontology_backend, attempt_args
+):
+    """Sets up a worker process, with its own sampler and reasoner."""
+    set_grammar_role_names(role_names)
+    global_variables.VERIFY_PARSER = verify_parser
+    global_variables.ONTOLOGY_BACKEND = ontology_backend
+
+    reasoner = reasoner_factory()
+    Finalize(None, reasoner.close, exitpriority=10)
+
+    master_seed, example_id_prefix, statement_types, max_depth = attempt_args
+    worker_state["attempt_args"] = (
+        master_seed,
+        example_id_prefix,
+        PCFGSampler(pcfg),
+        statement_types,
+        max_depth,
+        reasoner,
+    )
+
+
+def run_worker_attempt(attempt):
+    return generate_example_attempt(attempt, *worker_state["attempt_args"])
+
+
+def parallel_attempts(pool, window):
+    """Yields the results of attempts 0, 1, 2, ... run on the pool, in attempt order,
+    keeping at most window attempts in flight."""
+    pending = deque()
+    attempts = count()
+    while True:
+        while len(pending) < window:
+            pending.append(pool.apply_async(run_worker_attempt, (next(attempts),)))
+        yield pending.popleft().get()
+
+
+def generate_theory(
+    grammar,
+    config,
+    theory_op_file,
+    num_of_examples,
+    max_depth,
+    reasoner_factory=OneShotReasoner,
+    seed=None,
+    workers=1,
+):
     """
     Generate a theory with specified properties per config file specifications,
     using the specified grammar.
     Arguments:
     theory_op_file: Output jsonl file containing the generated examples.
+    reasoner_factory: Creates the reasoner (see reasoner.py) of each generating process.
+    seed: Master seed. Attempt k always runs on the seed derived from (seed, k) and
+        the examples are written in attempt order, so the output is the same for the
+        same seed and number of workers, as long as no reasoner timeout is hit (the
+        explanation and Unknown-check budgets are wall-clock, so they depend on load).
+    workers: Number of processes generating examples.
     """
 
     statement_types = config["theory"]["statement_types_per_example"]
     example_id_prefix = config.get("example_id_prefix", "")
 
-    # Generate examples for every required type of statement (Start Symbol type)
-    num_true_questions = 0
-    num_false_questions = 0
-    num_unknown_questions = 0
-    curr_num_examples = 0
-    total_concept_assertion_uestions = 0
-    total_role_assertion_questions = 0
-    total_tbox_axiom_questions = 0
-
-    progress_tracker = tqdm(total=num_of_examples)
-    progress_tracker.set_description(desc="Generating Examples...")
-
-    while curr_num_examples < num_of_examples:
-        example = generate_random_example(
-            curr_num_examples + 1,
-            example_id_prefix,
-            grammar,
-            statement_types,
-            max_depth,
-        )
-        if example is not None:
-            for q in example.theory_assertion_instance.questions:
-                if q["label"] == "True":
-                    num_true_questions += 1
-                elif q["label"] == "False":
-                    num_false_questions += 1
-                else:
-                    num_unknown_questions += 1
+    if seed is None:
+        seed = int.from_bytes(urandom(4), "little")
+        print(f"Master seed: {seed}")
+
+    writer = ExampleWriter(theory_op_file, num_of_examples, example_id_prefix)
+
+    with ExitStack() as stack:
+        if workers > 1:
+            pool = stack.enter_context(
+                get_context("fork").Pool(
+                    workers,
+                    initializer=init_worker,
+                    initargs=(
+                        grammar.grammar,
+                        reasoner_factory,
+                        set(GRAMMAR_ROLE_NAMES),
+                        global_variables.VERIFY_PARSER,
+                        global_variables.ONTOLOGY_BACKEND,
+                        (seed, example_id_prefix, statement_types, max_depth),
+                    ),
+                )
+            )
+            # Let the attempts still running finish, so workers shut down their reasoners
+            stack.callback(pool.join)
+            stack.callback(pool.close)
+            examples = parallel_attempts(pool, window=2 * workers)
+        else:
+            reasoner = stack.enter_context(closing(reasoner_factory()))
+            examples = (
+                generate_example_attempt(
+                    attempt,
+                    seed,
+                    example_id_prefix,
+                    grammar,
+                    statement_types,
+                    max_depth,
+                    reasoner,
+                )
+                for attempt in count()
+            )
 
-            (
-                concept_assertion_uestions,
-                role_assertion_questions,
-                tbox_axiom_questions,
-            ) = count_question_types(example)
+        for example in examples:
+            if example is None:
+                continue
+
+            writer.write(example)
+            if writer.done:
+                break
 
-            total_concept_assertion_uestions += concept_assertion_uestions
-            total_role_assertion_questions += role_assertion_questions
-            total_tbox_axiom_questions += tbox_axiom_questions
-            dump(example.to_json(), theory_op_file, ensure_ascii=False)
-            theory_op_file.write("\n")
+    writer.close()
 
-            # Delete .owl files
-            remove("ALCQCC.owl")
-            remove("ALCQ_ontology.owl")
 
-            curr_num_examples += 1
-            progress_tracker.update()
+async def generate_theory_async(
+    grammar,
+    config,
+    theory_op_file,
+    num_of_examples,
+    max_depth,
+    reasoner=DEFAULT_REASONER,
+    queue_size=4,
+):
+    """
+    Alternative to generate_theory that runs the generation of the examples as a
+    pipeline of asyncio stages, connected by bounded queues of queue_size:
+    KB sampling and OWL serialization -> inference and explanation of the selected
+    inferred axioms -> questions -> writing.
+    The reasoner requests are awaited (see AsyncReasoner), so the Python stages work
+    on the next KBs while the reasoner works on the current one. The examples are
+    numbered in the order they are completed, so the output is not reproducible
+    from a seed.
+    """
+
+    statement_types = config["theory"]["statement_types_per_example"]
+    example_id_prefix = config.get("example_id_prefix", "")
+
+    writer = ExampleWriter(theory_op_file, num_of_examples, example_id_prefix)
+    explain_queue = Queue(queue_size)
+    question_queue = Queue(queue_size)
+    write_queue = Queue(queue_size)
+
+    with AsyncReasoner(reasoner) as async_reasoner:
+
+        async def sample_kbs():
+            for attempt in count(1):
+                kb = KBBuilder()
+                generate_KB(statement_types, grammar, kb)
+                ontology = build_ontology(attempt, kb.abox, kb.tbox)
+                if ontology is not None:
+                    await explain_queue.put((attempt, kb, ontology))
+                await sleep(0)  # Let the other stages run between two KBs
+
+        async def explain_kbs():
+            while True:
+                attempt, kb, ontology = await explain_queue.get()
+                known_statement_keys = set(kb.statement_keys)
+                (
+                    theory,
+                    useful_inferred,
+                ) = await process_ontology_and_inferred_axioms_async(
+                    ontology,
+                    kb.abox,
+                    kb.tbox,
+                    kb.context2NL,
+                    known_statement_keys,
+                    max_depth,
+                    async_reasoner,
+                )
+                if theory == None or (useful_inferred == None and max_depth > 0):
+                    continue
+                await question_queue.put(
+                    (
+                        attempt,
+                        kb,
+                        ontology,
+                        theory,
+                        useful_inferred,
+                        known_statement_keys,
+                    )
+                )
 
-    progress_tracker.close()
+        async def generate_questions():
+            while True:
+                (
+                    attempt,
+                    kb,
+                    ontology,
+                    theory,
+                    useful_inferred,
+                    known_statement_keys,
+                ) = await question_queue.get()
+                concept_assertions, lookup_questions_pool = prepare_pools(theory)
+                if not concept_assertions or not lookup_questions_pool:
+                    continue
+
+                unknown_questions = await generate_unknown_questions_async(
+                    2 * (max_depth + 1) + 1,
+                    max_depth + 1,
+                    grammar,
+                    known_statement_keys,
+                    ontology,
+                    async_reasoner,
+                )
+                if unknown_questions is None:
+                    continue
+
+                example = assemble_example(
+                    attempt,
+                    example_id_prefix,
+                    theory,
+                    useful_inferred,
+                    max_depth,
+                    kb.context2NL,
+                    unknown_questions,
+                    concept_assertions,
+                    lookup_questions_pool,
+                )
+                if example is not None:
+                    await write_queue.put(example)
+
+        async def write_examples():
+            while not writer.done:
+                writer.write(await write_queue.get())
+
+        stages = [create_task(sample_kbs()), create_task(write_examples())]
+        stages += [
+            create_task(explain_kbs()) for _ in range(async_reasoner.concurrency)
+        ]
+        stages += [create_task(generate_questions())]
+        # The writer finishes when all the examples are written; the other stages
+        # only stop on an error
+        try:
+            await wait(stages, return_when=FIRST_COMPLETED)
+        finally:
+            for stage in stages:
+                stage.cancel()
+            results = await gather(*stages, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
 
-    print(f"Generated {curr_num_examples} examples.")
-    print(f"  No. of True questions: {num_true_questions}")
-    print(f"  No. of False questions: {num_false_questions}")
-    print(f"  No. of Unknown questions: {num_unknown_questions}")
-    print(f"  No. of Class Assertion questions: {total_concept_assertion_uestions}")
-    print(f"  No. of Role Assertion questions: {total_role_assertion_questions}")
-    print(f"  No. of TBox Axiom questions: {total_tbox_axiom_questions}")
+    writer.close()
 
 
 def parse_args():
@@ -534,6 +936,58 @@ def parse_args():
         required=True,
         help="Maximum reasoning depth for example questions.",
     )
+    parser.add_argument(
+        "--verify-parser",
+        action="store_true",
+        help="Cross-check every parsed DL concept against the legacy parser (slow, for debugging).",
+    )
+    parser.add_argument(
+        "--ontology-backend",
+        choices=["owlready2", "direct"],
+        default="owlready2",
+        help="Build the KB ontologies with owlready2 (RDF/XML), or write them directly in OWL functional syntax (faster).",
+    )
+    parser.add_argument(
+        "--reasoner",
+        choices=["hermit", "python", "differential"],
+        default="hermit",
+        help="Reason with HermiT in a JVM, with the in-process ALCQ tableau of tableau.py (python, no Java needed), or with both, reporting where the tableau's verdicts differ from HermiT's (differential). The tableau implies --ontology-backend direct. It is slower than HermiT on the larger KBs, whose inference can time out (EXPLANATION_TIMEOUT), which skips the KB; differential runs both reasoners one after the other, so it takes about twice as long as hermit.",
+    )
+    parser.add_argument(
+        "--reasoner-mode",
+        choices=["daemon", "oneshot"],
+        default="daemon",
+        help="Keep one reasoner JVM running for all the examples (daemon), or start one per ontology (oneshot).",
+    )
+    parser.add_argument(
+        "--reasoner-workers",
+        type=int,
+        default=1,
+        help="Number of reasoner JVMs in the daemon mode pool (per worker).",
+    )
+    parser.add_argument(
+        "--reasoner-metrics",
+        action="store_true",
+        help="Print the number, time, timeouts and failures of the reasoner requests of each kind at the end (per worker).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes generating examples in parallel.",
+    )
+    parser.add_argument(
+        "--async-pipeline",
+        action="store_true",
+        help="Overlap KB sampling with reasoning in an asyncio pipeline, instead of using --workers (not reproducible with --seed).",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Master seed; the same seed and number of workers produce the same examples, "
+        "unless a reasoner timeout is hit (the budgets are wall-clock).",
+    )
     return parser.parse_args()
 
 
@@ -555,19 +1009,47 @@ def run(args):
         grammar_str = "\n".join(production_strs)
         grammar = PCFG.fromstring(grammar_str)
 
-        GRAMMAR_ROLE_NAMES.clear()
-        GRAMMAR_ROLE_NAMES.update(extract_role_names(grammar))
+        global_variables.VERIFY_PARSER = args.verify_parser
+        global_variables.ONTOLOGY_BACKEND = args.ontology_backend
+        if args.reasoner != "hermit":
+            # The tableau reasons on the statements the direct backend ontologies keep
+            global_variables.ONTOLOGY_BACKEND = "direct"
+
+        set_grammar_role_names(extract_role_names(grammar))
+        reasoner_options = (
+            args.reasoner_mode,
+            args.reasoner_workers,
+            args.reasoner,
+            args.reasoner_metrics,
+        )
 
         print(
             f"\nStarting data generation with grammar: '{args.grammar}', number of examples: {args.num_of_examples}, max depth: {args.max_depth}.\n"
         )
 
+        if args.async_pipeline:
+            with closing(make_reasoner(*reasoner_options)) as reasoner:
+                run_async(
+                    generate_theory_async(
+                        PCFGSampler(grammar),
+                        config,
+                        theory_op_file,
+                        int(args.num_of_examples),
+                        int(args.max_depth),
+                        reasoner,
+                    )
+                )
+            return
+
         generate_theory(
-            grammar,
+            PCFGSampler(grammar),
             config,
             theory_op_file,
             int(args.num_of_examples),
             int(args.max_depth),
+            partial(make_reasoner, *reasoner_options),
+            args.seed,
+            args.workers,
         )
 
 
@@ -4,3 +4,20 @@ GRAMMAR_ROLE_NAMES = set()
 INCONSISTENCY_MSG = "INCONSISTENT ONTOLOGY!"
 INCOHERENCE_MSG = "INCOHERENT ONTOLOGY!"
 NOT_SUPPORTED_CLASS = -1
+# Cross-check every parsed concept against the legacy parser (debugging only)
+VERIFY_PARSER = False
+# How KB ontologies are built: "owlready2" (RDF/XML) or "direct" (see owl_functional.py)
+ONTOLOGY_BACKEND = "owlready2"
+# Unknown-question candidates checked per missing question, in one batch of checks
+# sharing the KB ontology (of the direct backend)
+UNKNOWN_OVERSAMPLING = 2
+# Seconds per candidate a batch of unknown-question consistency checks may take
+UNKNOWN_CHECK_TIMEOUT = 3
+# Seconds the inference and the explanations of a KB ontology may take in total
+EXPLANATION_TIMEOUT = 4.5
+# Inferred axioms explained per question of a label, in one batch of explanations
+EXPLANATION_OVERSAMPLING = 2
+# Reasoner jars built from owlapi_scripts; ReasonerServer is packaged in Explainer.jar
+EXPLAINER_JAR = "./Explainer.jar"
+CONSISTENCY_CHECKER_JAR = "./ConsistencyChecker.jar"
+REASONER_SERVER_COMMAND = ["java", "-cp", EXPLAINER_JAR, "msc.ReasonerServer"]
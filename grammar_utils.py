@@ -1,5 +1,9 @@
+from bisect import bisect_right
+from collections import defaultdict
 from nltk import Nonterminal
-from numpy.random import choice
+from numpy import asarray
+from numpy.random import choice, random_sample, seed as numpy_seed
+from utils import StatementBuilder, build_statement
 
 
 def preprocess_pcfg(grammar_file):
@@ -72,8 +76,206 @@ def choose_production(grammar, nonterminal):
     return chosen_production
 
 
+class PCFGSampler:
+    """Compiled form of an nltk PCFG for fast random statement generation.
+
+    The productions are indexed by their LHS nonterminal once, together with their
+    cumulative probabilities, so that expanding a nonterminal is a binary search
+    over a uniform sample instead of a scan over every production of the grammar.
+    Uniform samples are drawn from numpy's global random state in buffers of
+    `buffer_size`, which consumes the same random stream as `choose_production`:
+    for a fixed numpy seed both produce the same statements.
+    """
+
+    def __init__(self, grammar, buffer_size=4096):
+        self.grammar = grammar
+        self.buffer_size = buffer_size
+        self._rhs_table = {}
+        self._cdf_table = {}
+        self._buffer = []
+        self._buffer_idx = 0
+        self._cdf_arrays = {}
+        self._pools = {}
+
+        productions_by_lhs = {}
+        for production in grammar.productions():
+            productions_by_lhs.setdefault(production.lhs().symbol(), []).append(
+                production
+            )
+
+        for nonterminal, productions in productions_by_lhs.items():
+            # Same normalisation as numpy.random.choice, so that draws are identical
+            cdf = asarray([production.prob() for production in productions]).cumsum()
+            cdf /= cdf[-1]
+            self._cdf_arrays[nonterminal] = cdf
+            self._cdf_table[nonterminal] = cdf.tolist()
+            self._rhs_table[nonterminal] = [
+                tuple(
+                    (
+                        (True, item.symbol())
+                        if isinstance(item, Nonterminal)
+                        else (False, item)
+                    )
+                    for item in production.rhs()
+                )
+                for production in productions
+            ]
+
+    def reseed(self, seed):
+        """Seeds numpy's global random state and drops the pre-drawn uniforms and
+        pooled statements, so that the statements sampled next depend on seed only."""
+        numpy_seed(seed)
+        self._buffer = []
+        self._buffer_idx = 0
+        self._pools = {}
+
+    def _uniform(self):
+        if self._buffer_idx == len(self._buffer):
+            self._buffer = random_sample(self.buffer_size).tolist()
+            self._buffer_idx = 0
+        sample = self._buffer[self._buffer_idx]
+        self._buffer_idx += 1
+        return sample
+
+    def choose_rhs(self, nonterminal):
+        """Choose the RHS of a production with the specified nonterminal as LHS."""
+        if nonterminal not in self._rhs_table:
+            raise ValueError(f"Nonterminal {nonterminal} not found in the grammar!")
+        cdf = self._cdf_table[nonterminal]
+        return self._rhs_table[nonterminal][bisect_right(cdf, self._uniform())]
+
+    def generate_random_statement(self, nonterminal):
+        """Generate a random statement from the given nonterminal LHS in the grammar."""
+        tokens = []
+        # Expand left-most first, as the recursive generate_random_statement does
+        stack = [(True, nonterminal)]
+        while stack:
+            is_nonterminal, symbol = stack.pop()
+            if is_nonterminal:
+                stack.extend(reversed(self.choose_rhs(symbol)))
+            else:
+                tokens.append(symbol)
+
+        return " ".join(tokens)
+
+    def generate_random_axiom(self, nonterminal):
+        """Generate a random statement from the given nonterminal LHS in the grammar,
+        together with the assertion / axiom it represents, built while sampling."""
+        tokens = []
+        builder = StatementBuilder()
+        stack = [(True, nonterminal)]
+        while stack:
+            is_nonterminal, symbol = stack.pop()
+            if is_nonterminal:
+                stack.extend(reversed(self.choose_rhs(symbol)))
+            else:
+                tokens.append(symbol)
+                builder.push(symbol)
+
+        return " ".join(tokens), builder.result()
+
+    def derive(self, nonterminal, n):
+        """Derive n random token sequences from the given nonterminal LHS in the grammar.
+
+        The derivations are expanded level by level: at every level, the productions
+        for all the open occurrences of the same nonterminal (across all n derivations)
+        are chosen with a single vectorized draw.
+        """
+        if nonterminal not in self._rhs_table:
+            raise ValueError(f"Nonterminal {nonterminal} not found in the grammar!")
+
+        # Every derivation is a tree of nested lists: terminals are leaves and every
+        # expanded nonterminal is a list holding the items of its chosen RHS.
+        roots = [[] for _ in range(n)]
+        frontier = {nonterminal: roots}
+
+        while frontier:
+            next_frontier = defaultdict(list)
+            for symbol, nodes in frontier.items():
+                rhs_options = self._rhs_table[symbol]
+                chosen = self._cdf_arrays[symbol].searchsorted(
+                    random_sample(len(nodes)), side="right"
+                )
+                for node, rhs_idx in zip(nodes, chosen.tolist()):
+                    for is_nonterminal, item in rhs_options[rhs_idx]:
+                        if is_nonterminal:
+                            child = []
+                            node.append(child)
+                            next_frontier[item].append(child)
+                        else:
+                            node.append(item)
+            frontier = next_frontier
+
+        derivations = []
+        for root in roots:
+            tokens = []
+            stack = [root]
+            while stack:
+                item = stack.pop()
+                if item.__class__ is list:
+                    stack.extend(reversed(item))
+                else:
+                    tokens.append(item)
+            derivations.append(tokens)
+
+        return derivations
+
+    def generate_random_statements(self, nonterminal, n):
+        """Generate n random statements from the given nonterminal LHS in the grammar."""
+        return [" ".join(tokens) for tokens in self.derive(nonterminal, n)]
+
+    def generate_random_axioms(self, nonterminal, n):
+        """Generate n random (statement, assertion / axiom) pairs from the given
+        nonterminal LHS in the grammar."""
+        return [
+            (" ".join(tokens), build_statement(tokens))
+            for tokens in self.derive(nonterminal, n)
+        ]
+
+    def pool(self, nonterminal):
+        """The refillable pool of pre-sampled (statement, assertion / axiom) pairs for
+        the given nonterminal."""
+        if nonterminal not in self._pools:
+            self._pools[nonterminal] = StatementPool(self, nonterminal)
+        return self._pools[nonterminal]
+
+
+class StatementPool:
+    """A pool of pre-sampled statements for one nonterminal, with their already built
+    assertions / axioms, refilled in batches of `batch_size` whenever it runs empty."""
+
+    def __init__(self, grammar, nonterminal, batch_size=256):
+        self.grammar = grammar
+        self.nonterminal = nonterminal
+        self.batch_size = batch_size
+        self._statements = []
+
+    def __len__(self):
+        return len(self._statements)
+
+    def pop(self):
+        """Remove and return a random (statement, assertion / axiom) pair from the pool."""
+        if not self._statements:
+            self._statements = self.grammar.generate_random_axioms(
+                self.nonterminal, self.batch_size
+            )
+            # pop() takes from the end, keep the sampling order
+            self._statements.reverse()
+        return self._statements.pop()
+
+
+def generate_random_statements(grammar, nonterminal, n):
+    """Generate n random statements from the given nonterminal LHS in the grammar."""
+    if not isinstance(grammar, PCFGSampler):
+        grammar = PCFGSampler(grammar)
+    return grammar.generate_random_statements(nonterminal, n)
+
+
 def generate_random_statement(grammar, nonterminal):
     """Generate a random statement from the given nonterminal LHS in the grammar."""
+    if isinstance(grammar, PCFGSampler):
+        return grammar.generate_random_statement(nonterminal)
+
     chosen_production = choose_production(grammar, nonterminal)
     rhs = chosen_production.rhs()
     sentence = ""
@@ -0,0 +1,94 @@
+from collections import defaultdict
+from random import choice
+from common import AtomicConcept, JunctionConcept, ConceptAssertion
+from utils import SubsumptionGraph, alcq_negate, canonical_key, canonicalize
+
+
+class RandomSet:
+    """Insertion-ordered set with O(1) membership, add and random choice."""
+
+    __slots__ = ("items", "positions")
+
+    def __init__(self, items=()):
+        self.items = []
+        self.positions = dict()
+        self.update(items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def add(self, item):
+        if item not in self.positions:
+            self.positions[item] = len(self.items)
+            self.items.append(item)
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def choice(self):
+        return choice(self.items)
+
+
+def conjunction_sides(concept):
+    """Returns the concept and, for a conjunction, the conjuncts at every level, in order.
+    ⊤ is left out since it is not useful as the LHS of an axiom."""
+    if isinstance(concept, AtomicConcept) and concept.concept_name == "⊤":
+        return []
+    if isinstance(concept, JunctionConcept) and concept.relationship == "⊓":
+        return conjunction_sides(concept.lhs_concept) + conjunction_sides(
+            concept.rhs_concept
+        )
+    return [concept]
+
+
+class KBBuilder:
+    """State of a knowledge base while its statements are being generated.
+    Statements are kept in generation order, together with the indexes the generation
+    constraints need, all updated incrementally as each statement is accepted."""
+
+    def __init__(self):
+        self.abox = []
+        self.tbox = []
+        self.statement_keys = set()  # canonical keys of the accepted statements
+        self.abox_concepts = RandomSet()  # ABox concepts and their conjuncts
+        self.lhs_pool = RandomSet()  # RHS concepts of the TBox and their conjuncts
+        self.negated_concepts = defaultdict(set)  # individual -> canonical negations
+        self.subsumption_graph = SubsumptionGraph()
+        self.context2NL = dict()  # maps a statement to its NL representation
+
+    def __contains__(self, statement):
+        """Whether a semantic duplicate of statement is already in the KB."""
+        return canonical_key(statement) in self.statement_keys
+
+    def sample_lhs_concept(self):
+        """Samples the LHS concept of a new TBox axiom, from the RHS concepts of the TBox
+        or, while the TBox is empty, from the concepts of the ABox."""
+        if len(self.lhs_pool) == 0:
+            return self.abox_concepts.choice()
+        return self.lhs_pool.choice()
+
+    def add_abox_assertion(self, assertion):
+        self.abox.append(assertion)
+        self.statement_keys.add(canonical_key(assertion))
+        self.context2NL[assertion] = assertion.nl()
+        if isinstance(assertion, ConceptAssertion):
+            self.abox_concepts.add(assertion.concept)
+            self.abox_concepts.update(conjunction_sides(assertion.concept))
+            self.negated_concepts[assertion.individual].add(
+                canonicalize(alcq_negate(assertion.concept))
+            )
+
+    def add_tbox_axiom(self, axiom):
+        self.tbox.append(axiom)
+        self.statement_keys.add(canonical_key(axiom))
+        self.subsumption_graph.add_axiom(axiom)
+        self.context2NL[axiom] = axiom.nl()
+        self.lhs_pool.update(conjunction_sides(axiom.RHS_concept))
+        self.lhs_pool.add(axiom.RHS_concept)
@@ -1,9 +1,11 @@
 from owlready2 import *
+from io import BytesIO
 from types import new_class
 from common import AtomicConcept, ConceptAssertion, JunctionConcept, RestrictionConcept
+from owl_names import OwlDocument
 
 
-def restriction_concept_2_owl(onto, restr_concept):
+def restriction_concept_2_owl(onto, restr_concept, names):
     """Given a restriction complex concept in nl, creates its corresponding
         owl class using owlready2.
 
@@ -18,17 +20,17 @@ def restriction_concept_2_owl(onto, restr_concept):
     with onto:
         restriction = restr_concept.restriction
         role_name = restr_concept.role_name
-        inner_concept, inner_concept_name = make_concept(onto, restr_concept.concept)
+        inner_concept, _ = make_concept(onto, restr_concept.concept, names)
 
         if restriction == "∀":
-            complex_concept_name = f"only_{role_name}_d_L_{inner_concept_name}_R"
+            complex_concept_name = names.name(restr_concept)
             complex_concept = new_class(complex_concept_name, (Thing,))
             role = new_class(str(role_name), (ObjectProperty,))
             role.domain = role.range = [Thing]
             complex_concept.equivalent_to.append(role.only(inner_concept))
             return complex_concept, complex_concept_name
         elif restriction == "∃":
-            complex_concept_name = f"exists_{role_name}_d_L_{inner_concept_name}_R"
+            complex_concept_name = names.name(restr_concept)
             complex_concept = new_class(complex_concept_name, (Thing,))
             role = new_class(str(role_name), (ObjectProperty,))
             role.domain = role.range = [Thing]
@@ -40,9 +42,7 @@ def restriction_concept_2_owl(onto, restr_concept):
             role_name = restr_concept.role_name
 
             if quantifier == ">":
-                complex_concept_name = (
-                    f"MT{quantity}_{role_name}_d_L_{inner_concept_name}_R"
-                )
+                complex_concept_name = names.name(restr_concept)
                 complex_concept = new_class(str(complex_concept_name), (Thing,))
                 role = new_class(str(role_name), (ObjectProperty,))
                 role.domain = role.range = [Thing]
@@ -51,9 +51,7 @@ def restriction_concept_2_owl(onto, restr_concept):
                 )
                 return complex_concept, complex_concept_name
             elif quantifier == "<":
-                complex_concept_name = (
-                    f"LT{quantity}_{role_name}_d_L_{inner_concept_name}_R"
-                )
+                complex_concept_name = names.name(restr_concept)
                 complex_concept = new_class(str(complex_concept_name), (Thing,))
                 role = new_class(str(role_name), (ObjectProperty,))
                 role.domain = role.range = [Thing]
@@ -62,9 +60,7 @@ def restriction_concept_2_owl(onto, restr_concept):
                 )
                 return complex_concept, complex_concept_name
             elif quantifier == ">=":
-                complex_concept_name = (
-                    f"AL{quantity}_{role_name}_d_L_{inner_concept_name}_R"
-                )
+                complex_concept_name = names.name(restr_concept)
                 complex_concept = new_class(complex_concept_name, (Thing,))
                 role = new_class(str(role_name), (ObjectProperty,))
                 role.domain = role.range = [Thing]
@@ -73,9 +69,7 @@ def restriction_concept_2_owl(onto, restr_concept):
                 )
                 return complex_concept, complex_concept_name
             elif quantifier == "<=":
-                complex_concept_name = (
-                    f"AM{quantity}_{role_name}_d_L_{inner_concept_name}_R"
-                )
+                complex_concept_name = names.name(restr_concept)
                 complex_concept = new_class(complex_concept_name, (Thing,))
                 role = new_class(str(role_name), (ObjectProperty,))
                 role.domain = role.range = [Thing]
@@ -85,9 +79,7 @@ def restriction_concept_2_owl(onto, restr_concept):
                 return complex_concept, complex_concept_name
 
             elif quantifier == "=":
-                complex_concept_name = (
-                    f"EQ{quantity}_{role_name}_d_L_{inner_concept_name}_R"
-                )
+                complex_concept_name = names.name(restr_concept)
                 complex_concept = new_class(complex_concept_name, (Thing,))
                 role = new_class(str(role_name), (ObjectProperty,))
                 role.domain = role.range = [Thing]
@@ -97,75 +89,85 @@ def restriction_concept_2_owl(onto, restr_concept):
                 return complex_concept, complex_concept_name
 
 
-def AtomicConcept_2_Owl(onto, concept):
+def AtomicConcept_2_Owl(onto, concept, names):
     with onto:
+        atomic_concept = concept
         polarity = concept.polarity
         concept_name = concept.concept_name
         concept = None
         if concept_name == "⊤":
             if polarity != "+":
-                concept_name = "neg_Thing"
+                concept_name = "Nothing"
                 concept = Nothing
             else:
-                concept_name = "pos_Thing"
+                concept_name = "Thing"
                 concept = Thing
         elif concept_name == "⊥":
             if polarity != "+":
-                concept_name = "neg_Nothing"
+                concept_name = "Thing"
                 concept = Thing
             else:
-                concept_name = "pos_Nothing"
+                concept_name = "Nothing"
                 concept = Nothing
         else:
             if polarity != "+":
-                concept = new_class(f"pos_{concept_name}", (Thing,))
-                concept_name = f"neg_{concept_name}"
+                positive_concept = AtomicConcept("+", concept_name)
+                concept = new_class(
+                    names.name(positive_concept),
+                    (Thing,),
+                )
+                concept_name = names.name(atomic_concept)
                 neg_complex_concept = new_class(concept_name, (Thing,))
                 neg_complex_concept.equivalent_to.append(Not(concept))
                 concept = neg_complex_concept
             else:
-                concept_name = f"pos_{concept_name}"
+                concept_name = names.name(atomic_concept)
                 concept = new_class(concept_name, (Thing,))
 
     return concept, concept_name
 
 
-def junction_concept_2_owl(onto, concept2make):
+def junction_concept_2_owl(onto, concept2make, names):
     with onto:
         relationship = concept2make.relationship
-        lhs_concept, lhs_concept_name = make_concept(onto, concept2make.lhs_concept)
-        rhs_concept, rhs_concept_name = make_concept(onto, concept2make.rhs_concept)
+        lhs_concept, _ = make_concept(onto, concept2make.lhs_concept, names)
+        rhs_concept, _ = make_concept(onto, concept2make.rhs_concept, names)
 
         owl_concept_name = str()
         if relationship == "⊓":
-            owl_concept_name = f"L_{lhs_concept_name}_R_and_L_{rhs_concept_name}_R"
+            owl_concept_name = names.name(concept2make)
             owl_concept = new_class(owl_concept_name, (Thing,))
             owl_concept.equivalent_to.append(lhs_concept & rhs_concept)
         else:
-            owl_concept_name = f"L_{lhs_concept_name}_R_or_L_{rhs_concept_name}_R"
+            owl_concept_name = names.name(concept2make)
             owl_concept = new_class(owl_concept_name, (Thing,))
             owl_concept.equivalent_to.append(lhs_concept | rhs_concept)
     return owl_concept, owl_concept_name
 
 
-def make_concept(onto, concept2make):
+def make_concept(onto, concept2make, names):
     """Given a concept, create it's owl class usign owlready.
 
     Args:
         onto (owlready ontology):   The ontology to which this concept will be added
         concept2make (Concept):     A concept to create it's owl representation using owlready.
+        names (ClassNames):         The naming table of the KB classes.
 
     Returns:
         Class: the owlready class corresponding to the concept
     """
     with onto:
         if isinstance(concept2make, AtomicConcept):
-            owl_concept, owl_concept_name = AtomicConcept_2_Owl(onto, concept2make)
+            owl_concept, owl_concept_name = AtomicConcept_2_Owl(
+                onto, concept2make, names
+            )
         elif isinstance(concept2make, JunctionConcept):
-            owl_concept, owl_concept_name = junction_concept_2_owl(onto, concept2make)
+            owl_concept, owl_concept_name = junction_concept_2_owl(
+                onto, concept2make, names
+            )
         elif isinstance(concept2make, RestrictionConcept):  # Restriction concept
             owl_concept, owl_concept_name = restriction_concept_2_owl(
-                onto, concept2make
+                onto, concept2make, names
             )
         else:
             raise TypeError(
@@ -195,29 +197,46 @@ def special_axiom(axiom):
     return False, None
 
 
-def make_special_axiom(onto, special_axiom, special_type):
+def make_special_axiom(onto, special_axiom, special_type, names):
     LHS_concept = special_axiom.LHS_concept
     RHS_concept = special_axiom.RHS_concept
     with onto:
         if special_type == SPECIAL_RANGE:
             role_name = RHS_concept.role_name
-            range_concept, _ = make_concept(onto, RHS_concept.concept)
+            range_concept, _ = make_concept(onto, RHS_concept.concept, names)
             role = new_class(str(role_name), (ObjectProperty,))
             role.domain = [Thing]
             role.range = [range_concept]
         elif special_type == SPECIAL_DOMAIN:
             role_name = LHS_concept.role_name
-            domain_concept, _ = make_concept(onto, RHS_concept)
+            domain_concept, _ = make_concept(onto, RHS_concept, names)
             role = new_class(str(role_name), (ObjectProperty,))
             role.domain = [domain_concept]
             role.range = [Thing]
 
 
-def create_ontology(id, ABoxAssertions, TBoxAxioms):
+def save_ontology(onto, ontology_path=None):
+    """Saves the ontology as RDF/XML to ontology_path, if given, and returns the path.
+    Otherwise returns the RDF/XML document (bytes), so that it stays in memory."""
+    if ontology_path is not None:
+        onto.save(ontology_path, "rdfxml")
+        return ontology_path
+    document = BytesIO()
+    onto.save(document, "rdfxml")
+    return document.getvalue()
+
+
+def create_ontology(id, ABoxAssertions, TBoxAxioms, names, ontology_path=None):
     """Given the ABox & the TBox, create the corresponding ontology using owlready.
     Args:
         ABoxAssertions (list):  List with the ABox assertions
         TBoxAxioms (list):      List with the TBox axioms
+        names (ClassNames):     The naming table of the KB classes
+        ontology_path (str):    File to save the ontology to, if any
+
+    Returns:
+        The ontology, as saved by save_ontology. A document is an OwlDocument with
+        the names table.
     """
 
     onto = get_ontology("http://alcq.org/onto.owl")
@@ -233,7 +252,7 @@ def create_ontology(id, ABoxAssertions, TBoxAxioms):
                 assertion_concept = assertion.concept
                 indName = assertion.individual
                 inds.add(indName)
-                concept, _ = make_concept(onto, assertion_concept)
+                concept, _ = make_concept(onto, assertion_concept, names)
                 ind = Thing(str(indName))
                 ind.is_a.append(concept)
             else:  # Role Assertion ##
@@ -256,10 +275,10 @@ def create_ontology(id, ABoxAssertions, TBoxAxioms):
         for axiom in TBoxAxioms:
             special_check, special_type = special_axiom(axiom)
             if special_check:
-                make_special_axiom(onto, axiom, special_type)
+                make_special_axiom(onto, axiom, special_type, names)
                 continue
-            lhs_concept, _ = make_concept(onto, axiom.LHS_concept)
-            rhs_concept, _ = make_concept(onto, axiom.RHS_concept)
+            lhs_concept, _ = make_concept(onto, axiom.LHS_concept, names)
+            rhs_concept, _ = make_concept(onto, axiom.RHS_concept, names)
             lhs_concept.is_a.append(rhs_concept)
 
         # We need to state this in OWA #
@@ -276,6 +295,10 @@ def create_ontology(id, ABoxAssertions, TBoxAxioms):
         if len(individuals) >= 2:
             AllDifferent(individuals)
 
-        onto.save(f"./ALCQ_ontology.owl", "rdfxml")
+        ontology = save_ontology(onto, ontology_path)
+        if isinstance(ontology, bytes):
+            ontology = OwlDocument(ontology, names)
         # onto.save(f"./Generated-Ontologies/ALCQ-Ontology-{id}.owl", "rdfxml")
         onto.destroy(update_relation=True, update_is_a=True)
+
+    return ontology
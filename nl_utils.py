@@ -1,14 +1,37 @@
 import inflect
+from functools import lru_cache, wraps
 from global_variables import GRAMMAR_ROLE_NAMES
 
+ENGINE = inflect.engine()
+PLURAL_VERBS = dict()  # role name -> its plural verb form
 
+
+def set_grammar_role_names(role_names):
+    """Sets GRAMMAR_ROLE_NAMES to the role names of the loaded grammar and precomputes
+    their plural verb forms. Call it before rendering any NL, since renderings are cached.
+    """
+    GRAMMAR_ROLE_NAMES.clear()
+    GRAMMAR_ROLE_NAMES.update(role_names)
+    for role_name in role_names:
+        if role_name not in PLURAL_VERBS:
+            PLURAL_VERBS[role_name] = ENGINE.plural_verb(role_name)
+    pluralize.cache_clear()
+
+
+def plural_verb(word):
+    verb = PLURAL_VERBS.get(word)
+    if verb is None:
+        verb = PLURAL_VERBS[word] = ENGINE.plural_verb(word)
+    return verb
+
+
+@lru_cache(maxsize=1 << 14)
 def pluralize(restr_concept, whole=False):
-    p = inflect.engine()
     pluralized = str()
     change = True
     for word in restr_concept.split():
         if (change is True) and (word in GRAMMAR_ROLE_NAMES):
-            pluralized += f"{p.plural_verb(word)} "
+            pluralized += f"{plural_verb(word)} "
             if not whole:
                 change = False
         else:
@@ -18,6 +41,24 @@ def pluralize(restr_concept, whole=False):
     return pluralized
 
 
+def memoized_nl(render):
+    """Caches the NL rendering of an immutable object in its `_nl` slot, per arguments."""
+
+    @wraps(render)
+    def nl(self, *args, **kwargs):
+        cache = self._nl
+        if cache is None:
+            cache = dict()
+            object.__setattr__(self, "_nl", cache)
+        key = (args, tuple(kwargs.items()))
+        text = cache.get(key)
+        if text is None:
+            text = cache[key] = render(self, *args, **kwargs)
+        return text
+
+    return nl
+
+
 def restriction_concept_nl(restriction_concept):
     """
     Given a restriction concept, returns it's natural language representation.
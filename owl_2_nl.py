@@ -1,427 +1,193 @@
-from re import finditer, DOTALL
-from utils import parse_concept
+from functools import partial
+from json import JSONDecodeError, loads
+from logging import getLogger
+from utils import alcq_negate, canonical_key
 from common import *
 from global_variables import NOT_SUPPORTED_CLASS
 
+# Explainer JSON output (see owlapi_scripts/JsonRenderer.java) -> ALCQ notation
+JSON_JUNCTIONS = {"ObjectIntersectionOf": "⊓", "ObjectUnionOf": "⊔"}
+JSON_RESTRICTIONS = {
+    "ObjectSomeValuesFrom": "∃",
+    "ObjectAllValuesFrom": "∀",
+    "ObjectMinCardinality": ">=",
+    "ObjectMaxCardinality": "<=",
+    "ObjectExactCardinality": "=",
+}
+JSON_TBOX_RELATIONSHIPS = {"SubClassOf": "⊑", "EquivalentClasses": "≡"}
 
-def skip_url(text, start_from=0):
-    if in_left_half(text[start_from:], "owl:Thing"):
-        return "Thing", text.index("owl:Thing") + len("owl:Thing") - 1
-    if in_left_half(text[start_from:], "owl:Nothing"):
-        return "Nothing", text.index("owl:Nothing") + len("owl:Nothing") - 1
+logger = getLogger(__name__)
 
-    # Catch owlapi incomplete axioms (objectintersectionof(A))
-    if "#" not in text[start_from:]:
-        return None, None
 
-    start_index = text.index("#", start_from) + 1
-    end_index = text.index(">", start_index)
-    return text[start_index:end_index], end_index
+class LazyAxiom:
+    """An axiom of an explanation, kept as the reasoner printed it (its JSON object)
+    and decoded by decode on first access, since only the explanations of the
+    questions are ever read. str() of it is the str() of the axiom."""
 
+    __slots__ = ("raw", "decode", "_axiom")
 
-def skip_double_url(text):
-    # Clean 1st URL #
-    clean1, end_index1 = skip_url(text)
-    # Clean 2nd URL #
-    clean2, _ = skip_url(text, end_index1)
-    return clean1, clean2
+    def __init__(self, raw, decode):
+        self.raw = raw
+        self.decode = decode
+        self._axiom = None
 
+    @property
+    def axiom(self):
+        if self.decode is not None:
+            self._axiom = self.decode(self.raw)
+            self.raw = self.decode = None
+        return self._axiom
 
-def in_left_half(text, pattern):
-    idx = text.find(pattern)
-    if idx == -1 or (idx >= len(text) / 2):
-        return False
-    return True
-
-
-def in_right_half(text, pattern):
-    idx = text.find(pattern)
-    if idx == -1 or (idx < len(text) / 2):
-        return False
-    return True
-
-
-def decode_owl_axiom(axiom_text):
-    axiom_text = axiom_text.replace("_", " ")
-    axiom_text = axiom_text.replace(" L ", " ( ")
-    axiom_text = axiom_text.replace("L ", "( ")
-    axiom_text = axiom_text.replace(" R ", " ) ")
-    axiom_text = axiom_text.replace(" R", " )")
-    axiom_text = axiom_text.replace(" d ", " . ")
-    axiom_text = axiom_text.replace("MT", "> ")
-    axiom_text = axiom_text.replace("LT", "< ")
-    axiom_text = axiom_text.replace("EQ", "= ")
-    axiom_text = axiom_text.replace("AL", ">= ")
-    axiom_text = axiom_text.replace("AM", "<= ")
-    axiom_text = axiom_text.replace("exists", "∃")
-    axiom_text = axiom_text.replace("only", "∀")
-    axiom_text = axiom_text.replace("pos", "+")
-    axiom_text = axiom_text.replace("neg", "¬")
-    axiom_text = axiom_text.replace(" and ", "⊓")
-    axiom_text = axiom_text.replace(" or ", "⊔")
-    axiom_text = axiom_text.replace("Thing", "⊤")
-    axiom_text = axiom_text.replace("Nothing", "⊥")
-
-    # Atomic Concept from OWLAPI (i.e., "nice", "white")
-    splitted_axiom_text = axiom_text.split()
-    if len(splitted_axiom_text) == 1:
-        return AtomicConcept("+", axiom_text)
-    if (
-        len(splitted_axiom_text) == 3
-        and "+" in splitted_axiom_text
-        and "¬" in splitted_axiom_text
-    ):
-        print(f"AXIOM TEXT: {axiom_text}")
-        assert False
-        # return AtomicConcept("+", axiom_text)
-    concept = parse_concept(axiom_text)
-    return concept
-
-
-def ClassAssertionClass(text, all2NL=None):
-    """Returns the owl axiom as ConceptAssertion python class."""
-    ConceptText, Individual = skip_double_url(text)
-    concept = decode_owl_axiom(ConceptText)
-    concept_assertion = ConceptAssertion(concept, individual=Individual)
-    if all2NL is not None and concept_assertion not in all2NL:
-        all2NL[concept_assertion] = concept_assertion.nl()
-    return concept_assertion
-
-
-def SubClassOfClass(text, statements_NL=None):
-    """Returns the the owl axiom as TBoxAxiom python class."""
-    LHS_text, after_LHS_idx = skip_url(text)
-    if LHS_text is None or after_LHS_idx is None:
-        return None
-    RHS_text, _ = skip_url(text, after_LHS_idx)
-
-    LHS_concept = decode_owl_axiom(LHS_text)
-    RHS_concept = decode_owl_axiom(RHS_text)
-    concept_inclusion = TBoxAxiom(LHS_concept, "⊑", RHS_concept)
-    if statements_NL is not None and concept_inclusion not in statements_NL:
-        statements_NL[concept_inclusion] = concept_inclusion.nl()
-    return concept_inclusion
+    def __str__(self):
+        return str(self.axiom)
 
+    def __repr__(self):
+        return repr(self.axiom)
 
-def EquivalentClassesClass(text, statements_NL=None):
-    """Returns the the owl axiom as TBoxAxiom python class."""
-    LHS_text, after_LHS_idx = skip_url(text)
-    if LHS_text is None or after_LHS_idx is None:
-        return None
-    LHS_concept = decode_owl_axiom(LHS_text)
-
-    # Make the check here to save the cardinality num
-    if "cardinality" in text[after_LHS_idx:].lower():
-        cardinality = int(text[text.find("Cardinality") + len("Cardinality") + 1])
 
-    RHS_text, after_RHS_idx = skip_url(text, after_LHS_idx)
-    if RHS_text is None or after_RHS_idx is None:
-        return None
-    if "objectcomplementof" in text[after_LHS_idx:].lower():
-        # print(f"RHS TEXT TO COMPLEMENT: {RHS_text}")
-        if RHS_text[:3] == "pos":
-            RHS_text = f"neg_{RHS_text[3:]}"
-        elif RHS_text[:3] == "neg":
-            RHS_text = f"pos_{RHS_text[3:]}"
-        else:
-            assert False
-            # RHS_text = f"neg_{RHS_text}"
-
-    elif "objectunionof" in text[after_LHS_idx:].lower():
-        union_lhs = RHS_text
-        union_rhs, _ = skip_url(text, after_RHS_idx)
-        if union_rhs is None:
-            return None
-        RHS_text = f"L_{union_lhs}_R_or_L_{union_rhs}_R"
-    elif "objectintersectionof" in text[after_LHS_idx:].lower():
-        intersection_lhs = RHS_text
-        intersection_rhs, _ = skip_url(text, after_RHS_idx)
-        if intersection_rhs is None:
-            return None
-        RHS_text = f"L_{intersection_lhs}_R_and_L_{intersection_rhs}_R"
-    elif "objectsomevaluesfrom" in text[after_LHS_idx:].lower():
-        role_name = RHS_text
-        range, _ = skip_url(text, after_RHS_idx)
-        if range is None:
-            return None
-        if range == "Thing" or range == "Nothing":
-            range = f"pos_{range}"
-        RHS_text = f"exists_{role_name}_d_L_{range}_R"
-    elif "objectallvaluesfrom" in text[after_LHS_idx:].lower():
-        role_name = RHS_text
-        range, _ = skip_url(text, after_RHS_idx)
-        if range is None:
-            return None
-        if range == "Thing" or range == "Nothing":
-            range = f"pos_{range}"
-        RHS_text = f"only_{role_name}_d_L_{range}_R"
-    elif "objectexactcardinality" in text[after_LHS_idx:].lower():
-        role_name = RHS_text
-        range, _ = skip_url(text, after_RHS_idx)
-        if range is None:
-            return None
-        if range == "Thing" or range == "Nothing":
-            range = f"pos_{range}"
-        RHS_text = f"EQ{cardinality}_{role_name}_d_L_{range}_R"
-    elif "objectmincardinality" in text[after_LHS_idx:].lower():
-        role_name = RHS_text
-        range, _ = skip_url(text, after_RHS_idx)
-        if range is None:
-            return None
-        if range == "Thing" or range == "Nothing":
-            range = f"pos_{range}"
-        RHS_text = f"AL{cardinality}_{role_name}_d_L_{range}_R"
-    elif "objectmaxcardinality" in text[after_LHS_idx:].lower():
-        role_name = RHS_text
-        range, _ = skip_url(text, after_RHS_idx)
-        if range is None:
-            return None
-        if range == "Thing" or range == "Nothing":
-            range = f"pos_{range}"
-        RHS_text = f"AM{cardinality}_{role_name}_d_L_{range}_R"
+def add_known_key(axiom_class, known_statement_keys):
+    """Adds the canonical key of a decoded axiom to the known_statement_keys, if any,
+    which is_known looks the Unknown question candidates up in."""
+    if known_statement_keys is not None:
+        known_statement_keys.add(canonical_key(axiom_class))
 
-    RHS_concept = decode_owl_axiom(RHS_text)
-    concept_equivalence = TBoxAxiom(LHS_concept, "≡", RHS_concept)
-    # print(f"concept_equivalence = {concept_equivalence}")
-    if statements_NL is not None and concept_equivalence not in statements_NL:
-        statements_NL[concept_equivalence] = concept_equivalence.nl()
-    return concept_equivalence
 
+def json_concept(expression, names):
+    """Returns the concept of a class expression of the Explainer JSON output (see
+    JsonRenderer.java), or None if ALCQ has no such concept. The named classes are
+    looked up in the names table (a ClassNames) of the KB."""
+    if isinstance(expression, str):
+        return names.concept(expression)
 
-def ObjectPropertyAssertionClass(text, statements_NL=None):
-    RoleName, after_RoleName_idx = skip_url(text)
-    Ind1, after_Ind1_idx = skip_url(text, after_RoleName_idx)
-    Ind2, _ = skip_url(text, after_Ind1_idx)
-    role_assertion = RoleAssertion(RoleName, Ind1, Ind2)
-
-    if statements_NL is not None and role_assertion not in statements_NL:
-        statements_NL[role_assertion] = role_assertion.nl()
-
-    return role_assertion
-
-
-def owl_axiom_class(axiom_owl, all2NL=None):
-    """Returns the axiom class of the given axiom in owl."""
-    axiom_owl = axiom_owl.replace("Explanation ", "")
-
-    if (
-        "Entailment" in axiom_owl
-    ):  # Remove <Entailment1680334193807> in some axioms (maybe caused by owlready)
-        axiom_owl = " ".join(
-            s for s in axiom_owl.split() if not any(c.isdigit() for c in s)
-        )
-
-    axiom_class = str()
-
-    # Check axiom type #
-    if axiom_owl.find("ClassAssertion") != -1:
-        axiom_class = ClassAssertionClass(axiom_owl, all2NL)
-    elif axiom_owl.find("SubClassOf") != -1:
-        axiom_class = SubClassOfClass(axiom_owl, all2NL)
-    elif axiom_owl.find("EquivalentClasses") != -1:
-        axiom_class = EquivalentClassesClass(axiom_owl, all2NL)
-    elif axiom_owl.find("ObjectPropertyAssertion") != -1:
-        axiom_class = ObjectPropertyAssertionClass(axiom_owl, all2NL)
-    else:
-        return NOT_SUPPORTED_CLASS
-    return axiom_class
-
-
-def construct_owl_concept(owl_text):
-    if owl_text.lower().find("objectintersectionof") != -1:
-        lhs_concept_text, after_lhs_idx = skip_url(owl_text)
-        if lhs_concept_text is None:
-            return None
-        rhs_concept_text, _ = skip_url(owl_text, after_lhs_idx)
-        if rhs_concept_text is None:
-            return None
-        lhs_concept = decode_owl_axiom(lhs_concept_text)
-        rhs_concept = decode_owl_axiom(rhs_concept_text)
-        return JunctionConcept(lhs_concept, "⊓", rhs_concept, False, False)
-    elif owl_text.lower().find("objectunionof") != -1:
-        lhs_concept_text, after_lhs_idx = skip_url(owl_text)
-        if lhs_concept_text is None:
-            return None
-        rhs_concept_text, _ = skip_url(owl_text, after_lhs_idx)
-        if rhs_concept_text is None:
+    expression_type = expression["type"]
+    if expression_type in JSON_JUNCTIONS:
+        operands = expression["operands"]
+        if len(operands) != 2:
             return None
-        lhs_concept = decode_owl_axiom(lhs_concept_text)
-        rhs_concept = decode_owl_axiom(rhs_concept_text)
-        return JunctionConcept(lhs_concept, "⊔", rhs_concept, False, False)
-    elif owl_text.lower().find("objectsomevaluesfrom") != -1:
-        restriction = "∃"
-        role_name, after_role_name_idx = skip_url(owl_text)
-        if role_name is None:
+        lhs_concept = json_concept(operands[0], names)
+        rhs_concept = json_concept(operands[1], names)
+        if lhs_concept is None or rhs_concept is None:
             return None
-        inner_concept_text, _ = skip_url(owl_text, after_role_name_idx)
-        if inner_concept_text is None:
-            return None
-        inner_concept = decode_owl_axiom(inner_concept_text)
-        return RestrictionConcept(restriction, role_name, inner_concept)
-    elif owl_text.lower().find("objectallvaluesfrom") != -1:
-        restriction = "∀"
-        role_name, after_role_name_idx = skip_url(owl_text)
-        if role_name is None:
-            return None
-        inner_concept_text, _ = skip_url(owl_text, after_role_name_idx)
-        if inner_concept_text is None:
-            return None
-        inner_concept = decode_owl_axiom(inner_concept_text)
-        return RestrictionConcept(restriction, role_name, inner_concept)
-    elif owl_text.lower().find("objectmincardinality") != -1:
-        cardinality_idx = (
-            owl_text.lower().find("objectmincardinality")
-            + len("objectmincardinality")
-            + 1
+        return JunctionConcept(
+            lhs_concept, JSON_JUNCTIONS[expression_type], rhs_concept
         )
-        cardinality = owl_text[cardinality_idx]
-        restriction = f">= {cardinality}"
-        role_name, after_role_name_idx = skip_url(owl_text)
-        if role_name is None:
-            return None
-        inner_concept_text, _ = skip_url(owl_text, after_role_name_idx)
-        if inner_concept_text is None:
-            return None
-        inner_concept = decode_owl_axiom(inner_concept_text)
-        return RestrictionConcept(restriction, role_name, inner_concept)
-    elif owl_text.lower().find("objectmaxcardinality") != -1:
-        cardinality_idx = (
-            owl_text.lower().index("objectmaxcardinality")
-            + len("objectmaxcardinality")
-            + 1
+    if expression_type == "ObjectComplementOf":
+        concept = json_concept(expression["operands"][0], names)
+        return None if concept is None else alcq_negate(concept)
+    if expression_type in JSON_RESTRICTIONS:
+        concept = json_concept(expression["filler"], names)
+        if concept is None:
+            return None
+        restriction = JSON_RESTRICTIONS[expression_type]
+        if "cardinality" in expression:
+            restriction = f"{restriction} {expression['cardinality']}"
+        return RestrictionConcept(restriction, expression["role"], concept)
+    return None
+
+
+def json_axiom_class(axiom, names, known_statement_keys=None):
+    """Returns the axiom of the Explainer JSON output as python class, or
+    NOT_SUPPORTED_CLASS for an axiom type the questions do not use."""
+    axiom_type = axiom["type"]
+    if axiom_type == "ClassAssertion":
+        concept = json_concept(axiom["class"], names)
+        if concept is None:
+            return None
+        axiom_class = ConceptAssertion(concept, individual=axiom["individual"])
+    elif axiom_type in JSON_TBOX_RELATIONSHIPS:
+        lhs_concept, rhs_concept = (
+            json_concept(c, names) for c in axiom["operands"][:2]
         )
-        cardinality = owl_text[cardinality_idx]
-        restriction = f"<= {cardinality}"
-        role_name, after_role_name_idx = skip_url(owl_text)
-        if role_name is None:
-            return None
-        inner_concept_text, _ = skip_url(owl_text, after_role_name_idx)
-        if inner_concept_text is None:
+        if lhs_concept is None or rhs_concept is None:
             return None
-        inner_concept = decode_owl_axiom(inner_concept_text)
-        return RestrictionConcept(restriction, role_name, inner_concept)
-    elif owl_text.lower().find("objectexactcardinality") != -1:
-        cardinality_idx = (
-            owl_text.lower().find("objectexactcardinality")
-            + len("objectexactcardinality")
-            + 1
+        axiom_class = TBoxAxiom(
+            lhs_concept, JSON_TBOX_RELATIONSHIPS[axiom_type], rhs_concept
         )
-        cardinality = owl_text[cardinality_idx]
-        restriction = f"= {cardinality}"
-        role_name, after_role_name_idx = skip_url(owl_text)
-        if role_name is None:
-            return None
-        inner_concept_text, _ = skip_url(owl_text, after_role_name_idx)
-        if inner_concept_text is None:
-            return None
-        inner_concept = decode_owl_axiom(inner_concept_text)
-        return RestrictionConcept(restriction, role_name, inner_concept)
-    elif owl_text.lower().find("objectcomplementof") != -1:
-        concept_text, _ = skip_url(owl_text)
-        if concept_text is None:
-            return None
-        concept = decode_owl_axiom(concept_text)
-        concept.polarity = "¬"
-        return concept
+    elif axiom_type == "ObjectPropertyAssertion":
+        axiom_class = RoleAssertion(axiom["role"], axiom["subject"], axiom["object"])
     else:
-        concept_text, _ = skip_url(owl_text)
-        if concept_text is None:
-            return None
-        return decode_owl_axiom(concept_text)
+        return NOT_SUPPORTED_CLASS
 
+    add_known_key(axiom_class, known_statement_keys)
+    return axiom_class
 
-def throw_dumb_explanations(axiom_expl):
-    """Eliminate dumb explanations:
-    E.g. "A_intersection_B is equivalent to the intersection of A and B"
-    a problem caused by the owlready complex classes representation"""
 
-    explanations = list()
-    for e in axiom_expl:
-        if e.strip() == "":
+def dumb_json_axiom(axiom, names):
+    """Whether an axiom of a JSON justification is a dumb explanation, or None if it
+    cannot be decoded. E.g. "A_intersection_B is equivalent to the intersection of A
+    and B", a problem caused by the owlready complex classes representation."""
+    if axiom["type"] != "EquivalentClasses":
+        return False
+    lhs_concept, rhs_concept = (json_concept(c, names) for c in axiom["operands"][:2])
+    if lhs_concept is None or rhs_concept is None:
+        return None
+    return lhs_concept == rhs_concept or (
+        isinstance(lhs_concept, JunctionConcept)
+        and isinstance(rhs_concept, JunctionConcept)
+        and {lhs_concept.lhs_concept, lhs_concept.rhs_concept}
+        == {rhs_concept.lhs_concept, rhs_concept.rhs_concept}
+    )  # A and B isEquivalentTo B and A
+
+
+def json_lines(data):
+    """The JSON objects of the lines of the Explainer output. A line that is not JSON
+    (anything else the JVM printed to stdout) is skipped with a warning."""
+    for line in data.splitlines():
+        if not line.strip():
             continue
+        try:
+            yield loads(line)
+        except JSONDecodeError:
+            logger.warning("Skipped a non-JSON line of the reasoner output: %r", line)
 
-        # Some explanations contain entailment axioms in owlapi
-        if "entailment" in e:
-            explanations.append(e)
-            continue
 
-        # Throw some explanations caused due to owlready's classes representation
-        if e.lower().find("equivalentclasses") != -1:
-            # break two sides, construct them and check if they are the same
-            split_idx = e.find(" ")
-            LHS_text = e[:split_idx]
-            RHS_text = e[split_idx + 1 :]
-            LHS_concept = construct_owl_concept(LHS_text)
-            RHS_concept = construct_owl_concept(RHS_text)
-            if LHS_concept is None or RHS_concept is None:
-                return None
-            if LHS_concept == RHS_concept:
-                continue
-            if (
-                isinstance(LHS_concept, JunctionConcept)
-                and isinstance(RHS_concept, JunctionConcept)
-                and {LHS_concept.lhs_concept, LHS_concept.rhs_concept}
-                == {RHS_concept.lhs_concept, RHS_concept.rhs_concept}
-            ):
-                continue  # A and B isEquivalentTo B and A
+def get_explained_axioms(data, known_statement_keys, names):
+    """Given the Explainer JSON output of explained entailments (one JSON line per
+    inferred axiom with its justification) return each inferred axiom as python class,
+    with its reasoning depth and its explanation (a list of LazyAxiom)."""
+    explained_axioms = list()
 
-        explanations.append(e)
-
-    return explanations
-
-
-def get_inferred_axioms_with_explanations(data, all2NL):
-    """Given the OWLAPI output (inferred axioms with their explanations in owl format)
-    return each inferred axiom in nl, with its reasoning depth,
-    and its explanation as a list of owl axioms"""
-
-    clean_instances = list()
-
-    regex = r"Explanation(.*?)EndOfExplanation"
-    matches = finditer(regex, data, DOTALL)
-
-    for match in matches:
-        owlapi_instance = match.group()
-
-        if (owlapi_instance == "") or (
-            owlapi_instance.find("Explanation\nEndOfExplanation") != -1
-        ):
+    for explained in json_lines(data):
+        axiom_class = json_axiom_class(
+            explained["entailment"], names, known_statement_keys
+        )
+        if axiom_class == NOT_SUPPORTED_CLASS or axiom_class is None:
+            logger.debug(
+                "Skipped an unsupported entailment: %s", explained["entailment"]
+            )
             continue
 
-        # First line will be the inferred axiom and remaining lines the explanation of it
-        splitted_instance = [s.strip() for s in owlapi_instance.splitlines()]
-
-        # Remove empty instances of InferredAxiom/Explanation got from owlapi
-        if "Explanation" in splitted_instance:
-            splitted_instance.remove("Explanation")
+        explanation = list()
+        decode_json_axiom = partial(json_axiom_class, names=names)
+        for axiom in explained["justification"]:
+            dumb = dumb_json_axiom(axiom, names)
+            if dumb is None:
+                logger.debug("Undecodable justification axiom: %s", axiom)
+                return None
+            if not dumb:
+                explanation.append(LazyAxiom(axiom, decode_json_axiom))
 
-        splitted_instance.remove("EndOfExplanation")
-        splitted_instance.remove("")
+        explained_axioms.append((axiom_class, len(explanation), explanation))
 
-        if len(splitted_instance) == 0 or "rdfs:comment" in splitted_instance[0]:
-            print("Found rdfs:comment")
-            return None
+    return explained_axioms
 
-        axiom_class = owl_axiom_class(splitted_instance[0], all2NL)
 
-        if axiom_class == NOT_SUPPORTED_CLASS:
-            print(f"Not-supported class.")
-            continue
+def get_inferred_axioms(data, known_statement_keys, names):
+    """Given the Explainer --infer output (one JSON line per inferred axiom, without
+    explanations) return each inferred axiom as a python class with its owl text,
+    which explain_entailments takes back."""
+    inferred_axioms = list()
 
-        if axiom_class is None:
+    for inferred in json_lines(data):
+        axiom_class = json_axiom_class(
+            inferred["entailment"], names, known_statement_keys
+        )
+        if axiom_class == NOT_SUPPORTED_CLASS or axiom_class is None:
+            logger.debug(
+                "Skipped an unsupported entailment: %s", inferred["entailment"]
+            )
             continue
 
-        if len(splitted_instance) == 1:
-            explanation = []
-        else:
-            explanation = splitted_instance[1:]
-            explanation = throw_dumb_explanations(splitted_instance[1:])
-            if explanation is None:
-                print(f"Explanation is none!")
-                return None
-            explanation = [owl_axiom_class(axiom) for axiom in explanation]
-
-        proof_depth = len(explanation)
-        clean_instances.append((axiom_class, proof_depth, explanation))
+        inferred_axioms.append((axiom_class, inferred["owl"]))
 
-    return clean_instances
+    return inferred_axioms
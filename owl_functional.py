@@ -0,0 +1,286 @@
+from common import (
+    AtomicConcept,
+    ConceptAssertion,
+    JunctionConcept,
+    RestrictionConcept,
+    RoleAssertion,
+)
+from nl_2_owl import SPECIAL_DOMAIN, SPECIAL_RANGE, special_axiom
+from owl_names import ClassNames
+
+ONTOLOGY_IRI = "http://alcq.org/onto.owl"
+OWL_THING = "owl:Thing"
+OWL_NOTHING = "owl:Nothing"
+# quantifier -> (OWL restriction, cardinality offset)
+CARDINALITY_RESTRICTIONS = {
+    ">": ("ObjectMinCardinality", 1),
+    "<": ("ObjectMaxCardinality", -1),
+    ">=": ("ObjectMinCardinality", 0),
+    "<=": ("ObjectMaxCardinality", 0),
+    "=": ("ObjectExactCardinality", 0),
+}
+
+
+def iri(name):
+    return f"<{ONTOLOGY_IRI}#{name}>"
+
+
+class FunctionalOntology:
+    """
+    The ontology of a KB in OWL functional syntax, built straight from the statements,
+    without owlready2. It has the same classes and axioms as the ontology
+    create_ontology saves, its classes named by the names table (a ClassNames shared
+    by the ontologies extending it). bytes() of it is the ontology document. It also
+    keeps its statements and the concepts of its classes, for the in-process reasoner
+    (see tableau.py).
+    """
+
+    def __init__(self, abox=(), tbox=(), names=None):
+        self.names = ClassNames() if names is None else names
+        self.axioms = dict()  # Insertion-ordered set of the axioms
+        self.individuals = dict()
+        self.role_domains = dict()
+        self.role_ranges = dict()
+        # Insertion-ordered set of the statements, each with its role if it is a
+        # domain or range axiom
+        self.statements = dict()
+        self.role_statements = dict()  # role name -> its domain or range statement
+        self.classes = dict()  # Insertion-ordered set of the concepts of the classes
+        for assertion in abox:
+            self.add_abox_assertion(assertion)
+        for axiom in tbox:
+            self.add_tbox_axiom(axiom)
+
+    def add(self, axiom):
+        self.axioms[axiom] = None
+
+    def copy(self):
+        ontology = FunctionalOntology(names=self.names)
+        ontology.axioms = self.axioms.copy()
+        ontology.individuals = self.individuals.copy()
+        ontology.role_domains = self.role_domains.copy()
+        ontology.role_ranges = self.role_ranges.copy()
+        ontology.statements = self.statements.copy()
+        ontology.role_statements = self.role_statements.copy()
+        ontology.classes = self.classes.copy()
+        return ontology
+
+    def named_class(self, concept, equivalent_class=None):
+        owl_class = iri(self.names.name(concept))
+        self.classes[concept] = None
+        self.add(f"Declaration(Class({owl_class}))")
+        if equivalent_class is not None:
+            self.add(f"EquivalentClasses({owl_class} {equivalent_class})")
+        return owl_class
+
+    def declare_role(
+        self, role_name, domain=OWL_THING, range=OWL_THING, statement=None
+    ):
+        # As in nl_2_owl, every use of a role sets its domain and range again
+        self.add(f"Declaration(ObjectProperty({iri(role_name)}))")
+        self.role_domains[role_name] = domain
+        self.role_ranges[role_name] = range
+        self.role_statements[role_name] = statement
+        return iri(role_name)
+
+    def declare_individual(self, name):
+        self.add(f"Declaration(NamedIndividual({iri(name)}))")
+        self.individuals[name] = None
+        return iri(name)
+
+    def atomic_concept(self, concept):
+        concept_name = concept.concept_name
+        positive = concept.polarity == "+"
+        if concept_name == "⊤":
+            return OWL_THING if positive else OWL_NOTHING
+        if concept_name == "⊥":
+            return OWL_NOTHING if positive else OWL_THING
+
+        if positive:
+            return self.named_class(concept)
+        positive_class = self.named_class(AtomicConcept("+", concept_name))
+        return self.named_class(concept, f"ObjectComplementOf({positive_class})")
+
+    def junction_concept(self, concept):
+        lhs_class = self.make_concept(concept.lhs_concept)
+        rhs_class = self.make_concept(concept.rhs_concept)
+        if concept.relationship == "⊓":
+            junction = f"ObjectIntersectionOf({lhs_class} {rhs_class})"
+        else:
+            junction = f"ObjectUnionOf({lhs_class} {rhs_class})"
+        return self.named_class(concept, junction)
+
+    def restriction_concept(self, concept):
+        inner_class = self.make_concept(concept.concept)
+        role = self.declare_role(concept.role_name)
+
+        if concept.restriction == "∀":
+            restriction = f"ObjectAllValuesFrom({role} {inner_class})"
+        elif concept.restriction == "∃":
+            restriction = f"ObjectSomeValuesFrom({role} {inner_class})"
+        else:
+            quantifier, quantity = concept.restriction.split()
+            owl_restriction, offset = CARDINALITY_RESTRICTIONS[quantifier]
+            restriction = (
+                f"{owl_restriction}({int(quantity) + offset} {role} {inner_class})"
+            )
+        return self.named_class(concept, restriction)
+
+    def make_concept(self, concept):
+        """Returns the class of the concept, as nl_2_owl.make_concept."""
+        if isinstance(concept, AtomicConcept):
+            return self.atomic_concept(concept)
+        elif isinstance(concept, JunctionConcept):
+            return self.junction_concept(concept)
+        elif isinstance(concept, RestrictionConcept):
+            return self.restriction_concept(concept)
+        raise TypeError("Unexpected type for concept: {}".format(type(concept)))
+
+    def add_abox_assertion(self, assertion):
+        self.statements[assertion] = None
+        if isinstance(assertion, ConceptAssertion):
+            concept = self.make_concept(assertion.concept)
+            individual = self.declare_individual(assertion.individual)
+            self.add(f"ClassAssertion({concept} {individual})")
+        else:
+            role = self.declare_role(assertion.RoleName)
+            left_individual = self.declare_individual(assertion.Individual_l)
+            right_individual = self.declare_individual(assertion.Individual_r)
+            self.add(
+                f"ObjectPropertyAssertion({role} {left_individual} {right_individual})"
+            )
+
+    def add_tbox_axiom(self, axiom):
+        special_check, special_type = special_axiom(axiom)
+        if special_check and special_type == SPECIAL_RANGE:
+            range_class = self.make_concept(axiom.RHS_concept.concept)
+            role_name = axiom.RHS_concept.role_name
+            self.statements[axiom] = role_name
+            self.declare_role(role_name, range=range_class, statement=axiom)
+        elif special_check and special_type == SPECIAL_DOMAIN:
+            domain_class = self.make_concept(axiom.RHS_concept)
+            role_name = axiom.LHS_concept.role_name
+            self.statements[axiom] = role_name
+            self.declare_role(role_name, domain=domain_class, statement=axiom)
+        else:
+            self.statements[axiom] = None
+            lhs_class = self.make_concept(axiom.LHS_concept)
+            rhs_class = self.make_concept(axiom.RHS_concept)
+            self.add(f"SubClassOf({lhs_class} {rhs_class})")
+
+    def add_statement(self, statement):
+        if isinstance(statement, (ConceptAssertion, RoleAssertion)):
+            self.add_abox_assertion(statement)
+        else:
+            self.add_tbox_axiom(statement)
+
+    def axiom_statements(self):
+        """The statements the axioms of the ontology state: a domain or range
+        statement is dropped once a later use of its role resets them (see
+        declare_role)."""
+        return [
+            statement
+            for statement, role_name in self.statements.items()
+            if role_name is None or self.role_statements.get(role_name) == statement
+        ]
+
+    def extended(self, statement):
+        """Returns a copy of the ontology with the statement added."""
+        ontology = self.copy()
+        ontology.add_statement(statement)
+        return ontology
+
+    def __bytes__(self):
+        lines = [
+            "Prefix(owl:=<http://www.w3.org/2002/07/owl#>)",
+            f"Ontology(<{ONTOLOGY_IRI}>",
+        ]
+        lines.extend(self.axioms)
+        for role_name, domain in self.role_domains.items():
+            if domain != OWL_THING:
+                lines.append(f"ObjectPropertyDomain({iri(role_name)} {domain})")
+        for role_name, range in self.role_ranges.items():
+            if range != OWL_THING:
+                lines.append(f"ObjectPropertyRange({iri(role_name)} {range})")
+        # We need to state this in OWA
+        if len(self.individuals) >= 2:
+            individuals = " ".join(iri(name) for name in self.individuals)
+            lines.append(f"DifferentIndividuals({individuals})")
+        lines.append(")")
+        return "\n".join(lines).encode("utf-8")
+
+
+def json_class(concept, names):
+    """The class of a concept as JsonRenderer renders it: its name in the names table,
+    or "Thing"/"Nothing"."""
+    if isinstance(concept, AtomicConcept) and concept.concept_name in ("⊤", "⊥"):
+        top = (concept.concept_name == "⊤") == (concept.polarity == "+")
+        return "Thing" if top else "Nothing"
+    return names.name(concept)
+
+
+def json_axiom(statement, names):
+    """The axiom of a statement as JsonRenderer renders it, which
+    owl_2_nl.json_axiom_class decodes back to the statement."""
+    if isinstance(statement, ConceptAssertion):
+        return {
+            "type": "ClassAssertion",
+            "class": json_class(statement.concept, names),
+            "individual": statement.individual,
+        }
+    if isinstance(statement, RoleAssertion):
+        return {
+            "type": "ObjectPropertyAssertion",
+            "role": statement.RoleName,
+            "subject": statement.Individual_l,
+            "object": statement.Individual_r,
+        }
+    return {
+        "type": "SubClassOf" if statement.Relationship == "⊑" else "EquivalentClasses",
+        "operands": [
+            json_class(statement.LHS_concept, names),
+            json_class(statement.RHS_concept, names),
+        ],
+    }
+
+
+class DeltaOntology:
+    """
+    A FunctionalOntology extended with a statement, kept as the base ontology and the
+    statement, so that a reasoner holding the base ontology loaded only needs the
+    axioms the statement adds (see ReasonerDaemon). bytes() of it is the document of
+    the whole extended ontology.
+    """
+
+    def __init__(self, base, statement):
+        self.base = base
+        self.statement = statement
+
+    def statement_ontology(self):
+        ontology = FunctionalOntology(names=self.base.names)
+        ontology.add_statement(self.statement)
+        return ontology
+
+    def adds_to_base(self):
+        """Whether the extended ontology is the base with the axioms of delta() added:
+        not if the statement uses a role the base sets a domain or range of, as that
+        use resets them (see declare_role). Otherwise it is checked from bytes()."""
+        return all(
+            self.base.role_domains.get(role_name, OWL_THING) == OWL_THING
+            and self.base.role_ranges.get(role_name, OWL_THING) == OWL_THING
+            for role_name in self.statement_ontology().role_domains
+        )
+
+    def delta(self):
+        """Returns the document of the axioms the statement adds to the base (see
+        adds_to_base)."""
+        delta = self.statement_ontology()
+        if not delta.individuals.keys() <= self.base.individuals.keys():
+            # New individuals are different from the base ones too
+            delta.individuals = {**self.base.individuals, **delta.individuals}
+        else:
+            delta.individuals = dict()
+        return bytes(delta)
+
+    def __bytes__(self):
+        return bytes(self.base.extended(self.statement))
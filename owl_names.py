@@ -0,0 +1,45 @@
+from common import AtomicConcept
+
+
+class ClassNames:
+    """
+    Naming table of the OWL classes of a KB: each concept of the KB ontology gets a
+    short class name (C0, C1, ...), and the name maps back to the concept, so that
+    owl_2_nl decodes a class with a lookup. The ontologies extending the KB ontology must use the same
+    table, so that a concept keeps its class.
+    """
+
+    PREFIX = "C"
+
+    def __init__(self):
+        self.names = dict()  # concept -> class name
+        # class name -> concept. owl:Thing and owl:Nothing are not in the table.
+        self.concepts = {
+            "Thing": AtomicConcept("+", "⊤"),
+            "Nothing": AtomicConcept("+", "⊥"),
+        }
+
+    def __len__(self):
+        return len(self.names)
+
+    def name(self, concept):
+        """Returns the class name of the concept, naming it if it is new."""
+        name = self.names.get(concept)
+        if name is None:
+            name = f"{self.PREFIX}{len(self.names)}"
+            self.names[concept] = name
+            self.concepts[name] = concept
+        return name
+
+    def concept(self, name):
+        """Returns the concept of a class name, or None if it is not in the table."""
+        return self.concepts.get(name)
+
+
+class OwlDocument(bytes):
+    """An OWL document (see save_ontology) with the ClassNames of its classes."""
+
+    def __new__(cls, document, names):
+        owl_document = super().__new__(cls, document)
+        owl_document.names = names
+        return owl_document
@@ -1,8 +1,16 @@
 package msc;
 
-import java.io.File;
+import java.io.ByteArrayInputStream;
+import java.io.DataInputStream;
+import java.io.IOException;
+import java.io.InputStream;
+import java.util.ArrayList;
+import java.util.HashSet;
+import java.util.List;
+import java.util.Set;
 import org.semanticweb.HermiT.ReasonerFactory;
 import org.semanticweb.owlapi.apibinding.OWLManager;
+import org.semanticweb.owlapi.model.OWLAxiom;
 import org.semanticweb.owlapi.model.OWLOntology;
 import org.semanticweb.owlapi.model.OWLOntologyCreationException;
 import org.semanticweb.owlapi.model.OWLOntologyManager;
@@ -10,17 +18,90 @@ import org.semanticweb.owlapi.reasoner.OWLReasoner;
 import org.semanticweb.owlapi.reasoner.OWLReasonerFactory;
 
 public class ConsistencyCheck {
-	public static void main(String[] args) throws OWLOntologyCreationException {
+	public static void main(String[] args) throws OWLOntologyCreationException, IOException {
+		if (args.length > 0 && args[0].equals("--batch")) {
+			// stdin: the ontology document, then the delta documents to check it with
+			List<OWLOntology> ontologies = loadDocuments(System.in);
+			OWLOntology onto = ontologies.get(0);
+			System.out.print(verdicts(areConsistentWith(onto, ontologies.subList(1, ontologies.size()))));
+			System.exit(0);
+		}
+
 		// ===================== L O A D  O N T O L O G Y ===================== //
-		OWLOntologyManager onto_manager = OWLManager.createOWLOntologyManager(); 
-		OWLOntology onto = onto_manager.loadOntologyFromOntologyDocument(new File("ALCQCC.owl"));
+		String ontology_path = args.length > 0 ? args[0] : "ALCQCC.owl";
+		OWLOntology onto = Explainer.loadOntology(ontology_path, System.in);
 		
-		// =========================== R E A S O N ============================ //
-		OWLReasonerFactory reasoner_factory = new ReasonerFactory();
-		OWLReasoner reasoner = reasoner_factory.createReasoner(onto);
-		if (reasoner.isConsistent() == false) {
+		if (isConsistent(onto) == false) {
 			System.out.println("INCONSISTENT ONTOLOGY!");
 		}
 		System.exit(0);
 	}
-}
\ No newline at end of file
+
+	// =========================== R E A S O N ============================ //
+	public static boolean isConsistent(OWLOntology onto) {
+		OWLReasonerFactory reasoner_factory = new ReasonerFactory();
+		OWLReasoner reasoner = reasoner_factory.createReasoner(onto);
+		try {
+			return reasoner.isConsistent();
+		} finally {
+			reasoner.dispose();
+		}
+	}
+
+	// Checks the consistency of the ontology extended with the axioms of each delta in
+	// turn. One reasoner serves the whole batch: the axioms of a delta are added, the
+	// reasoner takes them in on flush, and they are removed again for the next delta.
+	public static boolean[] areConsistentWith(OWLOntology onto, List<OWLOntology> deltas) {
+		OWLOntologyManager onto_manager = onto.getOWLOntologyManager();
+		OWLReasoner reasoner = new ReasonerFactory().createReasoner(onto);
+		boolean[] consistent = new boolean[deltas.size()];
+		try {
+			for (int i = 0; i < deltas.size(); i++) {
+				Set<OWLAxiom> added = addedAxioms(onto, deltas.get(i));
+				onto_manager.addAxioms(onto, added);
+				try {
+					reasoner.flush();
+					consistent[i] = reasoner.isConsistent();
+				} finally {
+					onto_manager.removeAxioms(onto, added);
+				}
+			}
+		} finally {
+			reasoner.dispose();
+		}
+		return consistent;
+	}
+
+	// The axioms of delta that are not in the ontology yet
+	public static Set<OWLAxiom> addedAxioms(OWLOntology onto, OWLOntology delta) {
+		Set<OWLAxiom> added = new HashSet<>();
+		delta.axioms().filter(axiom -> !onto.containsAxiom(axiom)).forEach(added::add);
+		return added;
+	}
+
+	// Loads the documents of a batch, each given as a line with its length in bytes
+	// followed by its bytes. Every document gets its own manager, since they share the
+	// ontology IRI.
+	public static List<OWLOntology> loadDocuments(InputStream input)
+			throws IOException, OWLOntologyCreationException {
+		DataInputStream in = new DataInputStream(input);
+		List<OWLOntology> ontologies = new ArrayList<>();
+		String header;
+		while ((header = ReasonerServer.readHeader(in)) != null) {
+			byte[] document = new byte[Integer.parseInt(header.trim())];
+			in.readFully(document);
+			OWLOntologyManager onto_manager = OWLManager.createOWLOntologyManager();
+			ontologies.add(onto_manager.loadOntologyFromOntologyDocument(new ByteArrayInputStream(document)));
+		}
+		return ontologies;
+	}
+
+	// One line per verdict: "true" if consistent, "false" otherwise
+	public static String verdicts(boolean[] consistent) {
+		StringBuilder lines = new StringBuilder();
+		for (boolean verdict : consistent) {
+			lines.append(verdict).append("\n");
+		}
+		return lines.toString();
+	}
+}
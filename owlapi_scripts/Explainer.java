@@ -1,13 +1,20 @@
 package msc;
 
 import java.io.File;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.PrintStream;
 import java.util.ArrayList;
+import java.util.Collections;
 import java.util.HashMap;
 import java.util.HashSet;
 import java.util.List;
 import java.util.Map;
 import java.util.Set;
 import java.util.Stack;
+import java.util.function.BooleanSupplier;
 import java.util.function.Supplier;
 import org.semanticweb.HermiT.ReasonerFactory;
 import org.semanticweb.owl.explanation.api.Explanation;
@@ -43,15 +50,6 @@ import org.semanticweb.owlapi.util.InferredSubClassAxiomGenerator;
 
 public class Explainer {
 
-    public static void explain(OWLAxiom entailment, ExplanationGenerator<OWLAxiom> explanation_generator) {
-        try {
-            Set<Explanation<OWLAxiom>> explanations = explanation_generator.getExplanations(entailment, 1);
-            explanations.forEach(System.out::println);
-            System.out.println("EndOfExplanation\n");
-        } catch (Exception e) {
-        }
-    };
-
     // This method replicates code existing in the owlexplanation project;
     // it's needed because the factories in owlexplanation do not set
     // InitialEntailmentCheckStrategy correctly
@@ -65,58 +63,145 @@ public class Explainer {
         return new BlackBoxExplanationGeneratorFactory<>(config);
     };
 
-    public static void main(String[] args) throws OWLOntologyCreationException {
+    // Usage: Explainer --infer [ontology path, or "-" for stdin]
+    //        Explainer --explain-entailments < ontology and entailments documents
+    // --infer prints the inferred axioms without their explanations, and
+    // --explain-entailments explains only the given ones (see ReasonerServer for the
+    // documents format), so that the explanations can be computed on demand. Both
+    // print one JSON line per axiom (see inferOntology and explainJson).
+    public static void main(String[] args) throws OWLOntologyCreationException, IOException {
+        PrintStream out = new PrintStream(new FileOutputStream(FileDescriptor.out), false, "UTF-8");
+        // Anything the libraries print must not end up between the JSON lines
+        System.setOut(System.err);
+
+        if (args.length > 0 && args[0].equals("--explain-entailments")) {
+            List<OWLOntology> ontologies = ConsistencyCheck.loadDocuments(System.in);
+            explainEntailments(ontologies.get(0), ontologies.get(1), out, () -> false);
+            out.flush();
+            System.exit(0);
+        }
+        if (args.length == 0 || !args[0].equals("--infer")) {
+            System.err.println("Usage: Explainer --infer [ontology path] | --explain-entailments");
+            System.exit(2);
+        }
+
         // ===================== L O A D O N T O L O G Y ===================== //
+        String ontology_path = args.length > 1 ? args[1] : "ALCQ_ontology.owl";
+        OWLOntology onto = loadOntology(ontology_path, System.in);
+
+        inferOntology(onto, out);
+        out.flush();
+        System.exit(0);
+    }
+
+    // Loads the ontology document at ontology_path, or from stdin if the path is "-"
+    public static OWLOntology loadOntology(String ontology_path, InputStream stdin)
+            throws OWLOntologyCreationException {
         OWLOntologyManager onto_manager = OWLManager.createOWLOntologyManager();
-        OWLOntology onto = onto_manager.loadOntologyFromOntologyDocument(new File("ALCQ_ontology.owl"));
+        if (ontology_path.equals("-")) {
+            return onto_manager.loadOntologyFromOntologyDocument(stdin);
+        }
+        return onto_manager.loadOntologyFromOntologyDocument(new File(ontology_path));
+    }
 
-        OWLDataFactory data_factory = onto.getOWLOntologyManager().getOWLDataFactory();
+    // Prints the explanation of one entailment as a JSON line (see JsonRenderer):
+    // {"entailment": <axiom>, "justification": [<axiom>, ...]}
+    public static void explainJson(OWLAxiom entailment, ExplanationGenerator<OWLAxiom> explanation_generator,
+            PrintStream out) {
+        try {
+            for (Explanation<OWLAxiom> explanation : explanation_generator.getExplanations(entailment, 1)) {
+                List<String> justification = new ArrayList<String>();
+                explanation.getAxioms().forEach(axiom -> justification.add(JsonRenderer.axiom(axiom)));
+                Collections.sort(justification);
+                out.println("{\"entailment\": " + JsonRenderer.axiom(entailment) + ", \"justification\": ["
+                        + String.join(", ", justification) + "]}");
+            }
+            out.flush(); // Each explanation is read as soon as it is printed
+        } catch (Exception e) {
+        }
+    }
 
-        // =========================== R E A S O N ============================ //
-        OWLReasonerFactory reasoner_factory = new ReasonerFactory();
-        OWLReasoner reasoner = reasoner_factory.createReasoner(onto);
-        if (reasoner.isConsistent() == false) {
-            System.out.println("INCONSISTENT ONTOLOGY!");
-            System.exit(0);
+    // Prints the inferred axioms of the ontology to out, without their explanations,
+    // or the inconsistency/incoherence message. Each axiom is a JSON line
+    // {"entailment": <axiom>, "owl": <the axiom in functional syntax>}
+    public static void inferOntology(OWLOntology onto, PrintStream out) throws OWLOntologyCreationException {
+        OWLOntology inferred_axioms_onto = inferredOntology(onto, out);
+        if (inferred_axioms_onto != null) {
+            inferred_axioms_onto.logicalAxioms().forEach(axiom -> out.println("{\"entailment\": "
+                    + JsonRenderer.axiom(axiom) + ", \"owl\": " + JsonRenderer.string(axiom.toString()) + "}"));
+            onto.getOWLOntologyManager().removeOntology(inferred_axioms_onto);
         }
+    }
 
-        // =========================== U N S A T C L A S S E S
-        // ============================ //
-        if (reasoner.getUnsatisfiableClasses().getEntitiesMinusBottom().size() > 0) {
-            System.out.println("INCOHERENT ONTOLOGY!\n");
-            System.exit(0);
+    // Prints the explanation of each logical axiom of entailments in the ontology as a
+    // JSON line (see explainJson), until stop returns true
+    public static void explainEntailments(OWLOntology onto, OWLOntology entailments, PrintStream out,
+            BooleanSupplier stop) {
+        ExplanationGenerator<OWLAxiom> explanation_generator = explanationGenerator(onto);
+        for (OWLAxiom entailment : entailments.logicalAxioms().toArray(OWLAxiom[]::new)) {
+            if (stop.getAsBoolean()) {
+                break;
+            }
+            explainJson(entailment, explanation_generator, out);
         }
+    }
+
+    private static ExplanationGenerator<OWLAxiom> explanationGenerator(OWLOntology onto) {
+        // =========================== E X P L A I N =========================== //
+        ExplanationGeneratorFactory<OWLAxiom> explanation_generator_factory = createExplanationGeneratorFactory(
+                new ReasonerFactory(), null, OWLManager::createOWLOntologyManager);
+        return explanation_generator_factory.createExplanationGenerator(onto);
+    }
 
-        List<InferredAxiomGenerator<? extends OWLAxiom>> inferred_axiom_generator = new ArrayList<InferredAxiomGenerator<? extends OWLAxiom>>();
+    // Returns a new ontology (of the ontology's manager) with the inferred axioms of the
+    // ontology, or null after printing the inconsistency/incoherence message.
+    private static OWLOntology inferredOntology(OWLOntology onto, PrintStream out)
+            throws OWLOntologyCreationException {
+        OWLOntologyManager onto_manager = onto.getOWLOntologyManager();
+        OWLDataFactory data_factory = onto_manager.getOWLDataFactory();
 
-        // For these types of axioms we care //
-        inferred_axiom_generator.add(new InferredClassAssertionAxiomGenerator());
-        inferred_axiom_generator.add(new InferredSubClassAxiomGenerator());
-        inferred_axiom_generator.add(new InferredPropertyAssertionGenerator());
+        // =========================== R E A S O N ============================ //
+        OWLReasonerFactory reasoner_factory = new ReasonerFactory();
+        OWLReasoner reasoner = reasoner_factory.createReasoner(onto);
+        try {
+            if (reasoner.isConsistent() == false) {
+                out.println("INCONSISTENT ONTOLOGY!");
+                return null;
+            }
 
-        // Create a new ontology just for the inferred axioms //
-        OWLOntology inferred_axioms_onto = onto_manager.createOntology();
-        InferredOntologyGenerator inferred_onto_generator = new InferredOntologyGenerator(reasoner,
-                inferred_axiom_generator);
-        inferred_onto_generator.fillOntology(data_factory, inferred_axioms_onto);
-        inferred_axioms_onto.addAxioms(onto.axioms());
+            // =========================== U N S A T C L A S S E S
+            // ============================ //
+            if (reasoner.getUnsatisfiableClasses().getEntitiesMinusBottom().size() > 0) {
+                out.println("INCOHERENT ONTOLOGY!\n");
+                return null;
+            }
 
-        // Adds negated assertions, e.g., if A subclassOf B, D subclass of C,
-        // disjoint(B, C), A(a), it generates: \not D(a), \not C(a).
-        inferred_axioms_onto.addAxioms(negativeAssertionsGeneration(inferred_axioms_onto, onto_manager, data_factory));
+            List<InferredAxiomGenerator<? extends OWLAxiom>> inferred_axiom_generator = new ArrayList<InferredAxiomGenerator<? extends OWLAxiom>>();
 
-        // Adds the transitive closure of subclass of, e.g., if A subclassof B, B
-        // subclass of C, it generates: A subclass of C.
-        addTransitiveClosureOfSubclassOf(inferred_axioms_onto, onto_manager, data_factory);
+            // For these types of axioms we care //
+            inferred_axiom_generator.add(new InferredClassAssertionAxiomGenerator());
+            inferred_axiom_generator.add(new InferredSubClassAxiomGenerator());
+            inferred_axiom_generator.add(new InferredPropertyAssertionGenerator());
 
-        // =========================== E X P L A I N =========================== //
-        ExplanationGeneratorFactory<OWLAxiom> explanation_generator_factory = createExplanationGeneratorFactory(
-                reasoner_factory, null, OWLManager::createOWLOntologyManager);
-        ExplanationGenerator<OWLAxiom> explanation_generator = explanation_generator_factory
-                .createExplanationGenerator(onto);
+            // Create a new ontology just for the inferred axioms //
+            OWLOntology inferred_axioms_onto = onto_manager.createOntology();
+            InferredOntologyGenerator inferred_onto_generator = new InferredOntologyGenerator(reasoner,
+                    inferred_axiom_generator);
+            inferred_onto_generator.fillOntology(data_factory, inferred_axioms_onto);
+            inferred_axioms_onto.addAxioms(onto.axioms());
 
-        inferred_axioms_onto.logicalAxioms().forEach(e -> explain(e, explanation_generator));
-        System.exit(0);
+            // Adds negated assertions, e.g., if A subclassOf B, D subclass of C,
+            // disjoint(B, C), A(a), it generates: \not D(a), \not C(a).
+            inferred_axioms_onto
+                    .addAxioms(negativeAssertionsGeneration(inferred_axioms_onto, onto_manager, data_factory));
+
+            // Adds the transitive closure of subclass of, e.g., if A subclassof B, B
+            // subclass of C, it generates: A subclass of C.
+            addTransitiveClosureOfSubclassOf(inferred_axioms_onto, onto_manager, data_factory);
+            return inferred_axioms_onto;
+        } finally {
+            reasoner.dispose();
+        }
     }
 
     public static OWLOntology addTransitiveClosureOfSubclassOf(OWLOntology inferred_axioms_onto,
@@ -0,0 +1,117 @@
+package msc;
+
+import java.util.List;
+import java.util.stream.Collectors;
+import java.util.stream.Stream;
+import org.semanticweb.owlapi.model.OWLAxiom;
+import org.semanticweb.owlapi.model.OWLClassAssertionAxiom;
+import org.semanticweb.owlapi.model.OWLClassExpression;
+import org.semanticweb.owlapi.model.OWLEquivalentClassesAxiom;
+import org.semanticweb.owlapi.model.OWLIndividual;
+import org.semanticweb.owlapi.model.OWLNaryBooleanClassExpression;
+import org.semanticweb.owlapi.model.OWLObjectCardinalityRestriction;
+import org.semanticweb.owlapi.model.OWLObjectComplementOf;
+import org.semanticweb.owlapi.model.OWLObjectPropertyAssertionAxiom;
+import org.semanticweb.owlapi.model.OWLObjectPropertyExpression;
+import org.semanticweb.owlapi.model.OWLQuantifiedObjectRestriction;
+import org.semanticweb.owlapi.model.OWLSubClassOfAxiom;
+
+// Renders axioms as JSON objects for the Explainer output, so that they are decoded
+// without parsing their text:
+//   {"type": "ClassAssertion", "class": <class>, "individual": <name>}
+//   {"type": "SubClassOf" or "EquivalentClasses", "operands": [<class>, ...]}
+//   {"type": "ObjectPropertyAssertion", "role": <name>, "subject": <name>, "object": <name>}
+//   {"type": <any other axiom type>}
+// A named class is its IRI fragment (owl:Thing is "Thing"), any other class is
+//   {"type": "ObjectIntersectionOf" or "ObjectUnionOf" or "ObjectComplementOf", "operands": [<class>, ...]}
+//   {"type": "ObjectSomeValuesFrom" or "ObjectAllValuesFrom", "role": <name>, "filler": <class>}
+//   {"type": "ObjectMinCardinality" or "ObjectMaxCardinality" or "ObjectExactCardinality",
+//    "role": <name>, "cardinality": <number>, "filler": <class>}
+public class JsonRenderer {
+
+    public static String axiom(OWLAxiom axiom) {
+        StringBuilder json = new StringBuilder("{\"type\": ").append(string(axiom.getAxiomType().getName()));
+        if (axiom instanceof OWLClassAssertionAxiom) {
+            OWLClassAssertionAxiom assertion = (OWLClassAssertionAxiom) axiom;
+            json.append(", \"class\": ").append(classExpression(assertion.getClassExpression()));
+            json.append(", \"individual\": ").append(individual(assertion.getIndividual()));
+        } else if (axiom instanceof OWLSubClassOfAxiom) {
+            OWLSubClassOfAxiom subclass_axiom = (OWLSubClassOfAxiom) axiom;
+            json.append(", \"operands\": ")
+                    .append(classExpressions(Stream.of(subclass_axiom.getSubClass(), subclass_axiom.getSuperClass())));
+        } else if (axiom instanceof OWLEquivalentClassesAxiom) {
+            OWLEquivalentClassesAxiom equivalence = (OWLEquivalentClassesAxiom) axiom;
+            json.append(", \"operands\": ").append(classExpressions(equivalence.classExpressions()));
+        } else if (axiom instanceof OWLObjectPropertyAssertionAxiom) {
+            OWLObjectPropertyAssertionAxiom assertion = (OWLObjectPropertyAssertionAxiom) axiom;
+            json.append(", \"role\": ").append(role(assertion.getProperty()));
+            json.append(", \"subject\": ").append(individual(assertion.getSubject()));
+            json.append(", \"object\": ").append(individual(assertion.getObject()));
+        }
+        return json.append("}").toString();
+    }
+
+    public static String axioms(List<OWLAxiom> axioms) {
+        return axioms.stream().map(JsonRenderer::axiom).collect(Collectors.joining(", ", "[", "]"));
+    }
+
+    public static String classExpression(OWLClassExpression expression) {
+        String type = expression.getClassExpressionType().getName();
+        switch (expression.getClassExpressionType()) {
+            case OWL_CLASS:
+                return string(expression.asOWLClass().getIRI().getShortForm());
+            case OBJECT_INTERSECTION_OF:
+            case OBJECT_UNION_OF:
+                return "{\"type\": " + string(type) + ", \"operands\": "
+                        + classExpressions(((OWLNaryBooleanClassExpression) expression).operands()) + "}";
+            case OBJECT_COMPLEMENT_OF:
+                return "{\"type\": " + string(type) + ", \"operands\": "
+                        + classExpressions(Stream.of(((OWLObjectComplementOf) expression).getOperand())) + "}";
+            case OBJECT_SOME_VALUES_FROM:
+            case OBJECT_ALL_VALUES_FROM: {
+                OWLQuantifiedObjectRestriction restriction = (OWLQuantifiedObjectRestriction) expression;
+                return "{\"type\": " + string(type) + ", \"role\": " + role(restriction.getProperty())
+                        + ", \"filler\": " + classExpression(restriction.getFiller()) + "}";
+            }
+            case OBJECT_MIN_CARDINALITY:
+            case OBJECT_MAX_CARDINALITY:
+            case OBJECT_EXACT_CARDINALITY: {
+                OWLObjectCardinalityRestriction restriction = (OWLObjectCardinalityRestriction) expression;
+                return "{\"type\": " + string(type) + ", \"role\": " + role(restriction.getProperty())
+                        + ", \"cardinality\": " + restriction.getCardinality() + ", \"filler\": "
+                        + classExpression(restriction.getFiller()) + "}";
+            }
+            default:
+                return "{\"type\": " + string(type) + "}";
+        }
+    }
+
+    private static String classExpressions(Stream<OWLClassExpression> expressions) {
+        return expressions.map(JsonRenderer::classExpression).collect(Collectors.joining(", ", "[", "]"));
+    }
+
+    private static String role(OWLObjectPropertyExpression role) {
+        return string(role.getNamedProperty().getIRI().getShortForm());
+    }
+
+    private static String individual(OWLIndividual individual) {
+        if (individual.isNamed()) {
+            return string(individual.asOWLNamedIndividual().getIRI().getShortForm());
+        }
+        return string(individual.toStringID());
+    }
+
+    public static String string(String text) {
+        StringBuilder json = new StringBuilder("\"");
+        for (char c : text.toCharArray()) {
+            if (c == '"' || c == '\\') {
+                json.append('\\').append(c);
+            } else if (c < 0x20) {
+                json.append(String.format("\\u%04x", (int) c));
+            } else {
+                json.append(c);
+            }
+        }
+        return json.append("\"").toString();
+    }
+}
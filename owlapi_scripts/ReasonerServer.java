@@ -0,0 +1,225 @@
+package msc;
+
+import java.io.BufferedInputStream;
+import java.io.BufferedOutputStream;
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.DataInputStream;
+import java.io.File;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.IOException;
+import java.io.OutputStream;
+import java.io.PrintStream;
+import java.nio.charset.StandardCharsets;
+import java.util.Arrays;
+import java.util.HashSet;
+import java.util.List;
+import java.util.Set;
+import org.semanticweb.owlapi.apibinding.OWLManager;
+import org.semanticweb.owlapi.model.OWLAxiom;
+import org.semanticweb.owlapi.model.OWLOntology;
+import org.semanticweb.owlapi.model.OWLOntologyManager;
+
+// Long-lived reasoner process serving the Explainer and the consistency check, so that
+// the JVM and HermiT are loaded once per generation run instead of once per ontology.
+//
+// Requests and responses are frames on stdin/stdout: a header line "<OP> <length>\n"
+// followed by <length> bytes of UTF-8 payload. The response of EXPLAIN_ENTAILMENTS is
+// streamed: one PART frame per explanation, before its final frame.
+//   CONSISTENT <ontology path>  -> OK <what ConsistencyCheck prints for the ontology>
+//   CONSISTENT_DATA <ontology document>
+//                               -> the same, for an ontology sent in the request
+//   BASE <ontology document>    -> OK, after loading the ontology as the base ontology
+//   CONSISTENT_DELTA <ontology document>
+//                               -> OK <what ConsistencyCheck prints for the base
+//                                  ontology with the axioms of the document added>
+//   CONSISTENT_BATCH <delta documents, each after a line with its length in bytes>
+//                               -> OK <one line per delta, "true" if the base ontology
+//                                  with the axioms of the delta added is consistent>
+//   INFER_BASE                  -> OK <what Explainer --infer prints for the base
+//                                  ontology: its inferred axioms, one JSON line each>
+//   EXPLAIN_ENTAILMENTS <ontology document>
+//                               -> PART <the JSON line Explainer prints for the
+//                                  explanation of an axiom of the document, in the
+//                                  base ontology>
+//                                  for each axiom, then OK
+//   STOP                        -> STOPPED. Sent during EXPLAIN_ENTAILMENTS, it stops
+//                                  the explanations: the request is answered with OK
+//                                  after the current one, then STOP with STOPPED.
+//   PING                        -> OK
+//   QUIT                        -> the server exits
+// A request that fails is answered with ERROR <message> and the server keeps serving.
+public class ReasonerServer {
+
+    // The ontology loaded by the last BASE request
+    private static OWLOntology base = null;
+    private static DataInputStream in;
+    private static OutputStream out;
+    // Whether a STOP arrived during the current request
+    private static boolean stop_received = false;
+    // The operations on the base ontology
+    private static final Set<String> BASE_OPERATIONS = new HashSet<>(Arrays.asList("INFER_BASE",
+            "EXPLAIN_ENTAILMENTS", "CONSISTENT_DELTA", "CONSISTENT_BATCH"));
+
+    public static void main(String[] args) throws IOException {
+        in = new DataInputStream(new BufferedInputStream(System.in));
+        out = new BufferedOutputStream(new FileOutputStream(FileDescriptor.out));
+        // Anything the libraries print must not end up between the frames
+        System.setOut(System.err);
+
+        String header;
+        while ((header = readHeader(in)) != null) {
+            String[] fields = header.trim().split(" ");
+            String operation = fields[0];
+            int length = fields.length > 1 ? Integer.parseInt(fields[1]) : 0;
+            byte[] payload = new byte[length];
+            in.readFully(payload);
+
+            if (operation.equals("QUIT")) {
+                break;
+            }
+            if (operation.equals("STOP")) { // The request it was sent for had already ended
+                writeFrame(out, "STOPPED", "");
+                continue;
+            }
+
+            String status = "OK";
+            String response;
+            try {
+                response = handle(operation, payload);
+            } catch (Exception e) {
+                status = "ERROR";
+                response = String.valueOf(e);
+            }
+            writeFrame(out, status, response);
+            if (stop_received) {
+                stop_received = false;
+                writeFrame(out, "STOPPED", "");
+            }
+        }
+        System.exit(0);
+    }
+
+    public static String handle(String operation, byte[] payload) throws Exception {
+        if (operation.equals("PING")) {
+            return "";
+        }
+
+        OWLOntologyManager onto_manager = OWLManager.createOWLOntologyManager();
+        if (operation.equals("BASE")) {
+            base = onto_manager.loadOntologyFromOntologyDocument(new ByteArrayInputStream(payload));
+            return "";
+        }
+
+        OWLOntology onto;
+        if (BASE_OPERATIONS.contains(operation)) {
+            if (base == null) {
+                throw new IllegalStateException("No base ontology loaded");
+            }
+            onto = base;
+        } else if (operation.endsWith("_DATA")) {
+            onto = onto_manager.loadOntologyFromOntologyDocument(new ByteArrayInputStream(payload));
+            operation = operation.substring(0, operation.length() - "_DATA".length());
+        } else {
+            String ontology_path = new String(payload, StandardCharsets.UTF_8);
+            onto = onto_manager.loadOntologyFromOntologyDocument(new File(ontology_path));
+        }
+
+        ByteArrayOutputStream buffer = new ByteArrayOutputStream();
+        PrintStream response = new PrintStream(buffer, true, "UTF-8");
+        if (operation.equals("INFER_BASE")) {
+            Explainer.inferOntology(onto, response);
+        } else if (operation.equals("EXPLAIN_ENTAILMENTS")) {
+            OWLOntology entailments = onto_manager.loadOntologyFromOntologyDocument(new ByteArrayInputStream(payload));
+            PrintStream parts = new PrintStream(new PartOutputStream(), false, "UTF-8");
+            Explainer.explainEntailments(onto, entailments, parts, ReasonerServer::stopReceived);
+            parts.flush();
+        } else if (operation.equals("CONSISTENT")) {
+            if (ConsistencyCheck.isConsistent(onto) == false) {
+                response.println("INCONSISTENT ONTOLOGY!");
+            }
+        } else if (operation.equals("CONSISTENT_DELTA")) {
+            OWLOntology delta = onto_manager.loadOntologyFromOntologyDocument(new ByteArrayInputStream(payload));
+            if (isConsistentWith(onto, delta) == false) {
+                response.println("INCONSISTENT ONTOLOGY!");
+            }
+        } else if (operation.equals("CONSISTENT_BATCH")) {
+            List<OWLOntology> deltas = ConsistencyCheck.loadDocuments(new ByteArrayInputStream(payload));
+            response.print(ConsistencyCheck.verdicts(ConsistencyCheck.areConsistentWith(onto, deltas)));
+        } else {
+            throw new IllegalArgumentException("Unknown operation: " + operation);
+        }
+        response.flush();
+        return buffer.toString("UTF-8");
+    }
+
+    // Checks the consistency of the ontology with the axioms of delta added, then
+    // removes them again, so that the ontology is not parsed again for every delta
+    private static boolean isConsistentWith(OWLOntology onto, OWLOntology delta) {
+        Set<OWLAxiom> added = ConsistencyCheck.addedAxioms(onto, delta);
+        OWLOntologyManager onto_manager = onto.getOWLOntologyManager();
+        onto_manager.addAxioms(onto, added);
+        try {
+            return ConsistencyCheck.isConsistent(onto);
+        } finally {
+            onto_manager.removeAxioms(onto, added);
+        }
+    }
+
+    // Whether a STOP frame is waiting on stdin (or was read already)
+    private static boolean stopReceived() {
+        try {
+            if (!stop_received && in.available() > 0) {
+                String header = readHeader(in);
+                stop_received = header != null && header.startsWith("STOP");
+            }
+        } catch (IOException e) {
+            stop_received = true;
+        }
+        return stop_received;
+    }
+
+    // Writes what is printed to it as a PART frame on every flush
+    private static class PartOutputStream extends OutputStream {
+        private final ByteArrayOutputStream part = new ByteArrayOutputStream();
+
+        @Override
+        public void write(int b) {
+            part.write(b);
+        }
+
+        @Override
+        public void write(byte[] b, int off, int len) {
+            part.write(b, off, len);
+        }
+
+        @Override
+        public void flush() throws IOException {
+            if (part.size() > 0) {
+                writeFrame(out, "PART", part.toString("UTF-8"));
+                part.reset();
+            }
+        }
+    }
+
+    // Reads a header line, or returns null at the end of the input
+    static String readHeader(DataInputStream in) throws IOException {
+        ByteArrayOutputStream line = new ByteArrayOutputStream();
+        int b;
+        while ((b = in.read()) != '\n') {
+            if (b == -1) {
+                return line.size() > 0 ? line.toString("UTF-8") : null;
+            }
+            line.write(b);
+        }
+        return line.toString("UTF-8");
+    }
+
+    private static void writeFrame(OutputStream out, String status, String payload) throws IOException {
+        byte[] bytes = payload.getBytes(StandardCharsets.UTF_8);
+        out.write((status + " " + bytes.length + "\n").getBytes(StandardCharsets.UTF_8));
+        out.write(bytes);
+        out.flush();
+    }
+}
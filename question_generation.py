@@ -1,12 +1,16 @@
 from random import choice
 from common import *
-from utils import alcq_negate, parse_abox_assertion, parse_tbox_axiom
+from utils import alcq_negate, canonical_key
 from add_ontology_axiom import KB_union_unknown_axiom
-from subprocess import Popen, PIPE, TimeoutExpired
-from grammar_utils import generate_random_statement
-from os import setsid, killpg
-from signal import SIGTERM
-from global_variables import INCONSISTENCY_MSG
+from owl_functional import FunctionalOntology
+from reasoner import (
+    DEFAULT_REASONER,
+    ReasonerTimeout,
+    ReasonerError,
+    run_requests,
+    run_requests_async,
+)
+from global_variables import UNKNOWN_CHECK_TIMEOUT, UNKNOWN_OVERSAMPLING
 
 
 def make_true_question(question_ID, axiom, depth, explanation, axiom_nl=None):
@@ -185,6 +189,22 @@ def get_subclass_false_questions(theory, inferred_axioms):
     return subclass_false_questions_dict
 
 
+def covers_depths(theory, inferred_axioms, max_depth):
+    """Whether the inferred axioms have what make_true_questions and
+    make_false_questions need for every depth up to max_depth."""
+    true_depths = {ia["depth"] for ia in inferred_axioms}
+    false_depths = {
+        ia["depth"]
+        for ia in inferred_axioms
+        if isinstance(ia["axiom"], ConceptAssertion)
+    }
+    false_depths.update(get_subclass_false_questions(theory, inferred_axioms))
+    return all(
+        depth in true_depths and depth in false_depths
+        for depth in range(1, max_depth + 1)
+    )
+
+
 def make_false_questions(qID, theory, concept_assertions, inferred_axioms, max_depth):
     def make_false_question(qID, axiom, depth, expl):
         return {
@@ -258,10 +278,11 @@ def make_false_questions(qID, theory, concept_assertions, inferred_axioms, max_d
     return questions
 
 
-def is_unknown(random_unknown_axiom, all_statements_NL):
+def is_known(random_unknown_axiom, known_statement_keys):
+    """known_statement_keys holds the canonical keys of the context and inferred axioms."""
     # Check if unknown is in inferred axioms
-    if random_unknown_axiom in all_statements_NL:
-        return False
+    if canonical_key(random_unknown_axiom) in known_statement_keys:
+        return True
 
     neg_random_unknown_axiom = None
 
@@ -271,80 +292,139 @@ def is_unknown(random_unknown_axiom, all_statements_NL):
         neg_random_unknown_axiom = ConceptAssertion(negated_concept, individual)
 
     if (neg_random_unknown_axiom is not None) and (
-        neg_random_unknown_axiom in all_statements_NL
+        canonical_key(neg_random_unknown_axiom) in known_statement_keys
     ):  # If \not(UnknownAxiom) in inferred -> False Question
-        return False
-
-    # Otherwise, we have to make the consistency check
-    try:
-        KB_union_unknown_axiom(random_unknown_axiom)
-    except:
-        return False
-
-    owlapi_output = str()
-    with Popen(
-        ["java", "-jar", "./ConsistencyChecker.jar"],
-        stdout=PIPE,
-        universal_newlines=True,
-        preexec_fn=setsid,
-    ) as process:
-        try:
-            owlapi_output = process.communicate(timeout=3)[0]
-        except TimeoutExpired:
-            killpg(process.pid, SIGTERM)
-            return False
+        return True
 
-    if INCONSISTENCY_MSG in owlapi_output:
-        return False
-    return True
+    return False
 
 
-def generate_unknown_questions(qID, num_of_unknown_questions, grammar, all2NL):
-    """Generate questions with "Unknown" label.
-    Generates a random statement, and if it doesn't appear in any inferred axiom,
-    or in the context, then it is valid."""
+def search_unknown_questions(
+    qID, num_of_unknown_questions, grammar, known_statement_keys, ontology
+):
+    """Generator behind generate_unknown_questions, leaving the consistency checks to
+    run_requests: it requests the checks of batches of extensions of the KB ontology,
+    one per candidate statement. Returns the unknown questions, or None.
+    known_statement_keys holds the canonical keys of the context and inferred axioms;
+    the keys of the unknown questions are added to it."""
     unknown_questions = list()
     unknown_questions_counter = 0
     tries = 0
     max_tries = 20
+    # The extensions of a FunctionalOntology share it as the base of their batch
+    oversampling = (
+        UNKNOWN_OVERSAMPLING if isinstance(ontology, FunctionalOntology) else 1
+    )
     while (unknown_questions_counter < num_of_unknown_questions) and (
         tries <= max_tries
     ):
-        if choice([0, 1]) % 2:  # Random ABox Assertion
-            random_unknown_statement = generate_random_statement(
-                grammar, "ABoxAssertion"
-            )
-            random_unknown_axiom = parse_abox_assertion(random_unknown_statement)
-        else:  # Random TBox Axiom
-            random_unknown_statement = generate_random_statement(grammar, "TBoxAxiom")
-            random_unknown_axiom = parse_tbox_axiom(random_unknown_statement)
-
-        ## Unknownment Check! ##
-        if is_unknown(random_unknown_axiom, all2NL) == False:
-            tries += 1
+        # Over-sample the candidates, so that one batch of checks is usually enough
+        candidates = list()
+        cc_ontologies = list()
+        batch_size = oversampling * (
+            num_of_unknown_questions - unknown_questions_counter
+        )
+        for _ in range(batch_size):
+            if choice([0, 1]) % 2:  # Random ABox Assertion
+                _, random_unknown_axiom = grammar.pool("ABoxAssertion").pop()
+            else:  # Random TBox Axiom
+                _, random_unknown_axiom = grammar.pool("TBoxAxiom").pop()
+
+            ## Unknownment Check! ##
+            if is_known(random_unknown_axiom, known_statement_keys):
+                tries += 1
+                continue
+
+            # Otherwise, we have to make the consistency check
+            try:
+                cc_ontology = KB_union_unknown_axiom(random_unknown_axiom, ontology)
+            except:
+                tries += 1
+                continue
+            candidates.append(random_unknown_axiom)
+            cc_ontologies.append(cc_ontology)
+
+        if not candidates:
             continue
+        try:
+            verdicts = yield (
+                "check_consistency_batch",
+                cc_ontologies,
+                UNKNOWN_CHECK_TIMEOUT * len(cc_ontologies),
+            )
+        except (ReasonerTimeout, ReasonerError) as ex:
+            # Those of the checks before the one that failed, if any
+            verdicts = getattr(ex, "verdicts", None) or []
+        # The candidates left unchecked count as inconsistent
+        verdicts = list(verdicts) + [False] * (len(candidates) - len(verdicts))
+
+        for random_unknown_axiom, consistent in zip(candidates, verdicts):
+            if unknown_questions_counter == num_of_unknown_questions:
+                break
+            # A candidate may repeat one accepted earlier in the batch
+            if not consistent or is_known(random_unknown_axiom, known_statement_keys):
+                tries += 1
+                continue
+
+            tries = 0
+            # valid unknown question
+            random_unknown_axiom_nl = random_unknown_axiom.nl()
+            unknown_questions_counter += 1
+
+            unk_q_dict = {
+                "id": qID,
+                "text": random_unknown_axiom_nl,
+                "label": "Unknown",
+                "depth": "na",
+                "meta": {
+                    "DL": str(random_unknown_axiom),
+                    "type": str(type(random_unknown_axiom)),
+                },
+            }
 
-        tries = 0
-        # valid unknown question
-        random_unknown_axiom_nl = random_unknown_axiom.nl()
-        unknown_questions_counter += 1
-
-        unk_q_dict = {
-            "id": qID,
-            "text": random_unknown_axiom_nl,
-            "label": "Unknown",
-            "depth": "na",
-            "meta": {
-                "DL": str(random_unknown_axiom),
-                "type": str(type(random_unknown_axiom)),
-            },
-        }
-
-        qID += 1
-        unknown_questions.append(unk_q_dict)
-        all2NL[random_unknown_axiom] = random_unknown_axiom_nl  # Don't repeat it!
+            qID += 1
+            unknown_questions.append(unk_q_dict)
+            # Don't repeat it!
+            known_statement_keys.add(canonical_key(random_unknown_axiom))
 
-    if tries > max_tries:
+    if unknown_questions_counter < num_of_unknown_questions:
         return None
 
     return unknown_questions
+
+
+def generate_unknown_questions(
+    qID,
+    num_of_unknown_questions,
+    grammar,
+    known_statement_keys,
+    ontology,
+    reasoner=DEFAULT_REASONER,
+):
+    """Generate questions with "Unknown" label.
+    Generates a random statement, and if it doesn't appear in any inferred axiom,
+    or in the context, and it is consistent with the KB ontology, then it is valid."""
+    return run_requests(
+        search_unknown_questions(
+            qID, num_of_unknown_questions, grammar, known_statement_keys, ontology
+        ),
+        reasoner,
+    )
+
+
+async def generate_unknown_questions_async(
+    qID,
+    num_of_unknown_questions,
+    grammar,
+    known_statement_keys,
+    ontology,
+    async_reasoner,
+):
+    """Same as generate_unknown_questions, awaiting the consistency checks of an
+    AsyncReasoner."""
+    return await run_requests_async(
+        search_unknown_questions(
+            qID, num_of_unknown_questions, grammar, known_statement_keys, ontology
+        ),
+        async_reasoner,
+    )
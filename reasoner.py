@@ -0,0 +1,1053 @@
+from abc import ABC, abstractmethod
+from asyncio import TimeoutError as AsyncTimeoutError
+from codecs import getincrementaldecoder
+from asyncio import create_subprocess_exec, gather, get_running_loop, wait_for
+from concurrent.futures import ThreadPoolExecutor
+from json import dumps, loads
+from os import read, setsid, killpg
+from queue import Queue
+from os.path import abspath
+from select import select
+from signal import SIGTERM
+from subprocess import Popen, PIPE, TimeoutExpired
+from threading import BoundedSemaphore, Lock, Thread
+from time import monotonic
+from common import TBoxAxiom
+from owl_2_nl import json_axiom_class, json_lines
+from owl_functional import DeltaOntology, FunctionalOntology, json_axiom
+from tableau import Tableau, TableauTimeout
+from utils import is_tautology
+from global_variables import (
+    INCONSISTENCY_MSG,
+    INCOHERENCE_MSG,
+    NOT_SUPPORTED_CLASS,
+    EXPLAINER_JAR,
+    CONSISTENCY_CHECKER_JAR,
+    REASONER_SERVER_COMMAND,
+)
+
+
+class ReasonerTimeout(Exception):
+    """The reasoner did not answer a request within its timeout."""
+
+
+class ReasonerError(Exception):
+    """The reasoner failed on a request, or its process died."""
+
+
+def jar_arguments(ontology):
+    """The ontology argument of the jars, and their stdin. An ontology is given either
+    as the path of an OWL file, or as an OWL document: bytes, or an object bytes()
+    converts to one (FunctionalOntology), which the jars read from stdin."""
+    if isinstance(ontology, str):
+        return ontology, None
+    return "-", bytes(ontology)
+
+
+def daemon_request(operation, ontology):
+    """The ReasonerServer request of operation (CONSISTENT) for an ontology given as a
+    path or as an OWL document."""
+    if isinstance(ontology, str):
+        return operation, abspath(ontology)
+    return f"{operation}_DATA", bytes(ontology)
+
+
+def ontology_document(ontology):
+    """The OWL document of an ontology given as a path or as an OWL document."""
+    if isinstance(ontology, str):
+        with open(ontology, "rb") as ontology_file:
+            return ontology_file.read()
+    return bytes(ontology)
+
+
+def entailments_document(entailments):
+    """The OWL document of inferred axioms, as printed by Explainer --infer."""
+    lines = ["Prefix(owl:=<http://www.w3.org/2002/07/owl#>)", "Ontology("]
+    lines.extend(entailments)
+    lines.append(")")
+    return "\n".join(lines).encode("utf-8")
+
+
+def common_base(ontologies):
+    """The base ontology of the ontologies if they are all DeltaOntology extensions of
+    the same base that only add axioms to it, which a batch of consistency checks
+    loads once, else None."""
+    if ontologies and all(
+        isinstance(ontology, DeltaOntology)
+        and ontology.base is ontologies[0].base
+        and ontology.adds_to_base()
+        for ontology in ontologies
+    ):
+        return ontologies[0].base
+    return None
+
+
+def batch_payload(documents):
+    """The documents of a batch, each after a line with its length in bytes."""
+    return b"".join(b"%d\n" % len(document) + document for document in documents)
+
+
+def parse_verdicts(output, count):
+    """The consistency verdicts of a batch of count ontologies, from its "true"/"false"
+    lines."""
+    verdicts = [line == "true" for line in output.split()]
+    if len(verdicts) != count:
+        raise ReasonerError(f"Expected {count} consistency verdicts, got {output!r}")
+    return verdicts
+
+
+def check_each(check_consistency, ontologies, timeout):
+    """Checks the consistency of the ontologies one at a time, within timeout in total.
+    If a check times out or fails, its exception holds the verdicts of the checks
+    before it, as its verdicts attribute."""
+    deadline = monotonic() + timeout
+    verdicts = []
+    try:
+        for ontology in ontologies:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                raise ReasonerTimeout("Reasoner timed out")
+            output = check_consistency(ontology, remaining)
+            verdicts.append(INCONSISTENCY_MSG not in output)
+    except (ReasonerTimeout, ReasonerError) as ex:
+        ex.verdicts = verdicts
+        raise
+    return verdicts
+
+
+def run_requests(requests, reasoner):
+    """Runs the reasoner requests of a generator, which yields each request as the
+    name of a Reasoner method and its arguments, and is sent back its output, or
+    thrown the ReasonerTimeout or ReasonerError it raised. Returns what the
+    generator returns."""
+    try:
+        request = next(requests)
+        while True:
+            method, *arguments = request
+            try:
+                output = getattr(reasoner, method)(*arguments)
+            except (ReasonerTimeout, ReasonerError) as ex:
+                request = requests.throw(ex)
+            else:
+                request = requests.send(output)
+    except StopIteration as stop:
+        return stop.value
+
+
+def run_jar(jar, ontology, timeout):
+    """Runs one of the reasoner jars on an ontology in a new JVM and returns its output."""
+    ontology_path, document = jar_arguments(ontology)
+    return run_java(jar, [ontology_path], document, timeout)
+
+
+def run_java(jar, arguments, document, timeout):
+    """Runs a jar with the arguments, and the document (if not None) as its stdin."""
+    with Popen(
+        ["java", "-jar", jar, *arguments],
+        stdin=PIPE if document is not None else None,
+        stdout=PIPE,
+        preexec_fn=setsid,
+    ) as process:
+        try:
+            return process.communicate(document, timeout=timeout)[0].decode("utf-8")
+        except TimeoutExpired:
+            killpg(process.pid, SIGTERM)
+            raise ReasonerTimeout(f"{jar} timed out after {timeout}s")
+
+
+class ExplanationBlocks:
+    """Splits the Explainer output into its explanation blocks (its JSON lines) as it
+    is read, and passes each to on_explanation until it returns True."""
+
+    END = "\n"
+
+    def __init__(self, on_explanation=None):
+        self.on_explanation = on_explanation
+        self.decoder = getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.blocks = list()
+        self.stopped = False
+
+    def feed(self, chunk):
+        self.text += self.decoder.decode(chunk)
+        while not self.stopped and self.END in self.text:
+            end = self.text.index(self.END) + len(self.END)
+            block, self.text = self.text[:end], self.text[end:]
+            self.blocks.append(block)
+            if self.on_explanation is not None and self.on_explanation(block):
+                self.stopped = True
+
+    def output(self):
+        """The complete explanation blocks read."""
+        return "".join(self.blocks)
+
+
+def run_explainer_stream(arguments, document, timeout, on_explanation):
+    """Runs the Explainer like run_java, reading its explanations as they are printed.
+    It is killed once on_explanation returns True for one of them, or when it times
+    out; either way the explanations read until then are returned."""
+    blocks = ExplanationBlocks(on_explanation)
+    with Popen(
+        ["java", "-jar", EXPLAINER_JAR, *arguments],
+        stdin=PIPE,
+        stdout=PIPE,
+        preexec_fn=setsid,
+    ) as process:
+        try:
+            # The Explainer reads all its input before printing anything
+            process.stdin.write(document)
+            process.stdin.close()
+            stdout = process.stdout.fileno()
+            deadline = monotonic() + timeout
+            while not blocks.stopped:
+                remaining = deadline - monotonic()
+                if remaining <= 0 or not select([stdout], [], [], remaining)[0]:
+                    break
+                chunk = read(stdout, 1 << 16)
+                if not chunk:
+                    break
+                blocks.feed(chunk)
+        except OSError as ex:
+            raise ReasonerError(f"Explainer exited: {ex}")
+        finally:
+            if process.poll() is None:
+                killpg(process.pid, SIGTERM)
+    return blocks.output()
+
+
+class Reasoner(ABC):
+    """
+    The interface of the reasoner backends, which the generation reaches them
+    through. A request is for an ontology (a path, an OWL document, a
+    FunctionalOntology or a DeltaOntology extending one with a statement), and its
+    output is what the Explainer or ConsistencyChecker print for it (see
+    OneShotReasoner), whatever the backend. A request that does not finish within its
+    timeout (in seconds) raises ReasonerTimeout, one that fails ReasonerError.
+    concurrency is the number of requests the reasoner serves at a time.
+    """
+
+    concurrency = 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @abstractmethod
+    def infer(self, ontology, timeout):
+        """Returns the inferred axioms of the ontology, without explanations."""
+
+    @abstractmethod
+    def explain_entailments(self, ontology, entailments, timeout, on_explanation=None):
+        """Returns the explanations of the given inferred axioms of the ontology."""
+
+    @abstractmethod
+    def check_consistency(self, ontology, timeout):
+        """Returns the consistency check output for the ontology."""
+
+    def check_consistency_batch(self, ontologies, timeout):
+        """Returns whether each of the ontologies is consistent, within timeout in total.
+        The exception of a batch that times out or fails may hold the verdicts of the
+        ontologies checked before (see check_each)."""
+        return check_each(self.check_consistency, ontologies, timeout)
+
+    def close(self):
+        """Releases what the reasoner holds (its JVMs)."""
+
+
+class OneShotReasoner(Reasoner):
+    """Reasoner starting a new JVM from the Explainer/ConsistencyChecker jars per request."""
+
+    def infer(self, ontology, timeout):
+        """Returns the Explainer --infer output for the ontology: its inferred axioms,
+        one per line and without explanations, or the inconsistency/incoherence
+        message."""
+        ontology_path, document = jar_arguments(ontology)
+        return run_java(EXPLAINER_JAR, ["--infer", ontology_path], document, timeout)
+
+    def explain_entailments(self, ontology, entailments, timeout, on_explanation=None):
+        """Returns the Explainer output for only the given inferred axioms of the
+        ontology (lines of the infer output): their explanations. Each explanation is
+        passed to on_explanation as soon as it is printed, and the Explainer is
+        stopped once it returns True. When the timeout expires, the explanations
+        printed until then are returned."""
+        documents = [ontology_document(ontology), entailments_document(entailments)]
+        return run_explainer_stream(
+            ["--explain-entailments"], batch_payload(documents), timeout, on_explanation
+        )
+
+    def check_consistency(self, ontology, timeout):
+        """Returns the ConsistencyChecker output for the ontology (a path or an OWL
+        document), which contains the inconsistency message if it is inconsistent."""
+        return run_jar(CONSISTENCY_CHECKER_JAR, ontology, timeout)
+
+    def check_consistency_batch(self, ontologies, timeout):
+        """Returns whether each of the ontologies is consistent, within timeout in total.
+        DeltaOntology extensions of the same base are checked in a single
+        ConsistencyChecker run, which loads the base once."""
+        base = common_base(ontologies)
+        if base is None:
+            return check_each(self.check_consistency, ontologies, timeout)
+        documents = [bytes(base)] + [ontology.delta() for ontology in ontologies]
+        output = run_java(
+            CONSISTENCY_CHECKER_JAR, ["--batch"], batch_payload(documents), timeout
+        )
+        return parse_verdicts(output, len(ontologies))
+
+
+DEFAULT_REASONER = OneShotReasoner()
+
+
+class ReasonerDaemon(Reasoner):
+    """
+    Client of a long-lived ReasonerServer JVM, which keeps HermiT loaded between
+    requests. Requests and responses are framed on the server's stdin/stdout as a
+    header line "<OP> <length>\\n" followed by <length> bytes of UTF-8 payload.
+    The server is started on the first request, and killed and started again
+    after a request times out or the process dies.
+    A FunctionalOntology is loaded by the server as its base ontology, which stays
+    loaded for the consistency checks of its DeltaOntology extensions.
+    Explanations are streamed and can be stopped without killing the server; it is
+    only killed if it does not stop within stop_timeout.
+    """
+
+    def __init__(
+        self, command=REASONER_SERVER_COMMAND, startup_timeout=60, stop_timeout=2
+    ):
+        self.command = command
+        self.startup_timeout = startup_timeout
+        self.stop_timeout = stop_timeout
+        self.process = None
+        self.buffer = bytearray()
+        self.base = None  # The ontology loaded by the server as its base
+
+    def start(self):
+        self.process = Popen(
+            self.command, stdin=PIPE, stdout=PIPE, bufsize=0, preexec_fn=setsid
+        )
+        self.buffer.clear()
+        self.base = None
+        # The JVM start-up is not charged to the first request's timeout
+        self.send("PING", "", self.startup_timeout)
+
+    def kill(self):
+        if self.process is not None:
+            try:
+                killpg(self.process.pid, SIGTERM)
+            except ProcessLookupError:
+                pass
+            self.process.wait()
+            self.process = None
+
+    def close(self):
+        if self.process is not None and self.process.poll() is None:
+            try:
+                self.process.stdin.write(b"QUIT 0\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=5)
+            except (OSError, TimeoutExpired):
+                pass
+        self.kill()
+
+    def read_until(self, size, deadline):
+        """Reads from the server until the buffer holds at least size bytes."""
+        stdout = self.process.stdout.fileno()
+        while len(self.buffer) < size:
+            remaining = deadline - monotonic()
+            if remaining <= 0 or not select([stdout], [], [], remaining)[0]:
+                raise ReasonerTimeout("Reasoner timed out")
+            chunk = read(stdout, 1 << 16)
+            if not chunk:
+                raise ReasonerError("Reasoner process exited")
+            self.buffer += chunk
+
+    def read_frame(self, deadline):
+        while b"\n" not in self.buffer:
+            self.read_until(len(self.buffer) + 1, deadline)
+        header_end = self.buffer.index(b"\n")
+        status, length = self.buffer[:header_end].decode().split()
+        payload_end = header_end + 1 + int(length)
+        self.read_until(payload_end, deadline)
+        payload = self.buffer[header_end + 1 : payload_end].decode("utf-8")
+        del self.buffer[:payload_end]
+        return status, payload
+
+    def write_frame(self, operation, payload):
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        self.process.stdin.write(f"{operation} {len(payload)}\n".encode() + payload)
+        self.process.stdin.flush()
+
+    def send(self, operation, payload, timeout):
+        try:
+            self.write_frame(operation, payload)
+            status, response = self.read_frame(monotonic() + timeout)
+        except (ReasonerTimeout, ReasonerError, OSError) as ex:
+            self.kill()
+            if isinstance(ex, OSError):
+                raise ReasonerError(f"Reasoner process exited: {ex}")
+            raise
+        if status != "OK":
+            raise ReasonerError(response)
+        return response
+
+    def ensure_started(self):
+        if self.process is None or self.process.poll() is not None:
+            self.kill()
+            self.start()
+
+    def request(self, operation, payload, timeout):
+        self.ensure_started()
+        return self.send(operation, payload, timeout)
+
+    def stream(self, operation, payload, timeout, on_part=None):
+        """Sends a request whose response is streamed as PART frames, and returns the
+        parts received. The request is stopped (STOP) once on_part returns True for a
+        part, or when it times out; either way the parts received until then are
+        returned."""
+        self.ensure_started()
+        parts = list()
+        stopping = False
+        deadline = monotonic() + timeout
+        try:
+            self.write_frame(operation, payload)
+            while True:
+                try:
+                    status, response = self.read_frame(deadline)
+                except ReasonerTimeout:
+                    if stopping:
+                        raise
+                    status = None
+                if status == "PART":
+                    parts.append(response)
+                elif status is not None:
+                    break
+                if not stopping and (
+                    status is None or (on_part is not None and on_part(response))
+                ):
+                    self.write_frame("STOP", "")
+                    stopping = True
+                    deadline = monotonic() + self.stop_timeout
+            if stopping:  # The server answers the STOP after the request
+                stop_status = status
+                while stop_status != "STOPPED":
+                    stop_status, _ = self.read_frame(deadline)
+        except ReasonerTimeout:  # It did not stop in time
+            self.kill()
+            return "".join(parts)
+        except (ReasonerError, OSError) as ex:
+            self.kill()
+            raise ReasonerError(f"Reasoner process exited: {ex}")
+        if status != "OK":
+            raise ReasonerError(response)
+        return "".join(parts) + response
+
+    def load_base(self, ontology, timeout):
+        if self.base is not ontology or self.process is None:
+            self.request("BASE", ontology_document(ontology), timeout)
+            self.base = ontology
+
+    def infer(self, ontology, timeout):
+        """Returns the Explainer --infer output for the ontology, as
+        OneShotReasoner.infer. The ontology stays loaded as the base ontology for
+        explain_entailments."""
+        self.load_base(ontology, timeout)
+        return self.request("INFER_BASE", "", timeout)
+
+    def explain_entailments(self, ontology, entailments, timeout, on_explanation=None):
+        """Returns the explanations of the inferred axioms, as
+        OneShotReasoner.explain_entailments."""
+        self.load_base(ontology, timeout)
+        return self.stream(
+            "EXPLAIN_ENTAILMENTS",
+            entailments_document(entailments),
+            timeout,
+            on_explanation,
+        )
+
+    def check_consistency(self, ontology, timeout):
+        """Returns the ConsistencyChecker output for the ontology, as
+        OneShotReasoner.check_consistency. For a DeltaOntology that only adds axioms
+        to its base, only those are sent, once the base is loaded."""
+        if isinstance(ontology, DeltaOntology) and ontology.adds_to_base():
+            self.load_base(ontology.base, timeout)
+            return self.request("CONSISTENT_DELTA", ontology.delta(), timeout)
+        return self.request(*daemon_request("CONSISTENT", ontology), timeout)
+
+    def check_consistency_batch(self, ontologies, timeout):
+        """Returns whether each of the ontologies is consistent, as
+        OneShotReasoner.check_consistency_batch. DeltaOntology extensions of the same
+        base are checked in one request against the loaded base."""
+        base = common_base(ontologies)
+        if base is None:
+            return check_each(self.check_consistency, ontologies, timeout)
+        self.load_base(base, timeout)
+        deltas = [ontology.delta() for ontology in ontologies]
+        return parse_verdicts(
+            self.request("CONSISTENT_BATCH", batch_payload(deltas), timeout),
+            len(deltas),
+        )
+
+
+class ReasonerPool(Reasoner):
+    """
+    Pool of ReasonerDaemon workers. Requests are dispatched to the idle workers in
+    round-robin order and at most max_pending requests are queued or running at a
+    time, so submit blocks while the pool is behind. A worker whose request misses
+    its deadline (or whose JVM dies) is restarted in the background while the other
+    workers keep serving requests, and gets its base ontology loaded again before it
+    serves another one.
+    """
+
+    def __init__(self, num_workers, max_pending=None, command=REASONER_SERVER_COMMAND):
+        self.workers = [ReasonerDaemon(command) for _ in range(num_workers)]
+        self.idle_workers = Queue()
+        for worker in self.workers:
+            self.idle_workers.put(worker)
+        self.pending = BoundedSemaphore(max_pending or 2 * num_workers)
+        self.executor = ThreadPoolExecutor(max_workers=num_workers)
+        self.closed = False
+        self.lock = Lock()  # Held by the restarts, and by close
+
+    @property
+    def concurrency(self):
+        return len(self.workers)
+
+    def restart(self, worker):
+        with self.lock:
+            if not self.closed:
+                base = worker.base  # Reset by start
+                try:
+                    worker.start()
+                    if base is not None:
+                        worker.load_base(base, worker.startup_timeout)
+                except Exception:
+                    worker.kill()  # It will be started again on its next request
+        self.idle_workers.put(worker)
+
+    def run(self, method, *arguments):
+        worker = self.idle_workers.get()
+        try:
+            return getattr(worker, method)(*arguments)
+        finally:
+            if worker.process is None:  # Killed after a timeout or a crash
+                Thread(target=self.restart, args=(worker,), daemon=True).start()
+            else:
+                self.idle_workers.put(worker)
+
+    def submit(self, method, *arguments):
+        """Queues a request (the name of a ReasonerDaemon method and its arguments)
+        and returns its Future.
+        The timeout is the request's deadline once a worker has picked it up."""
+        self.pending.acquire()
+        future = self.executor.submit(self.run, method, *arguments)
+        future.add_done_callback(lambda _: self.pending.release())
+        return future
+
+    def infer(self, ontology, timeout):
+        """Returns the Explainer --infer output for the ontology, as
+        OneShotReasoner.infer."""
+        return self.submit("infer", ontology, timeout).result()
+
+    def explain_entailments(self, ontology, entailments, timeout, on_explanation=None):
+        """Returns the explanations of the inferred axioms, as
+        OneShotReasoner.explain_entailments. A worker that does not have the
+        ontology loaded loads it again."""
+        return self.submit(
+            "explain_entailments", ontology, entailments, timeout, on_explanation
+        ).result()
+
+    def check_consistency(self, ontology, timeout):
+        """Returns the ConsistencyChecker output for the ontology, as
+        OneShotReasoner.check_consistency."""
+        return self.submit("check_consistency", ontology, timeout).result()
+
+    def check_consistency_batch(self, ontologies, timeout):
+        """Returns whether each of the ontologies is consistent, as
+        OneShotReasoner.check_consistency_batch. The batch is served by one worker."""
+        return self.submit("check_consistency_batch", ontologies, timeout).result()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        with self.lock:  # A restart in progress finishes first
+            self.closed = True
+            for worker in self.workers:
+                worker.close()
+
+
+def kb_statements(ontology):
+    """The statements the TableauReasoner reasons on for an ontology of the direct
+    backend: a FunctionalOntology, or a DeltaOntology extension of one."""
+    if isinstance(ontology, DeltaOntology):
+        # The statement may reset the domain or range a base statement sets
+        return ontology.base.extended(ontology.statement).axiom_statements()
+    if isinstance(ontology, FunctionalOntology):
+        return ontology.axiom_statements()
+    raise ReasonerError("The tableau reasoner needs the direct ontology backend")
+
+
+class TableauReasoner(Reasoner):
+    """
+    In-process reasoner: the ALCQ tableau of tableau.py, run on the statements of the
+    direct backend ontologies, so that no JVM is needed. Its outputs are those of the
+    Explainer and the ConsistencyChecker, but for the "owl" of an inferred axiom,
+    which is its JSON, and the justifications, which are made of KB statements.
+    """
+
+    def infer(self, ontology, timeout):
+        """Returns the inferred axioms of the ontology (a FunctionalOntology), as
+        OneShotReasoner.infer: the classes of its individuals, the subsumptions
+        between its classes and its role assertions."""
+        tableau = Tableau(kb_statements(ontology), monotonic() + timeout)
+        try:
+            model = tableau.complete()
+            if model is None:
+                return INCONSISTENCY_MSG + "\n"
+            class_models = tableau.class_models(ontology.classes)
+            if None in class_models.values():
+                return INCOHERENCE_MSG + "\n\n"
+            inferred = tableau.inferred_statements(model, class_models)
+        except TableauTimeout:
+            raise ReasonerTimeout(f"Tableau timed out after {timeout}s")
+        lines = list()
+        for statement in inferred:
+            axiom = json_axiom(statement, ontology.names)
+            lines.append(dumps({"entailment": axiom, "owl": dumps(axiom)}) + "\n")
+        return "".join(lines)
+
+    def explain_entailments(self, ontology, entailments, timeout, on_explanation=None):
+        """Returns the explanations of the inferred axioms, as
+        OneShotReasoner.explain_entailments, each with a justification the tableau
+        finds among the KB statements."""
+        tableau = Tableau(kb_statements(ontology), monotonic() + timeout)
+        explanations = list()
+        for entailment in entailments:
+            axiom = loads(entailment)
+            statement = json_axiom_class(axiom, names=ontology.names)
+            try:
+                justification = tableau.justification(statement)
+            except TableauTimeout:
+                break
+            explanation = dumps(
+                {
+                    "entailment": axiom,
+                    "justification": [
+                        json_axiom(statement, ontology.names)
+                        for statement in justification
+                    ],
+                }
+            )
+            explanations.append(explanation + "\n")
+            if on_explanation is not None and on_explanation(explanations[-1]):
+                break
+        return "".join(explanations)
+
+    def check_consistency(self, ontology, timeout):
+        """Returns the inconsistency message if the ontology is inconsistent, as
+        OneShotReasoner.check_consistency."""
+        try:
+            consistent = Tableau(
+                kb_statements(ontology), monotonic() + timeout
+            ).is_consistent()
+        except TableauTimeout:
+            raise ReasonerTimeout(f"Tableau timed out after {timeout}s")
+        return "" if consistent else INCONSISTENCY_MSG + "\n"
+
+
+def inferred_verdicts(output, names):
+    """What an infer output says about a KB, to compare reasoners: the inconsistency
+    or incoherence message, or the set of its inferred statements, without the
+    tautologies and the equivalences."""
+    for message in (INCONSISTENCY_MSG, INCOHERENCE_MSG):
+        if message in output:
+            return message
+    inferred = set()
+    for inferred_axiom in json_lines(output):
+        axiom = json_axiom_class(inferred_axiom["entailment"], names=names)
+        if axiom is None or axiom == NOT_SUPPORTED_CLASS or is_tautology(axiom):
+            continue
+        if isinstance(axiom, TBoxAxiom) and (
+            axiom.Relationship == "≡" or axiom.LHS_concept == axiom.RHS_concept
+        ):
+            continue
+        inferred.add(axiom)
+    return inferred
+
+
+class ReasonerWrapper(Reasoner):
+    """A reasoner serving its requests with another reasoner, which subclasses add
+    to."""
+
+    def __init__(self, reasoner):
+        self.reasoner = reasoner
+
+    @property
+    def concurrency(self):
+        return self.reasoner.concurrency
+
+    def infer(self, ontology, timeout):
+        return self.reasoner.infer(ontology, timeout)
+
+    def explain_entailments(self, ontology, entailments, timeout, on_explanation=None):
+        return self.reasoner.explain_entailments(
+            ontology, entailments, timeout, on_explanation
+        )
+
+    def check_consistency(self, ontology, timeout):
+        return self.reasoner.check_consistency(ontology, timeout)
+
+    def check_consistency_batch(self, ontologies, timeout):
+        return self.reasoner.check_consistency_batch(ontologies, timeout)
+
+    def close(self):
+        self.reasoner.close()
+
+
+class DifferentialReasoner(ReasonerWrapper):
+    """
+    Differential test of the TableauReasoner against a HermiT reasoner: every request
+    is served by the HermiT reasoner, and the tableau's consistency verdicts and
+    inferred axioms for the same ontologies are checked against its own. Each
+    mismatch is printed, and their count when the reasoner is closed.
+    """
+
+    def __init__(self, reasoner):
+        super().__init__(reasoner)
+        self.tableau = TableauReasoner()
+        self.checks = 0
+        self.mismatches = 0
+
+    def check(self, request, hermit_verdict, tableau_verdict):
+        self.checks += 1
+        if hermit_verdict == tableau_verdict:
+            return
+        self.mismatches += 1
+        if isinstance(hermit_verdict, set) and isinstance(tableau_verdict, set):
+            hermit_verdict, tableau_verdict = (
+                hermit_verdict - tableau_verdict,
+                tableau_verdict - hermit_verdict,
+            )
+        print(
+            f"Tableau mismatch in {request}: HermiT {hermit_verdict}, "
+            f"tableau {tableau_verdict}"
+        )
+
+    def tableau_output(self, method, *arguments):
+        """The output of the tableau for a request, or None if it failed."""
+        try:
+            return getattr(self.tableau, method)(*arguments)
+        except (ReasonerTimeout, ReasonerError):
+            return None
+
+    def infer(self, ontology, timeout):
+        output = self.reasoner.infer(ontology, timeout)
+        tableau_output = self.tableau_output("infer", ontology, timeout)
+        if tableau_output is not None:
+            self.check(
+                "infer",
+                inferred_verdicts(output, ontology.names),
+                inferred_verdicts(tableau_output, ontology.names),
+            )
+        return output
+
+    def check_consistency(self, ontology, timeout):
+        output = self.reasoner.check_consistency(ontology, timeout)
+        tableau_output = self.tableau_output("check_consistency", ontology, timeout)
+        if tableau_output is not None:
+            self.check(
+                "check_consistency",
+                INCONSISTENCY_MSG not in output,
+                INCONSISTENCY_MSG not in tableau_output,
+            )
+        return output
+
+    def check_consistency_batch(self, ontologies, timeout):
+        verdicts = self.reasoner.check_consistency_batch(ontologies, timeout)
+        tableau_verdicts = self.tableau_output(
+            "check_consistency_batch", ontologies, timeout
+        )
+        if tableau_verdicts is not None:
+            self.check("check_consistency_batch", verdicts, tableau_verdicts)
+        return verdicts
+
+    def close(self):
+        super().close()
+        print(
+            f"Tableau differential test: {self.mismatches} mismatches in "
+            f"{self.checks} checks."
+        )
+
+
+class MeteredReasoner(ReasonerWrapper):
+    """
+    Keeps metrics of the requests of a reasoner, to compare the backends: for each
+    kind of request, how many were made, the total and the longest time they took,
+    and how many timed out or failed. They are printed when the reasoner is closed.
+    """
+
+    def __init__(self, reasoner):
+        super().__init__(reasoner)
+        self.metrics = dict()  # request -> {metric: value}
+        self.lock = Lock()  # The requests may come from several threads
+
+    def measure(self, request, method, *arguments):
+        start = monotonic()
+        outcome = None
+        try:
+            return method(*arguments)
+        except ReasonerTimeout:
+            outcome = "timeouts"
+            raise
+        except ReasonerError:
+            outcome = "errors"
+            raise
+        finally:
+            elapsed = monotonic() - start
+            with self.lock:
+                metrics = self.metrics.setdefault(
+                    request,
+                    {
+                        "requests": 0,
+                        "seconds": 0.0,
+                        "longest": 0.0,
+                        "timeouts": 0,
+                        "errors": 0,
+                    },
+                )
+                metrics["requests"] += 1
+                metrics["seconds"] += elapsed
+                metrics["longest"] = max(metrics["longest"], elapsed)
+                if outcome is not None:
+                    metrics[outcome] += 1
+
+    def infer(self, ontology, timeout):
+        return self.measure("infer", self.reasoner.infer, ontology, timeout)
+
+    def explain_entailments(self, ontology, entailments, timeout, on_explanation=None):
+        return self.measure(
+            "explain_entailments",
+            self.reasoner.explain_entailments,
+            ontology,
+            entailments,
+            timeout,
+            on_explanation,
+        )
+
+    def check_consistency(self, ontology, timeout):
+        return self.measure(
+            "check_consistency", self.reasoner.check_consistency, ontology, timeout
+        )
+
+    def check_consistency_batch(self, ontologies, timeout):
+        return self.measure(
+            "check_consistency_batch",
+            self.reasoner.check_consistency_batch,
+            ontologies,
+            timeout,
+        )
+
+    def close(self):
+        super().close()
+        print("Reasoner metrics:")
+        for request, metrics in self.metrics.items():
+            print(
+                f"  {request}: {metrics['requests']} requests, "
+                f"{metrics['seconds']:.2f}s in total, {metrics['longest']:.2f}s at most, "
+                f"{metrics['timeouts']} timed out, {metrics['errors']} failed"
+            )
+
+
+async def run_jar_async(jar, ontology, timeout):
+    """Same as run_jar, as an asyncio subprocess."""
+    ontology_path, document = jar_arguments(ontology)
+    return await run_java_async(jar, [ontology_path], document, timeout)
+
+
+async def run_java_async(jar, arguments, document, timeout):
+    """Same as run_java, as an asyncio subprocess."""
+    process = await create_subprocess_exec(
+        "java",
+        "-jar",
+        jar,
+        *arguments,
+        stdin=PIPE if document is not None else None,
+        stdout=PIPE,
+        start_new_session=True,
+    )
+    try:
+        output, _ = await wait_for(process.communicate(document), timeout)
+    except AsyncTimeoutError:
+        raise ReasonerTimeout(f"{jar} timed out after {timeout}s")
+    finally:
+        if process.returncode is None:  # Timed out, or the request was cancelled
+            killpg(process.pid, SIGTERM)
+            await process.wait()
+    return output.decode("utf-8")
+
+
+async def run_explainer_stream_async(arguments, document, timeout, on_explanation):
+    """Same as run_explainer_stream, as an asyncio subprocess."""
+    blocks = ExplanationBlocks(on_explanation)
+    process = await create_subprocess_exec(
+        "java",
+        "-jar",
+        EXPLAINER_JAR,
+        *arguments,
+        stdin=PIPE,
+        stdout=PIPE,
+        start_new_session=True,
+    )
+    try:
+        process.stdin.write(document)
+        await process.stdin.drain()
+        process.stdin.close()
+        deadline = monotonic() + timeout
+        while not blocks.stopped:
+            chunk = await wait_for(process.stdout.read(1 << 16), deadline - monotonic())
+            if not chunk:
+                break
+            blocks.feed(chunk)
+    except AsyncTimeoutError:
+        pass
+    except OSError as ex:
+        raise ReasonerError(f"Explainer exited: {ex}")
+    finally:
+        if process.returncode is None:  # Stopped, timed out, or cancelled
+            killpg(process.pid, SIGTERM)
+            await process.wait()
+    return blocks.output()
+
+
+class AsyncReasoner:
+    """
+    Awaitable front of a reasoner, for the asyncio pipeline. With a OneShotReasoner the
+    jars run as asyncio subprocesses. Any other reasoner is called from worker threads
+    (one per request it serves at a time), so that the event loop keeps running
+    meanwhile. This includes a ReasonerWrapper around a OneShotReasoner (e.g. with
+    --reasoner-metrics), since the wrapper has to see every request: its jars run in
+    a thread, and the consistency checks of a batch without a common base run one
+    after the other instead of concurrently.
+    """
+
+    def __init__(self, reasoner):
+        self.reasoner = reasoner
+        self.executor = None
+        self.concurrency = reasoner.concurrency
+        if not isinstance(reasoner, OneShotReasoner):
+            self.executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def call(self, method, *arguments):
+        return await get_running_loop().run_in_executor(
+            self.executor, method, *arguments
+        )
+
+    async def infer(self, ontology, timeout):
+        if self.executor is None:
+            ontology_path, document = jar_arguments(ontology)
+            return await run_java_async(
+                EXPLAINER_JAR, ["--infer", ontology_path], document, timeout
+            )
+        return await self.call(self.reasoner.infer, ontology, timeout)
+
+    async def explain_entailments(
+        self, ontology, entailments, timeout, on_explanation=None
+    ):
+        if self.executor is None:
+            documents = [ontology_document(ontology), entailments_document(entailments)]
+            return await run_explainer_stream_async(
+                ["--explain-entailments"],
+                batch_payload(documents),
+                timeout,
+                on_explanation,
+            )
+        # on_explanation is called from the worker thread
+        return await self.call(
+            self.reasoner.explain_entailments,
+            ontology,
+            entailments,
+            timeout,
+            on_explanation,
+        )
+
+    async def check_consistency(self, ontology, timeout):
+        if self.executor is None:
+            return await run_jar_async(CONSISTENCY_CHECKER_JAR, ontology, timeout)
+        return await self.call(self.reasoner.check_consistency, ontology, timeout)
+
+    async def check_consistency_batch(self, ontologies, timeout):
+        if self.executor is not None:
+            return await self.call(
+                self.reasoner.check_consistency_batch, ontologies, timeout
+            )
+        base = common_base(ontologies)
+        if base is None:
+            outputs = await gather(
+                *(self.check_consistency(ontology, timeout) for ontology in ontologies),
+                return_exceptions=True,
+            )
+            verdicts = []
+            for output in outputs:
+                if isinstance(output, Exception):
+                    output.verdicts = verdicts
+                    raise output
+                verdicts.append(INCONSISTENCY_MSG not in output)
+            return verdicts
+        documents = [bytes(base)] + [ontology.delta() for ontology in ontologies]
+        output = await run_java_async(
+            CONSISTENCY_CHECKER_JAR, ["--batch"], batch_payload(documents), timeout
+        )
+        return parse_verdicts(output, len(ontologies))
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+
+async def run_requests_async(requests, async_reasoner):
+    """Same as run_requests, awaiting the requests on an AsyncReasoner."""
+    try:
+        request = next(requests)
+        while True:
+            method, *arguments = request
+            try:
+                output = await getattr(async_reasoner, method)(*arguments)
+            except (ReasonerTimeout, ReasonerError) as ex:
+                request = requests.throw(ex)
+            else:
+                request = requests.send(output)
+    except StopIteration as stop:
+        return stop.value
+
+
+def make_reasoner(mode, num_workers=1, engine="hermit", metrics=False):
+    """Returns the reasoner for the --reasoner, --reasoner-mode, --reasoner-workers
+    and --reasoner-metrics options."""
+    reasoner = make_backend(mode, num_workers, engine)
+    if metrics:
+        reasoner = MeteredReasoner(reasoner)
+    return reasoner
+
+
+def make_backend(mode, num_workers=1, engine="hermit"):
+    """Returns the reasoner backend for the --reasoner, --reasoner-mode and
+    --reasoner-workers options."""
+    if engine == "python":
+        return TableauReasoner()
+    if engine == "differential":
+        return DifferentialReasoner(make_backend(mode, num_workers))
+    if engine != "hermit":
+        raise ValueError(f"Unknown reasoner: {engine}")
+    if mode == "daemon":
+        if num_workers > 1:
+            return ReasonerPool(num_workers)
+        return ReasonerDaemon()
+    if mode == "oneshot":
+        return OneShotReasoner()
+    raise ValueError(f"Unknown reasoner mode: {mode}")
@@ -0,0 +1,804 @@
+from functools import lru_cache
+from itertools import combinations, product
+from time import monotonic
+from common import (
+    AtomicConcept,
+    ConceptAssertion,
+    JunctionConcept,
+    RestrictionConcept,
+    RoleAssertion,
+    TBoxAxiom,
+)
+
+# Concepts are reasoned on in negation normal form, as tuples:
+#   TOP, BOTTOM, ("atom", name), ("not", name), ("and", operands), ("or", operands),
+#   ("all", role, filler), ("atleast", n, role, filler), ("atmost", n, role, filler)
+# ∃R.C is ("atleast", 1, R, C) and ≤0 R.C is ("all", R, ¬C).
+TOP = ("⊤",)
+BOTTOM = ("⊥",)
+
+
+class TableauTimeout(Exception):
+    """The tableau did not finish before its deadline."""
+
+
+def junction(kind, operands):
+    """The "and"/"or" of the operands, flattened, without duplicates and units."""
+    unit, zero = (TOP, BOTTOM) if kind == "and" else (BOTTOM, TOP)
+    flat = list()
+    for operand in operands:
+        if operand == zero:
+            return zero
+        if operand == unit:
+            continue
+        for part in operand[1] if operand[0] == kind else (operand,):
+            if part not in flat:
+                flat.append(part)
+    if not flat:
+        return unit
+    if len(flat) == 1:
+        return flat[0]
+    return (kind, tuple(flat))
+
+
+def restriction(kind, n, role, filler):
+    """The "all"/"atleast"/"atmost" restriction, simplified."""
+    if kind == "all":
+        return TOP if filler == TOP else ("all", role, filler)
+    if kind == "atleast":
+        if n <= 0:
+            return TOP
+        return BOTTOM if filler == BOTTOM else ("atleast", n, role, filler)
+    if n < 0:
+        return BOTTOM
+    if n == 0:
+        return restriction("all", 0, role, negate(filler))
+    return TOP if filler == BOTTOM else ("atmost", n, role, filler)
+
+
+@lru_cache(maxsize=1 << 16)
+def negate(concept):
+    """The negation normal form of the negation of an NNF concept."""
+    kind = concept[0]
+    if concept == TOP:
+        return BOTTOM
+    if concept == BOTTOM:
+        return TOP
+    if kind == "atom":
+        return ("not", concept[1])
+    if kind == "not":
+        return ("atom", concept[1])
+    if kind == "and":
+        return junction("or", [negate(operand) for operand in concept[1]])
+    if kind == "or":
+        return junction("and", [negate(operand) for operand in concept[1]])
+    if kind == "all":
+        return restriction("atleast", 1, concept[1], negate(concept[2]))
+    _, n, role, filler = concept
+    if kind == "atleast":
+        return restriction("atmost", n - 1, role, filler)
+    return restriction("atleast", n + 1, role, filler)
+
+
+@lru_cache(maxsize=1 << 16)
+def nnf(concept):
+    """The negation normal form of a concept of common.py."""
+    if isinstance(concept, AtomicConcept):
+        if concept.concept_name in ("⊤", "⊥"):
+            top = (concept.concept_name == "⊤") == (concept.polarity == "+")
+            return TOP if top else BOTTOM
+        kind = "atom" if concept.polarity == "+" else "not"
+        return (kind, concept.concept_name)
+    if isinstance(concept, JunctionConcept):
+        kind = "and" if concept.relationship == "⊓" else "or"
+        return junction(kind, [nnf(concept.lhs_concept), nnf(concept.rhs_concept)])
+    if isinstance(concept, RestrictionConcept):
+        role = concept.role_name
+        filler = nnf(concept.concept)
+        if concept.restriction == "∀":
+            return restriction("all", 0, role, filler)
+        if concept.restriction == "∃":
+            return restriction("atleast", 1, role, filler)
+        quantifier, quantity = concept.restriction.split()
+        n = int(quantity)
+        if quantifier == ">":
+            return restriction("atleast", n + 1, role, filler)
+        if quantifier == ">=":
+            return restriction("atleast", n, role, filler)
+        if quantifier == "<":
+            return restriction("atmost", n - 1, role, filler)
+        if quantifier == "<=":
+            return restriction("atmost", n, role, filler)
+        return junction(
+            "and",
+            [
+                restriction("atleast", n, role, filler),
+                restriction("atmost", n, role, filler),
+            ],
+        )
+    raise TypeError("Unexpected type for concept: {}".format(type(concept)))
+
+
+def tbox_inclusions(axiom):
+    """The inclusions C ⊑ D of NNF concepts of a TBox axiom (both directions of an
+    equivalence)."""
+    lhs_concept, rhs_concept = nnf(axiom.LHS_concept), nnf(axiom.RHS_concept)
+    inclusions = [(lhs_concept, rhs_concept)]
+    if axiom.Relationship == "≡":
+        inclusions.append((rhs_concept, lhs_concept))
+    return inclusions
+
+
+NO_DEPENDENCIES = frozenset()
+EDGE = "→"  # The kind of the pending additions of edges
+# The order the operands of a disjunction are branched on, by kind
+BRANCHING_ORDER = {
+    "atom": 0,
+    "not": 0,
+    "all": 1,
+    "and": 2,
+    "or": 2,
+    "atmost": 3,
+    "atleast": 4,
+}
+
+
+class Completion:
+    """
+    A completion graph: the label of each node (its NNF concepts, each with its
+    dependencies: the branch points it was added under), its role edges (also with
+    their dependencies), the parent of each anonymous node and the pairs of nodes that
+    must stay distinct (with their dependencies). Individuals are the nodes named by
+    strings, and are all distinct (UNA); anonymous nodes are numbered. branch is the
+    number of branch points the graph was built under, pending the (node, concept or
+    EDGE) additions the deterministic rules have not processed yet, atmosts and
+    disjunctions the (node, concept) additions of ≤ and ⊔ concepts, which the
+    nondeterministic rules apply to, and blocked the blocked nodes, until the labels
+    change.
+    """
+
+    __slots__ = (
+        "labels",
+        "edges",
+        "parents",
+        "distinct",
+        "next_node",
+        "branch",
+        "pending",
+        "atmosts",
+        "disjunctions",
+        "blocked",
+    )
+
+    def __init__(self):
+        self.labels = dict()  # node -> {concept: dependencies}
+        self.edges = dict()  # node -> {(role, successor): dependencies}
+        self.parents = dict()
+        self.distinct = dict()  # {x, y} -> dependencies
+        self.next_node = 0
+        self.branch = 0
+        self.pending = list()
+        self.atmosts = list()
+        self.disjunctions = list()
+        self.blocked = None
+
+    def copy(self):
+        completion = Completion()
+        completion.labels = {node: label.copy() for node, label in self.labels.items()}
+        completion.edges = {node: edges.copy() for node, edges in self.edges.items()}
+        completion.parents = self.parents.copy()
+        completion.distinct = self.distinct.copy()
+        completion.next_node = self.next_node
+        completion.branch = self.branch
+        completion.pending = self.pending.copy()
+        completion.atmosts = self.atmosts.copy()
+        completion.disjunctions = self.disjunctions.copy()
+        return completion
+
+    def add_node(self, name=None, parent=None, role=None, dependencies=NO_DEPENDENCIES):
+        """Adds an individual (if name is given) or an anonymous node, as a successor
+        of parent if it is given."""
+        node = name
+        if node is None:
+            node = self.next_node
+            self.next_node += 1
+        if node not in self.labels:
+            self.labels[node] = dict()
+            self.edges[node] = dict()
+            self.blocked = None
+        if parent is not None:
+            self.parents[node] = parent
+            self.add_edge(parent, role, node, dependencies)
+        return node
+
+    def add(self, node, concept, dependencies):
+        """Adds the concept to the label of the node. Returns whether it is new."""
+        label = self.labels[node]
+        if concept in label:
+            return False
+        label[concept] = dependencies
+        self.pending.append((node, concept))
+        self.blocked = None
+        if concept[0] == "atmost":
+            self.atmosts.append((node, concept))
+        elif concept[0] == "or":
+            self.disjunctions.append((node, concept))
+        return True
+
+    def add_edge(self, node, role, successor, dependencies):
+        edges = self.edges[node]
+        if (role, successor) not in edges:
+            edges[role, successor] = dependencies
+            self.pending.append((node, (EDGE, role, successor)))
+
+    def distinction(self, x, y):
+        """The dependencies of the nodes being distinct, or None if they are not."""
+        if isinstance(x, str) and isinstance(y, str):
+            return NO_DEPENDENCIES
+        return self.distinct.get(frozenset((x, y)))
+
+    def successors(self, node, role):
+        """The successors of the node by the role, with the dependencies of their edges."""
+        return [
+            (successor, dependencies)
+            for (r, successor), dependencies in self.edges[node].items()
+            if r == role
+        ]
+
+    def blocked_nodes(self):
+        """The anonymous nodes whose label is a subset of the label of an earlier
+        anonymous node that is not blocked (anywhere subset blocking, enough without
+        inverse roles), and their descendants."""
+        if self.blocked is not None:
+            return self.blocked
+        blocked = set()
+        blockers = list()
+        for node in sorted(node for node in self.labels if isinstance(node, int)):
+            label = self.labels[node].keys()
+            if self.parents.get(node) in blocked or any(
+                label <= blocker for blocker in blockers
+            ):
+                blocked.add(node)
+            else:
+                blockers.append(label)
+        self.blocked = blocked
+        return blocked
+
+    def prune(self, node):
+        """Removes an anonymous node and its subtree."""
+        for _, successor in self.edges.pop(node):
+            if self.parents.get(successor) == node:
+                self.prune(successor)
+        del self.labels[node]
+        del self.parents[node]
+        self.blocked = None
+
+    def merge(self, node, into, dependencies):
+        """Merges an anonymous node (a sibling of into) into the node into: into gets
+        its label and its distinctness, and its subtree is pruned. What into gets
+        depends on dependencies too."""
+        for concept, concept_dependencies in self.labels[node].items():
+            self.add(into, concept, concept_dependencies | dependencies)
+        for pair, pair_dependencies in list(self.distinct.items()):
+            if node in pair:
+                (other,) = pair - {node}
+                self.distinct[frozenset((other, into))] = (
+                    pair_dependencies | dependencies
+                )
+        parent = self.parents[node]
+        edges = self.edges[parent]
+        for role, successor in list(edges):
+            if successor == node:
+                edge_dependencies = edges.pop((role, node)) | dependencies
+                self.add_edge(parent, role, into, edge_dependencies)
+        self.prune(node)
+
+
+def holds(completion, node, concept):
+    """Whether the NNF concept holds for a node that is not blocked in the model of the
+    completion graph: True, False, or None if it cannot tell from the labels."""
+    label = completion.labels[node]
+    if concept in label:
+        return True
+    if negate(concept) in label:
+        return False
+    kind = concept[0]
+    if concept in (TOP, BOTTOM):
+        return concept == TOP
+    if kind == "atom":
+        return False
+    if kind == "not":
+        return ("atom", concept[1]) not in label
+    if kind in ("and", "or"):
+        values = [holds(completion, node, operand) for operand in concept[1]]
+        decisive = kind == "or"  # An operand with this value decides the junction
+        if decisive in values:
+            return decisive
+        return None if None in values else not decisive
+    return None
+
+
+def derived(completion, node, concept):
+    """Whether the NNF concept is in the label of the node without depending on any
+    branch point, so that every completion graph has it there."""
+    return completion.labels[node].get(concept) == NO_DEPENDENCIES
+
+
+def refuted_checks(completion, concepts):
+    """The checks the model of a completion graph refutes: (individual, concept) for
+    the concepts (of common.py, mapped to their NNF) an individual is not an instance
+    of, and (concept, concept) for the subsumptions a node is a counterexample to."""
+    refuted = set()
+    blocked = completion.blocked_nodes()
+    for node in completion.labels:
+        if node in blocked:
+            continue
+        instances, non_instances = list(), list()
+        for concept, nnf_concept in concepts.items():
+            value = holds(completion, node, nnf_concept)
+            if value is not None:
+                (instances if value else non_instances).append(concept)
+        if isinstance(node, str):
+            refuted.update((node, concept) for concept in non_instances)
+        refuted.update(product(instances, non_instances))
+    return refuted
+
+
+class BranchPoint:
+    """
+    A nondeterministic rule application: the completion graph it applies to, the
+    alternatives left (functions adding to a copy of the graph what they choose, with
+    the dependencies they get), and the dependencies of the clashes of the
+    alternatives tried, starting with those of the premises of the rule. A clash that
+    does not depend on the branch point rules out its other alternatives too.
+    """
+
+    __slots__ = (
+        "completion",
+        "alternatives",
+        "dependencies",
+        "branch",
+        "clash_dependencies",
+    )
+
+    def __init__(self, completion, alternatives, dependencies):
+        self.completion = completion
+        self.alternatives = list(alternatives)
+        self.branch = completion.branch + 1
+        self.dependencies = dependencies | {self.branch}
+        self.clash_dependencies = set(dependencies)
+
+    def next_completion(self):
+        """A copy of the completion graph, with the next alternative applied."""
+        completion = self.completion.copy()
+        completion.branch = self.branch
+        self.alternatives.pop(0)(completion, self.dependencies)
+        return completion
+
+
+class Tableau:
+    """
+    ALCQ tableau reasoner over a KB of common.py statements, under the unique name
+    assumption of the KB ontologies. TBox axioms whose left side has an atom are
+    unfolded lazily (absorption), the others are internalized: every node gets their
+    ¬C ⊔ D concepts. Disjunctions are propagated before they are branched on, clashes
+    backjump to the latest branch point they depend on, and anywhere subset blocking
+    keeps the completion graphs finite. A check past the deadline (a monotonic() time) raises
+    TableauTimeout.
+    """
+
+    def __init__(self, statements, deadline=None):
+        self.statements = list(statements)
+        self.deadline = deadline
+        self.individuals = dict()
+        self.assertions = list()  # (individual, NNF concept)
+        self.role_assertions = list()  # (role, individual, individual)
+        self.unfoldings = dict()  # atom -> NNF concepts of the nodes it labels
+        # NNF concept -> the disjunctions met so far with an operand it negates
+        self.disjunctions = dict()
+        gcis = dict()
+        for statement in self.statements:
+            if isinstance(statement, ConceptAssertion):
+                self.individuals[statement.individual] = None
+                self.assertions.append((statement.individual, nnf(statement.concept)))
+            elif isinstance(statement, RoleAssertion):
+                self.individuals[statement.Individual_l] = None
+                self.individuals[statement.Individual_r] = None
+                self.role_assertions.append(
+                    (statement.RoleName, statement.Individual_l, statement.Individual_r)
+                )
+            else:
+                for lhs_concept, rhs_concept in tbox_inclusions(statement):
+                    self.absorb(lhs_concept, rhs_concept, gcis)
+        gcis.pop(TOP, None)
+        self.gcis = list(gcis)
+
+    def absorb(self, lhs_concept, rhs_concept, gcis):
+        """Adds the inclusion lhs ⊑ rhs to the unfoldings of an atom of lhs, or else
+        to the gcis."""
+        operands = lhs_concept[1] if lhs_concept[0] == "and" else (lhs_concept,)
+        atoms = [operand for operand in operands if operand[0] == "atom"]
+        if not atoms:
+            gcis[junction("or", [negate(lhs_concept), rhs_concept])] = None
+            return
+        rest = junction("and", [operand for operand in operands if operand != atoms[0]])
+        unfolding = junction("or", [negate(rest), rhs_concept])
+        if unfolding != TOP:
+            self.unfoldings.setdefault(atoms[0], list()).append(unfolding)
+
+    def new_node(
+        self,
+        completion,
+        name=None,
+        parent=None,
+        role=None,
+        dependencies=NO_DEPENDENCIES,
+        concepts=(),
+    ):
+        """Adds a node (see Completion.add_node) with the gcis and the concepts (with
+        their dependencies) in its label."""
+        node = completion.add_node(name, parent, role, dependencies)
+        for gci in self.gcis:
+            completion.add(node, gci, NO_DEPENDENCIES)
+        for concept, dependencies in concepts:
+            completion.add(node, concept, dependencies)
+        return node
+
+    def complete(self, assertions=(), root=None, abox=True):
+        """Returns a complete, clash-free completion graph of the KB (or of its TBox
+        only, without abox) with the (individual, NNF concept) assertions and, if
+        root is given, a new node 0 of the NNF concept root; or None if there is
+        none."""
+        completion = Completion()
+        if root is not None or not (abox and self.individuals) and not assertions:
+            self.new_node(completion, concepts=[(root or TOP, NO_DEPENDENCIES)])
+        if abox:
+            for individual in self.individuals:
+                self.new_node(completion, individual)
+            for individual, concept in self.assertions:
+                completion.add(individual, concept, NO_DEPENDENCIES)
+            for role, subject, object in self.role_assertions:
+                completion.add_edge(subject, role, object, NO_DEPENDENCIES)
+        for individual, concept in assertions:
+            self.new_node(completion, individual, concepts=[(concept, NO_DEPENDENCIES)])
+        return self.expand(completion)
+
+    def expand(self, completion):
+        """Expands the completion graph. Returns it once it is complete and clash-free,
+        or None if every choice leads to a clash."""
+        branch_points = list()
+        while True:
+            if self.deadline is not None and monotonic() > self.deadline:
+                raise TableauTimeout("Tableau timed out")
+            clash = self.apply_deterministic_rules(completion)
+            if clash is None:
+                choice = self.nondeterministic_choice(completion)
+                if choice is None:
+                    if not self.apply_generating_rule(completion):
+                        return completion
+                    continue
+                branch_points.append(BranchPoint(completion, *choice))
+            # Backjump to the latest branch point the clash depends on
+            while True:
+                if clash is not None:
+                    while branch_points and branch_points[-1].branch not in clash:
+                        branch_points.pop()
+                    if not branch_points:
+                        return None
+                    branch_points[-1].clash_dependencies |= clash
+                branch_point = branch_points[-1]
+                if branch_point.alternatives:
+                    completion = branch_point.next_completion()
+                    break
+                branch_points.pop()
+                clash = branch_point.clash_dependencies - {branch_point.branch}
+
+    def apply_deterministic_rules(self, completion):
+        """Applies the ⊓ and ∀ rules, the unfoldings and the propagation of the
+        disjunctions with a single possible operand to the pending additions, until
+        there are none. Returns the dependencies of a clash, or None."""
+        pending = completion.pending
+        while pending:
+            node, concept = pending.pop()
+            label = completion.labels.get(node)
+            if label is None:  # Pruned
+                continue
+            kind = concept[0]
+            if kind == EDGE:
+                _, role, successor = concept
+                edge_dependencies = completion.edges[node].get((role, successor))
+                if edge_dependencies is None:  # Merged
+                    continue
+                for concept, dependencies in list(label.items()):
+                    if concept[0] == "all" and concept[1] == role:
+                        completion.add(
+                            successor, concept[2], dependencies | edge_dependencies
+                        )
+                continue
+
+            dependencies = label[concept]
+            if concept == BOTTOM:
+                return dependencies
+            if kind in ("atom", "not"):
+                negation = negate(concept)
+                if negation in label:
+                    return dependencies | label[negation]
+                for unfolding in self.unfoldings.get(concept, ()):
+                    completion.add(node, unfolding, dependencies)
+            elif kind == "and":
+                for operand in concept[1]:
+                    completion.add(node, operand, dependencies)
+            elif kind == "all":
+                for successor, edge_dependencies in completion.successors(
+                    node, concept[1]
+                ):
+                    completion.add(
+                        successor, concept[2], dependencies | edge_dependencies
+                    )
+            elif kind == "or":
+                for operand in concept[1]:
+                    self.disjunctions.setdefault(negate(operand), set()).add(concept)
+            # The disjunctions the concept rules an operand of out may have a single
+            # possible operand left
+            disjunctions = self.disjunctions.get(concept, set())
+            if kind == "or":
+                disjunctions = disjunctions | {concept}
+            for disjunction in disjunctions:
+                dependencies = label.get(disjunction)
+                if dependencies is None or any(o in label for o in disjunction[1]):
+                    continue
+                open_operands = list()
+                for operand in disjunction[1]:
+                    negation = label.get(negate(operand))
+                    if negation is None:
+                        open_operands.append(operand)
+                    else:
+                        dependencies = dependencies | negation
+                if not open_operands:
+                    return dependencies
+                if len(open_operands) == 1:
+                    completion.add(node, open_operands[0], dependencies)
+        return None
+
+    def nondeterministic_choice(self, completion):
+        """The alternatives (see branch) of the first ≤, choose or ⊔ rule that applies,
+        with the dependencies of its premises, or None. A ≤ rule that has no
+        alternative is a clash. The blocked nodes need none, their blockers stand for
+        them in the model."""
+        blocked = completion.blocked_nodes()
+        for node, concept in completion.atmosts:
+            if node in completion.labels and node not in blocked:
+                dependencies = completion.labels[node][concept]
+                _, n, role, filler = concept
+                if len(completion.edges[node]) <= n:
+                    continue
+                successors = completion.successors(node, role)
+                if len(successors) <= n:  # It holds whatever the successors are
+                    continue
+                negation = negate(filler)
+                for successor, edge_dependencies in successors:
+                    successor_label = completion.labels[successor]
+                    if (
+                        filler not in successor_label
+                        and negation not in successor_label
+                    ):
+                        return [
+                            lambda c, d, s=successor, f=filler: c.add(s, f, d),
+                            lambda c, d, s=successor, f=negation: c.add(s, f, d),
+                        ], dependencies | edge_dependencies
+                fillers = list()
+                for successor, edge_dependencies in successors:
+                    filler_dependencies = completion.labels[successor].get(filler)
+                    if filler_dependencies is not None:
+                        fillers.append(successor)
+                        dependencies = (
+                            dependencies | edge_dependencies | filler_dependencies
+                        )
+                if len(fillers) > n:
+                    pairs, dependencies = self.mergeable_pairs(
+                        completion, fillers, dependencies
+                    )
+                    return [
+                        lambda c, d, x=x, y=y: c.merge(x, y, d) for x, y in pairs
+                    ], dependencies
+        # The disjunctions of pruned nodes and those that hold are dropped for good
+        disjunctions = completion.disjunctions
+        kept = list()
+        for position, (node, concept) in enumerate(disjunctions):
+            label = completion.labels.get(node)
+            if label is None or any(o in label for o in concept[1]):
+                continue
+            kept.append((node, concept))
+            if node not in blocked:
+                completion.disjunctions = kept + disjunctions[position + 1 :]
+                dependencies = label[concept]
+                open_operands = list()
+                for operand in concept[1]:
+                    negation = label.get(negate(operand))
+                    if negation is None:
+                        open_operands.append(operand)
+                    else:
+                        dependencies = dependencies | negation
+                # The operands that add no successors are tried first, and each
+                # alternative rules out the operands tried before it
+                open_operands.sort(key=lambda operand: BRANCHING_ORDER[operand[0]])
+                return [
+                    lambda c, d, n=node, i=index: self.choose_operand(
+                        c, d, n, open_operands, i
+                    )
+                    for index in range(len(open_operands))
+                ], dependencies
+        completion.disjunctions = kept
+        return None
+
+    @staticmethod
+    def choose_operand(completion, dependencies, node, operands, index):
+        completion.add(node, operands[index], dependencies)
+        for operand in operands[:index]:
+            completion.add(node, negate(operand), dependencies)
+
+    @staticmethod
+    def mergeable_pairs(completion, nodes, dependencies):
+        """The (node, into) merges of the nodes that are not distinct, node being
+        anonymous, and the dependencies with those of the distinct pairs added."""
+        pairs = list()
+        for x, y in combinations(nodes, 2):
+            distinction = completion.distinction(x, y)
+            if distinction is None:
+                pairs.append((x, y) if x in completion.parents else (y, x))
+            else:
+                dependencies = dependencies | distinction
+        return pairs, dependencies
+
+    def apply_generating_rule(self, completion):
+        """Applies the ≥ rule (∃ included) to a node that is not blocked, adding
+        pairwise distinct successors. Returns False if it applies nowhere."""
+        blocked = None
+        for node, label in list(completion.labels.items()):
+            for concept, dependencies in label.items():
+                if concept[0] != "atleast":
+                    continue
+                _, n, role, filler = concept
+                fillers = [
+                    s
+                    for s, _ in completion.successors(node, role)
+                    if filler in completion.labels[s]
+                ]
+                if len(fillers) >= n and any(
+                    all(
+                        completion.distinction(x, y) is not None
+                        for x, y in combinations(group, 2)
+                    )
+                    for group in combinations(fillers, n)
+                ):
+                    continue
+                if blocked is None:
+                    blocked = completion.blocked_nodes()
+                if node in blocked:
+                    break
+                successors = [
+                    self.new_node(
+                        completion,
+                        parent=node,
+                        role=role,
+                        dependencies=dependencies,
+                        concepts=[(filler, dependencies)],
+                    )
+                    for _ in range(n)
+                ]
+                for x, y in combinations(successors, 2):
+                    completion.distinct[frozenset((x, y))] = dependencies
+                return True
+        return False
+
+    def is_consistent(self):
+        return self.complete() is not None
+
+    def is_satisfiable(self, concept, abox=True):
+        """Whether the NNF concept is satisfiable w.r.t. the KB (or its TBox only)."""
+        return self.complete(root=concept, abox=abox) is not None
+
+    def is_instance(self, individual, concept):
+        """Whether the KB entails the NNF concept for the individual."""
+        return self.complete([(individual, negate(concept))]) is None
+
+    def is_subsumed(self, lhs_concept, rhs_concept, abox=True):
+        """Whether the KB (or its TBox only) entails lhs ⊑ rhs, for NNF concepts."""
+        return not self.is_satisfiable(
+            junction("and", [lhs_concept, negate(rhs_concept)]), abox
+        )
+
+    def entails(self, statement):
+        """Whether the KB entails the statement."""
+        if isinstance(statement, ConceptAssertion):
+            return self.is_instance(statement.individual, nnf(statement.concept))
+        if isinstance(statement, RoleAssertion):
+            role_assertion = (
+                statement.RoleName,
+                statement.Individual_l,
+                statement.Individual_r,
+            )
+            return role_assertion in self.role_assertions or not self.is_consistent()
+        lhs_concept, rhs_concept = nnf(statement.LHS_concept), nnf(
+            statement.RHS_concept
+        )
+        return self.is_subsumed(lhs_concept, rhs_concept) and (
+            statement.Relationship != "≡" or self.is_subsumed(rhs_concept, lhs_concept)
+        )
+
+    def justification(self, statement):
+        """A minimal subset of the KB statements that entails the statement (which
+        the KB entails), found by removing the statements it does not need."""
+        if statement in self.statements:
+            return [statement]
+        justification = list(self.statements)
+        for candidate in list(justification):
+            rest = [s for s in justification if s is not candidate]
+            if Tableau(rest, self.deadline).entails(statement):
+                justification = rest
+        return justification
+
+    def class_models(self, concepts):
+        """A completion graph of the TBox for each concept (of common.py) on its own,
+        with the concept in the label of its node 0, or None if it is unsatisfiable."""
+        return {
+            concept: self.complete(root=nnf(concept), abox=False)
+            for concept in concepts
+        }
+
+    def inferred_statements(self, model, class_models):
+        """The statements over the concepts of class_models (see class_models) that
+        the KB entails, as the Explainer outputs them: the concepts of each individual,
+        the subsumptions between the concepts, transitively closed as its
+        addTransitiveClosureOfSubclassOf does (of equivalent concepts, only those
+        stated) and the role assertions. model is a
+        completion graph of the KB; the checks a completion graph found so far refutes
+        (see refuted_checks) or derives (see derived) are skipped."""
+        concepts = {concept: nnf(concept) for concept in class_models}
+        refuted = refuted_checks(model, concepts)
+        for class_model in class_models.values():
+            refuted |= refuted_checks(class_model, concepts)
+
+        inferred = list()
+        for individual in self.individuals:
+            for concept, nnf_concept in concepts.items():
+                if (individual, concept) in refuted:
+                    continue
+                if derived(model, individual, nnf_concept):
+                    inferred.append(ConceptAssertion(concept, individual))
+                    continue
+                counter_model = self.complete([(individual, negate(nnf_concept))])
+                if counter_model is None:
+                    inferred.append(ConceptAssertion(concept, individual))
+                else:
+                    refuted |= refuted_checks(counter_model, concepts)
+
+        # Subsumptions w.r.t. the TBox are those w.r.t. the KB, as it is consistent
+        subsumptions = dict()  # Insertion-ordered set
+        for lhs_concept, lhs_model in class_models.items():
+            for rhs_concept, nnf_concept in concepts.items():
+                if rhs_concept == lhs_concept or (lhs_concept, rhs_concept) in refuted:
+                    continue
+                if derived(lhs_model, 0, nnf_concept):
+                    subsumptions[lhs_concept, rhs_concept] = None
+                    continue
+                counter_model = self.complete(
+                    root=junction("and", [concepts[lhs_concept], negate(nnf_concept)]),
+                    abox=False,
+                )
+                if counter_model is None:
+                    subsumptions[lhs_concept, rhs_concept] = None
+                else:
+                    refuted |= refuted_checks(counter_model, concepts)
+        for lhs_concept, rhs_concept in subsumptions:
+            statement = TBoxAxiom(lhs_concept, "⊑", rhs_concept)
+            if (rhs_concept, lhs_concept) not in subsumptions or (
+                statement in self.statements
+            ):
+                inferred.append(statement)
+
+        inferred.extend(
+            RoleAssertion(role, subject, object)
+            for role, subject, object in self.role_assertions
+        )
+        return inferred
@@ -0,0 +1,5 @@
+import sys
+from os.path import dirname, abspath
+
+# The modules live at the top level of the repository
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
@@ -0,0 +1,47 @@
+from common import (
+    AtomicConcept,
+    ConceptAssertion,
+    RestrictionConcept,
+    RoleAssertion,
+    TBoxAxiom,
+)
+from owl_functional import DeltaOntology, FunctionalOntology
+
+RED, BLUE = AtomicConcept("+", "red"), AtomicConcept("+", "blue")
+TOP = AtomicConcept("+", "⊤")
+
+BASE = FunctionalOntology(
+    [ConceptAssertion(RED, "Anne"), RoleAssertion("sees", "Anne", "Bob")],
+    [TBoxAxiom(TOP, "⊑", RestrictionConcept("∀", "likes", RED))],
+)
+
+
+def axioms(document):
+    return set(document.decode("utf-8").splitlines()[2:-1])
+
+
+def test_delta_adds_the_axioms_of_the_extension():
+    for statement in [
+        ConceptAssertion(BLUE, "Bob"),
+        RoleAssertion("sees", "Bob", "Carl"),  # A new individual
+        TBoxAxiom(RED, "⊑", RestrictionConcept("∃", "sees", BLUE)),
+    ]:
+        ontology = DeltaOntology(BASE, statement)
+        assert ontology.adds_to_base()
+        delta = axioms(ontology.delta())
+        base = axioms(bytes(BASE))
+        if any(axiom.startswith("DifferentIndividuals") for axiom in delta):
+            # The delta states the different individuals again, with the new ones
+            base = {axiom for axiom in base if "DifferentIndividuals" not in axiom}
+        assert base | delta == axioms(bytes(ontology))
+
+
+def test_delta_of_a_reset_role_is_not_added():
+    for statement in [
+        ConceptAssertion(RestrictionConcept("∃", "likes", BLUE), "Anne"),
+        RoleAssertion("likes", "Bob", "Anne"),
+        TBoxAxiom(TOP, "⊑", RestrictionConcept("∀", "likes", BLUE)),
+    ]:
+        ontology = DeltaOntology(BASE, statement)
+        assert not ontology.adds_to_base()
+        assert axioms(bytes(BASE)) - axioms(bytes(ontology))
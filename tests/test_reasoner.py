@@ -0,0 +1,80 @@
+import pytest
+from global_variables import INCONSISTENCY_MSG
+from reasoner import (
+    ExplanationBlocks,
+    ReasonerError,
+    ReasonerTimeout,
+    batch_payload,
+    check_each,
+    parse_verdicts,
+    run_requests,
+)
+
+
+def test_parse_verdicts():
+    assert parse_verdicts("true\nfalse\ntrue\n", 3) == [True, False, True]
+    assert parse_verdicts("", 0) == []
+
+
+@pytest.mark.parametrize("output", ["true\n", "true\nfalse\ntrue\nfalse\n", ""])
+def test_parse_verdicts_rejects_a_wrong_count(output):
+    with pytest.raises(ReasonerError):
+        parse_verdicts(output, 3)
+
+
+def test_check_each_keeps_the_verdicts_before_a_timeout():
+    def check_consistency(ontology, timeout):
+        if ontology == "slow":
+            raise ReasonerTimeout("Reasoner timed out")
+        return INCONSISTENCY_MSG if ontology == "inconsistent" else ""
+
+    with pytest.raises(ReasonerTimeout) as timeout:
+        check_each(check_consistency, ["consistent", "inconsistent", "slow", "x"], 9)
+    assert timeout.value.verdicts == [True, False]
+
+
+def test_run_requests_sends_outputs_and_throws_failures():
+    class EchoReasoner:
+        def infer(self, ontology, timeout):
+            if timeout <= 0:
+                raise ReasonerTimeout("Reasoner timed out")
+            return ontology
+
+    def requests():
+        outputs = [(yield "infer", "a", 1)]
+        try:
+            yield "infer", "b", 0
+        except ReasonerTimeout:
+            outputs.append(None)
+        return outputs
+
+    assert run_requests(requests(), EchoReasoner()) == ["a", None]
+
+
+def test_batch_payload():
+    assert batch_payload([b"base", b"", "δ".encode()]) == b"4\nbase0\n2\n\xce\xb4"
+
+
+def test_explanation_blocks_are_split_across_chunks():
+    output = '{"entailment": "∃ r"}\n{"entailment": "B"}\n{"entail'.encode()
+    blocks = ExplanationBlocks()
+    for start in range(0, len(output), 3):  # Splits the UTF-8 of ∃ too
+        blocks.feed(output[start : start + 3])
+    assert blocks.blocks == ['{"entailment": "∃ r"}\n', '{"entailment": "B"}\n']
+    assert blocks.output() == '{"entailment": "∃ r"}\n{"entailment": "B"}\n'
+    assert not blocks.stopped
+
+
+def test_explanation_blocks_stop_when_asked():
+    seen = list()
+
+    def on_explanation(block):
+        seen.append(block)
+        return len(seen) == 2
+
+    blocks = ExplanationBlocks(on_explanation)
+    blocks.feed(b"a\nb\nc\n")
+    blocks.feed(b"d\n")
+    assert blocks.stopped
+    assert seen == ["a\n", "b\n"]
+    assert blocks.output() == "a\nb\n"
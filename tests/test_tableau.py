@@ -0,0 +1,257 @@
+from os.path import abspath, dirname, exists, join
+from shutil import which
+import pytest
+from common import (
+    AtomicConcept,
+    ConceptAssertion,
+    JunctionConcept,
+    RestrictionConcept,
+    RoleAssertion,
+    TBoxAxiom,
+)
+from global_variables import EXPLAINER_JAR, INCONSISTENCY_MSG
+from owl_functional import DeltaOntology, FunctionalOntology
+from reasoner import (
+    OneShotReasoner,
+    TableauReasoner,
+    inferred_verdicts,
+    kb_statements,
+)
+from tableau import Tableau
+
+REPOSITORY = dirname(dirname(abspath(__file__)))
+
+C, D, E = (AtomicConcept("+", name) for name in ("c", "d", "e"))
+BIG, RED = AtomicConcept("+", "big"), AtomicConcept("+", "red")
+BLUE, GREEN = AtomicConcept("+", "blue"), AtomicConcept("+", "green")
+TOP, BOTTOM = AtomicConcept("+", "⊤"), AtomicConcept("+", "⊥")
+
+
+def R(restriction, concept, role="R"):
+    return RestrictionConcept(restriction, role, concept)
+
+
+# (name, KB, statement, whether the KB entails it)
+ENTAILMENTS = [
+    (
+        "subsumption",
+        [ConceptAssertion(BIG, "a"), TBoxAxiom(BIG, "⊑", RED)],
+        ConceptAssertion(RED, "a"),
+        True,
+    ),
+    (
+        "no subsumption",
+        [ConceptAssertion(BIG, "a"), TBoxAxiom(BIG, "⊑", RED)],
+        ConceptAssertion(C, "a"),
+        False,
+    ),
+    (
+        "merge",
+        [
+            RoleAssertion("R", "a", "b"),
+            ConceptAssertion(R("∃", D), "a"),
+            ConceptAssertion(R("<= 1", TOP), "a"),
+        ],
+        ConceptAssertion(D, "b"),
+        True,
+    ),
+    (
+        "universal",
+        [RoleAssertion("R", "a", "b"), ConceptAssertion(R("∀", D), "a")],
+        ConceptAssertion(D, "b"),
+        True,
+    ),
+    (
+        "existential subsumption",
+        [TBoxAxiom(C, "⊑", R("∃", D)), TBoxAxiom(R("∃", TOP), "⊑", E)],
+        TBoxAxiom(C, "⊑", E),
+        True,
+    ),
+    (
+        "converse subsumption",
+        [TBoxAxiom(C, "⊑", R("∃", D)), TBoxAxiom(R("∃", TOP), "⊑", E)],
+        TBoxAxiom(E, "⊑", C),
+        False,
+    ),
+    (
+        "subsumption chain",
+        [TBoxAxiom(RED, "⊑", BLUE), TBoxAxiom(BLUE, "⊑", GREEN)],
+        TBoxAxiom(RED, "⊑", GREEN),
+        True,
+    ),
+    (
+        "exact cardinality",
+        [ConceptAssertion(R("= 2", C), "a"), TBoxAxiom(C, "⊑", D)],
+        ConceptAssertion(R(">= 2", D), "a"),
+        True,
+    ),
+    (
+        "exact cardinality bound",
+        [ConceptAssertion(R("= 2", C), "a"), TBoxAxiom(C, "⊑", D)],
+        ConceptAssertion(R(">= 3", D), "a"),
+        False,
+    ),
+    (
+        "disjunction",
+        [
+            ConceptAssertion(JunctionConcept(C, "⊔", D), "a"),
+            TBoxAxiom(C, "⊑", E),
+            TBoxAxiom(D, "⊑", E),
+        ],
+        ConceptAssertion(E, "a"),
+        True,
+    ),
+    (
+        "unsatisfiable class",
+        [TBoxAxiom(C, "⊑", R(">= 2", C)), TBoxAxiom(C, "⊑", R("<= 1", TOP))],
+        TBoxAxiom(C, "⊑", BOTTOM),
+        True,
+    ),
+    (
+        "negated equivalence",
+        [
+            TBoxAxiom(C, "≡", AtomicConcept("¬", "d")),
+            ConceptAssertion(AtomicConcept("¬", "c"), "a"),
+        ],
+        ConceptAssertion(D, "a"),
+        True,
+    ),
+]
+
+# (name, KB, whether it is consistent)
+CONSISTENCY = [
+    (
+        "contradiction",
+        [
+            ConceptAssertion(BIG, "a"),
+            TBoxAxiom(BIG, "⊑", RED),
+            ConceptAssertion(AtomicConcept("¬", "red"), "a"),
+        ],
+        False,
+    ),
+    (
+        "cardinality clash",
+        [
+            ConceptAssertion(R(">= 3", C), "a"),
+            ConceptAssertion(R("<= 2", TOP), "a"),
+        ],
+        False,
+    ),
+    (
+        "cardinality fit",
+        [
+            ConceptAssertion(R(">= 2", C), "a"),
+            ConceptAssertion(R("<= 2", TOP), "a"),
+        ],
+        True,
+    ),
+    (
+        "unique names",
+        [
+            RoleAssertion("R", "a", "b"),
+            RoleAssertion("R", "a", "c"),
+            RoleAssertion("R", "a", "d"),
+            ConceptAssertion(R("< 3", TOP), "a"),
+        ],
+        False,
+    ),
+    (
+        "strict cardinalities",
+        [ConceptAssertion(R("> 1", C), "a"), ConceptAssertion(R("< 2", C), "a")],
+        False,
+    ),
+    (
+        "choose rule",
+        [
+            ConceptAssertion(R("<= 1", C), "a"),
+            ConceptAssertion(R(">= 2", TOP), "a"),
+            ConceptAssertion(R("∀", C), "a"),
+        ],
+        False,
+    ),
+    (
+        "blocking",
+        [TBoxAxiom(C, "⊑", R("∃", C)), ConceptAssertion(C, "a")],
+        True,
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "kb, statement, entailed",
+    [case[1:] for case in ENTAILMENTS],
+    ids=[case[0] for case in ENTAILMENTS],
+)
+def test_entailment(kb, statement, entailed):
+    assert Tableau(kb).entails(statement) == entailed
+
+
+@pytest.mark.parametrize(
+    "kb, consistent",
+    [case[1:] for case in CONSISTENCY],
+    ids=[case[0] for case in CONSISTENCY],
+)
+def test_consistency(kb, consistent):
+    assert Tableau(kb).is_consistent() == consistent
+
+
+def test_justification_is_minimal():
+    kb = [
+        ConceptAssertion(JunctionConcept(C, "⊔", D), "a"),
+        TBoxAxiom(C, "⊑", E),
+        TBoxAxiom(D, "⊑", E),
+        ConceptAssertion(BIG, "b"),
+    ]
+    justification = Tableau(kb).justification(ConceptAssertion(E, "a"))
+    assert justification == kb[:3]
+
+
+def kb_ontology(kb):
+    abox = [statement for statement in kb if not isinstance(statement, TBoxAxiom)]
+    tbox = [statement for statement in kb if isinstance(statement, TBoxAxiom)]
+    return FunctionalOntology(abox, tbox)
+
+
+def test_tableau_reasoner_infer():
+    ontology = kb_ontology(ENTAILMENTS[0][1])
+    inferred = inferred_verdicts(TableauReasoner().infer(ontology, 10), ontology.names)
+    assert ConceptAssertion(RED, "a") in inferred
+    assert TBoxAxiom(BIG, "⊑", RED) in inferred
+
+    # The Explainer closes the subsumptions transitively
+    ontology = kb_ontology([TBoxAxiom(RED, "⊑", BLUE), TBoxAxiom(BLUE, "⊑", GREEN)])
+    inferred = inferred_verdicts(TableauReasoner().infer(ontology, 10), ontology.names)
+    assert TBoxAxiom(RED, "⊑", GREEN) in inferred
+
+    ontology = kb_ontology(CONSISTENCY[0][1])
+    assert INCONSISTENCY_MSG in TableauReasoner().infer(ontology, 10)
+
+
+def test_kb_statements_of_extension_resets_range():
+    likes_red = TBoxAxiom(TOP, "⊑", R("∀", RED, "likes"))
+    likes_blue = ConceptAssertion(R("∃", BLUE, "likes"), "Anne")
+    ontology = DeltaOntology(FunctionalOntology([], [likes_red]), likes_blue)
+    # The new use of the role drops the range statement, as in bytes(ontology)
+    assert kb_statements(ontology) == [likes_blue]
+    assert b"ObjectPropertyRange" not in bytes(ontology)
+
+
+@pytest.mark.skipif(
+    which("java") is None or not exists(join(REPOSITORY, EXPLAINER_JAR)),
+    reason="needs java and the Explainer jar built from owlapi_scripts",
+)
+@pytest.mark.parametrize(
+    "kb",
+    [case[1] for case in ENTAILMENTS + CONSISTENCY],
+    ids=[case[0] for case in ENTAILMENTS + CONSISTENCY],
+)
+def test_tableau_agrees_with_hermit(kb, monkeypatch):
+    monkeypatch.chdir(REPOSITORY)  # The jar paths are relative to it
+    ontology = kb_ontology(kb)
+    hermit, tableau = OneShotReasoner(), TableauReasoner()
+    assert inferred_verdicts(
+        tableau.infer(ontology, 60), ontology.names
+    ) == inferred_verdicts(hermit.infer(ontology, 60), ontology.names)
+    assert (INCONSISTENCY_MSG in tableau.check_consistency(ontology, 60)) == (
+        INCONSISTENCY_MSG in hermit.check_consistency(ontology, 60)
+    )
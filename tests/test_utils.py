@@ -0,0 +1,106 @@
+import pytest
+from common import (
+    AtomicConcept,
+    ConceptAssertion,
+    JunctionConcept,
+    RestrictionConcept,
+    TBoxAxiom,
+)
+from utils import alcq_negate, canonical_key, canonicalize
+
+A = AtomicConcept("+", "A")
+B = AtomicConcept("+", "B")
+
+
+@pytest.mark.parametrize(
+    "concept",
+    [
+        A,
+        AtomicConcept("¬", "A"),
+        AtomicConcept("+", "⊤"),
+        JunctionConcept(A, "⊓", B),
+        RestrictionConcept("∃", "r", JunctionConcept(A, "⊔", B)),
+        RestrictionConcept(">= 2", "r", A),
+        RestrictionConcept("<= 1", "r", A),
+        RestrictionConcept("> 1", "r", A),
+        RestrictionConcept("< 3", "r", A),
+    ],
+)
+def test_negation_is_an_involution(concept):
+    assert alcq_negate(alcq_negate(concept)) is concept
+
+
+def test_exact_cardinality_negation_cannot_be_negated():
+    concept = RestrictionConcept("= 2", "r", A)
+    negation = alcq_negate(concept)
+    assert negation.restriction == "!= 2"
+    assert concept.negation is negation
+    with pytest.raises(ValueError):
+        alcq_negate(negation)
+    with pytest.raises(ValueError):
+        alcq_negate(RestrictionConcept("!= 3", "r", B))
+
+
+C = AtomicConcept("+", "C")
+TOP = AtomicConcept("+", "⊤")
+BOTTOM = AtomicConcept("+", "⊥")
+
+
+@pytest.mark.parametrize(
+    "concept, variant",
+    [
+        (JunctionConcept(A, "⊓", B), JunctionConcept(B, "⊓", A)),
+        (
+            JunctionConcept(JunctionConcept(A, "⊔", B), "⊔", C),
+            JunctionConcept(C, "⊔", JunctionConcept(B, "⊔", A)),
+        ),
+        (A, JunctionConcept(A, "⊓", A)),
+        (A, JunctionConcept(A, "⊓", TOP)),
+        (BOTTOM, JunctionConcept(A, "⊓", BOTTOM)),
+        (TOP, JunctionConcept(B, "⊔", TOP)),
+        (BOTTOM, AtomicConcept("¬", "⊤")),
+        (RestrictionConcept(">= 3", "r", A), RestrictionConcept("> 2", "r", A)),
+        (RestrictionConcept("<= 1", "r", A), RestrictionConcept("< 2", "r", A)),
+        (RestrictionConcept("∃", "r", A), RestrictionConcept(">= 1", "r", A)),
+        (
+            RestrictionConcept("∀", "r", AtomicConcept("¬", "A")),
+            RestrictionConcept("<= 0", "r", A),
+        ),
+        (
+            RestrictionConcept("∃", "r", JunctionConcept(A, "⊓", B)),
+            RestrictionConcept("> 0", "r", JunctionConcept(B, "⊓", A)),
+        ),
+    ],
+)
+def test_canonical_key_is_shared_by_variants(concept, variant):
+    assert canonicalize(concept) is canonicalize(variant)
+    assert canonical_key(ConceptAssertion(concept, individual="a")) == canonical_key(
+        ConceptAssertion(variant, individual="a")
+    )
+    assert canonical_key(TBoxAxiom(concept, "⊑", C)) == canonical_key(
+        TBoxAxiom(variant, "⊑", C)
+    )
+
+
+def test_canonical_key_keeps_distinct_statements_apart():
+    assert canonical_key(ConceptAssertion(A, individual="a")) != canonical_key(
+        ConceptAssertion(A, individual="b")
+    )
+    assert canonical_key(TBoxAxiom(A, "⊑", B)) != canonical_key(TBoxAxiom(B, "⊑", A))
+    assert canonicalize(RestrictionConcept(">= 2", "r", A)) is not canonicalize(
+        RestrictionConcept(">= 2", "s", A)
+    )
+
+
+def test_canonical_key_of_equivalence_is_symmetric():
+    assert canonical_key(TBoxAxiom(A, "≡", JunctionConcept(B, "⊔", C))) == (
+        canonical_key(TBoxAxiom(JunctionConcept(C, "⊔", B), "≡", A))
+    )
+
+
+def test_canonical_form_is_a_fixed_point():
+    concept = JunctionConcept(
+        RestrictionConcept("> 1", "r", JunctionConcept(B, "⊓", A)), "⊔", C
+    )
+    canonical = canonicalize(concept)
+    assert canonicalize(canonical) is canonical
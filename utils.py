@@ -1,4 +1,7 @@
+import global_variables
+from re import compile as compile_regex
 from common import (
+    Concept,
     AtomicConcept,
     JunctionConcept,
     RestrictionConcept,
@@ -7,6 +10,123 @@ from common import (
     RoleAssertion,
 )
 
+POLARITIES = {"+", "¬"}
+JUNCTION_CONNECTIVES = {"⊓", "⊔"}
+QUANTIFIERS = {"∀", "∃"}
+CARDINALITY_SYMBOLS = {">", ">=", "<", "<=", "="}
+AXIOM_RELATIONSHIPS = {"⊑", "≡"}
+SYNTAX_TOKENS = (
+    {"(", ")", ".", ","}
+    | POLARITIES
+    | JUNCTION_CONNECTIVES
+    | QUANTIFIERS
+    | CARDINALITY_SYMBOLS
+    | AXIOM_RELATIONSHIPS
+)
+
+
+TOKEN_REGEX = compile_regex(r"[(),]|[^\s(),]+")
+
+
+def tokenize(text):
+    """Splits DL text into its tokens; parentheses and commas are always tokens of their own."""
+    return TOKEN_REGEX.findall(text)
+
+
+class DLParser:
+    """Single-pass recursive-descent parser over the tokens of a DL statement:
+    Concept     -> Polarity ConceptName
+                 | '(' Concept ')' [ Connective '(' Concept ')' ]
+                 | Restriction RoleName ['.'] '(' Concept ')'
+    Restriction -> Quantifier | CardinalitySymbol Number
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def error(self, message):
+        return ValueError(f"{message} in DL text: '{self.text}'")
+
+    def next(self):
+        if self.pos == len(self.tokens):
+            raise self.error("Unexpected end")
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def expect(self, expected):
+        token = self.next()
+        if token != expected:
+            raise self.error(f"Expected '{expected}' but got '{token}'")
+        return token
+
+    def end(self):
+        if self.pos != len(self.tokens):
+            raise self.error(f"Unexpected '{self.tokens[self.pos]}'")
+
+    def parenthesized_concept(self):
+        self.expect("(")
+        concept = self.concept()
+        self.expect(")")
+        return concept
+
+    def concept(self):
+        token = self.next()
+
+        if token in POLARITIES:
+            return AtomicConcept(token, self.next())
+
+        if token == "(":
+            self.pos -= 1
+            lhs_concept = self.parenthesized_concept()
+            if self.peek() not in JUNCTION_CONNECTIVES:
+                return lhs_concept
+            connective = self.next()
+            rhs_concept = self.parenthesized_concept()
+            return JunctionConcept(lhs_concept, connective, rhs_concept)
+
+        if token in QUANTIFIERS:
+            restriction = token
+        elif token in CARDINALITY_SYMBOLS:
+            restriction = f"{token} {self.next()}"
+        else:
+            raise self.error(f"Unexpected '{token}'")
+
+        role_name = self.next()
+        if self.peek() == ".":
+            self.pos += 1
+        return RestrictionConcept(restriction, role_name, self.parenthesized_concept())
+
+    def abox_assertion(self):
+        if self.peek() == "(":  # Concept Assertion
+            concept = self.parenthesized_concept()
+            self.expect("(")
+            individual_name = self.next()
+            self.expect(")")
+            return ConceptAssertion(concept, individual_name)
+
+        # Role Assertion
+        role_name = self.next()
+        self.expect("(")
+        individual_name1 = self.next()
+        self.expect(",")
+        individual_name2 = self.next()
+        self.expect(")")
+        return RoleAssertion(role_name, individual_name1, individual_name2)
+
+    def tbox_axiom(self):
+        lhs = self.concept()
+        relation = self.next()
+        if relation not in AXIOM_RELATIONSHIPS:
+            raise self.error("Invalid TBox Axiom")
+        rhs = self.concept()
+        return TBoxAxiom(lhs, relation, rhs)
+
 
 def parse_abox_assertion(text):
     """Parses text into an ABox Assertion (Concept / Role Assertion).
@@ -18,23 +138,59 @@ def parse_abox_assertion(text):
         ConceptAssertion or RoleAssertion: Parsed ABox assertion.
 
     Raises:
-        ValueError: If the text is None.
+        ValueError: If the text is None or not a valid ABox assertion.
     """
 
     if text is None:
         raise ValueError("Empty Assertion!")
 
-    text = text.split()
+    parser = DLParser(text)
+    assertion = parser.abox_assertion()
+    parser.end()
 
-    if len(text) == 6:  # Role Assertion
-        role_name = text[0]
-        individual_name1 = text[2]
-        individual_name2 = text[4]
-        return RoleAssertion(role_name, individual_name1, individual_name2)
-    else:  # Concept Assertion
-        concept = parse_concept(" ".join(text[1:-4]))  # remove the outer parentheses
-        individual_name = text[-2]
-        return ConceptAssertion(concept, individual_name)
+    if global_variables.VERIFY_PARSER and isinstance(assertion, ConceptAssertion):
+        verify_parsed_concept(" ".join(text.split()[1:-4]), assertion.concept)
+
+    return assertion
+
+
+def parse_concept(text):
+    """Parses DL text into a Concept"""
+    parser = DLParser(text)
+    concept = parser.concept()
+    parser.end()
+
+    if global_variables.VERIFY_PARSER:
+        verify_parsed_concept(text, concept)
+
+    return concept
+
+
+def parse_tbox_axiom(statement_txt):
+    """
+    Parses text into a TBox Axiom (Subsumption / Equivalence).
+    E.g.:
+        + male ⊑ + person
+    """
+    parser = DLParser(statement_txt)
+    axiom = parser.tbox_axiom()
+    parser.end()
+
+    if global_variables.VERIFY_PARSER:
+        lhs_txt, rhs_txt = statement_txt.split(axiom.Relationship, 1)
+        verify_parsed_concept(lhs_txt, axiom.LHS_concept)
+        verify_parsed_concept(rhs_txt, axiom.RHS_concept)
+
+    return axiom
+
+
+def verify_parsed_concept(text, concept):
+    """Checks a parsed concept against the legacy parser (enabled with VERIFY_PARSER)."""
+    legacy_concept = old_parse_concept(text)
+    if concept != legacy_concept:
+        raise AssertionError(
+            f"Parsers disagree on '{text}': {concept} != {legacy_concept}"
+        )
 
 
 def is_junction_concept(text, connective):
@@ -62,59 +218,6 @@ def is_junction_concept(text, connective):
     return -1
 
 
-def parse_atomic_concept(text_list):
-    polarity = text_list[0]
-    concept_name = text_list[1]
-    return AtomicConcept(polarity, concept_name)
-
-
-def parse_junction_concept(text, connective_idx):
-    lhs_text = text[0:connective_idx]
-    rhs_text = text[connective_idx + 1 :]
-
-    lhs_text = lhs_text[lhs_text.find("(") + 1 : lhs_text.rfind(")")]
-    rhs_text = rhs_text[rhs_text.find("(") + 1 : rhs_text.rfind(")")]
-
-    lhs_concept = parse_concept(lhs_text.strip())
-    rhs_concept = parse_concept(rhs_text.strip())
-
-    atomic_in_lhs = isinstance(lhs_concept, AtomicConcept) or (
-        isinstance(lhs_concept, JunctionConcept) and lhs_concept.has_atomic
-    )
-
-    atomic_in_rhs = isinstance(rhs_concept, AtomicConcept) or (
-        isinstance(rhs_concept, JunctionConcept) and rhs_concept.has_atomic
-    )
-
-    return JunctionConcept(
-        lhs_concept, text[connective_idx], rhs_concept, atomic_in_lhs, atomic_in_rhs
-    )
-
-
-def parse_restriction_concept(text, restriction, role_idx=1):
-    text_list = text.split()
-    role_name = text_list[role_idx]
-    inner_concept = ""
-
-    left_parentheses = 1
-    right_parentheses = 0
-    start_idx = text.find("(") + 1
-
-    for x in text[start_idx:]:
-        if x == "(":
-            left_parentheses += 1
-        elif x == ")":
-            right_parentheses += 1
-
-        if left_parentheses == right_parentheses:
-            break
-        inner_concept += x
-
-    return RestrictionConcept(
-        restriction, role_name, parse_concept(inner_concept.strip())
-    )
-
-
 def old_parse_concept(text):
     """Parses text into a Concept"""
 
@@ -234,57 +337,104 @@ def old_parse_concept(text):
         assert False
 
 
-def parse_concept(text):
-    """Parses DL text into a Concept"""
-    original_text = text
-    text = text.strip()
-    text_list = text.replace("(", "").replace(")", "").split()
+def is_name_token(token):
+    return isinstance(token, str) and token not in SYNTAX_TOKENS
 
-    if len(text_list) == 2:
-        return parse_atomic_concept(text_list)
-
-    conjunction_idx = is_junction_concept(text, connective="⊓")
-    if conjunction_idx != -1:
-        ans = parse_junction_concept(text, conjunction_idx)
-        old_ans = old_parse_concept(original_text)
-        assert ans == old_ans
-        return ans
-
-    disjunction_idx = is_junction_concept(text, connective="⊔")
-    if disjunction_idx != -1:
-        ans = parse_junction_concept(text, disjunction_idx)
-        old_ans = old_parse_concept(original_text)
-        assert ans == old_ans
-        return ans
 
-    if text_list[0] in {"∀", "∃"}:
-        return parse_restriction_concept(text, restriction=text_list[0])
+def is_restriction_token(token):
+    if not isinstance(token, str):
+        return False
+    if token in QUANTIFIERS:
+        return True
+    symbol, _, quantity = token.partition(" ")
+    return symbol in CARDINALITY_SYMBOLS and quantity.isdigit()
+
+
+class StatementBuilder:
+    """Builds the ABox assertion / TBox axiom of a DL statement from its tokens,
+    while they are being generated, without going through the text parser.
+
+    Every pushed token is shifted on a stack whose top is folded into a concept
+    as soon as it completes one:
+        Polarity ConceptName                            -> AtomicConcept
+        '(' Concept ')' Connective '(' Concept ')'      -> JunctionConcept
+        Restriction RoleName ['.'] '(' Concept ')'      -> RestrictionConcept
+    where a Restriction is either a quantifier or a cardinality symbol followed
+    by a number. The built objects are equal to the ones the parser returns.
+    """
 
-    if text_list[0] in {">", "<", "=", ">=", "<="}:
-        restriction = " ".join(text_list[0:2])
-        return parse_restriction_concept(text, restriction=restriction, role_idx=2)
+    def __init__(self):
+        self.items = []
 
-    raise ValueError(f"Unexpected text in concept parser: {text}")
+    def push(self, token):
+        items = self.items
+        items.append(token)
 
+        if token == ")":
+            self._fold_parentheses()
+        elif len(items) >= 2 and isinstance(items[-2], str):
+            if items[-2] in POLARITIES and is_name_token(token):
+                items[-2:] = [AtomicConcept(items[-2], token)]
+            elif items[-2] in CARDINALITY_SYMBOLS and token.isdigit():
+                items[-2:] = [f"{items[-2]} {token}"]
 
-def parse_tbox_axiom(statement_txt):
-    """
-    Parses text into a TBox Axiom (Subsumption / Equivalence).
-    E.g.:
-        + male ⊑ + person
-    """
-    if "⊑" in statement_txt:
-        lhs_txt, rhs_txt = statement_txt.split("⊑", 1)
-        relation = "⊑"
-    elif "≡" in statement_txt:
-        lhs_txt, rhs_txt = statement_txt.split("≡", 1)
-        relation = "≡"
-    else:
-        raise ValueError("Invalid TBox Axiom!")
+    def _fold_parentheses(self):
+        items = self.items
+        if len(items) < 4 or items[-3] != "(" or not isinstance(items[-2], Concept):
+            return
 
-    lhs = parse_concept(lhs_txt.strip())
-    rhs = parse_concept(rhs_txt.strip())
-    return TBoxAxiom(lhs, relation, rhs)
+        concept = items[-2]
+        if (
+            len(items) >= 7
+            and items[-4] in JUNCTION_CONNECTIVES
+            and items[-5] == ")"
+            and isinstance(items[-6], Concept)
+            and items[-7] == "("
+        ):
+            items[-7:] = [JunctionConcept(items[-6], items[-4], concept)]
+        elif (
+            len(items) >= 6
+            and items[-4] == "."
+            and is_name_token(items[-5])
+            and is_restriction_token(items[-6])
+        ):
+            items[-6:] = [RestrictionConcept(items[-6], items[-5], concept)]
+        elif is_name_token(items[-4]) and is_restriction_token(items[-5]):
+            items[-5:] = [RestrictionConcept(items[-5], items[-4], concept)]
+
+    def result(self):
+        """Returns the built statement: a ConceptAssertion, RoleAssertion, TBoxAxiom or Concept."""
+        items = self.items
+
+        if len(items) == 1 and isinstance(items[0], Concept):
+            return items[0]
+        if (
+            len(items) == 3
+            and isinstance(items[0], Concept)
+            and items[1] in AXIOM_RELATIONSHIPS
+            and isinstance(items[2], Concept)
+        ):
+            return TBoxAxiom(items[0], items[1], items[2])
+        if len(items) == 6 and items[-1] == ")":
+            if (
+                items[0] == "("
+                and isinstance(items[1], Concept)
+                and items[2] == ")"
+                and items[3] == "("
+            ):
+                return ConceptAssertion(items[1], items[4])
+            if is_name_token(items[0]) and items[1] == "(" and items[3] == ",":
+                return RoleAssertion(items[0], items[2], items[4])
+
+        raise ValueError(f"Unexpected tokens in statement builder: {items}")
+
+
+def build_statement(tokens):
+    """Builds a DL statement from its tokens with a StatementBuilder."""
+    builder = StatementBuilder()
+    for token in tokens:
+        builder.push(token)
+    return builder.result()
 
 
 def contains_same_sides(concept):
@@ -345,11 +495,12 @@ def is_tautology(axiom):
     return False
 
 
-def tbox_axiom_constrain_check(generated_tbox_axiom, current_tbox):
+def tbox_axiom_constrain_check(generated_tbox_axiom, subsumption_graph):
     """
     Checks whether a generated TBox Axiom is valid according to the following rules:
         1. TBox axioms with the same sides, applied recursively
         2. Tautologies
+        3. Axioms closing a cycle in the SubsumptionGraph of the current TBox
     """
 
     lhs = generated_tbox_axiom.LHS_concept
@@ -365,62 +516,103 @@ def tbox_axiom_constrain_check(generated_tbox_axiom, current_tbox):
     if generated_tbox_axiom.LHS_concept == generated_tbox_axiom.RHS_concept:
         return False
 
-    graph = build_graph(list(current_tbox) + [generated_tbox_axiom])
-
-    if has_cycle(graph):
+    if subsumption_graph.creates_cycle(lhs, rhs):
         return False
     return True
 
 
-def build_graph(tbox_axioms):
-    graph = {}
-    for axiom in tbox_axioms:
-        lhs = axiom.LHS_concept
-        rhs = axiom.RHS_concept
-
-        if lhs not in graph:
-            graph[lhs] = []
-
-        if rhs not in graph:
-            graph[rhs] = []
-
-        graph[lhs].append(rhs)
-
-    return graph
-
-
-def has_cycle_util(graph, node, visited, rec_stack):
-    visited.add(node)
-    rec_stack.add(node)
+class SubsumptionGraph:
+    """
+    Graph of the TBox axioms, with an edge from the LHS to the RHS concept of each axiom,
+    kept acyclic. A topological order of the concepts is maintained online, as in
+    Pearce & Kelly's algorithm, so that checking and adding an edge only searches the
+    concepts ordered between its two ends instead of the whole graph.
+    """
 
-    for neighbor in graph[node]:
-        if neighbor not in visited:
-            if has_cycle_util(graph, neighbor, visited, rec_stack):
-                return True
-        elif neighbor in rec_stack:
+    def __init__(self, tbox_axioms=()):
+        self.successors = dict()
+        self.predecessors = dict()
+        self.order = dict()
+        self.lowest = 0
+        self.highest = -1
+        for axiom in tbox_axioms:
+            self.add_axiom(axiom)
+
+    def __len__(self):
+        return len(self.order)
+
+    def add_node(self, node, first=False):
+        """Adds a new node at the start or the end of the topological order."""
+        if node not in self.order:
+            if first:
+                self.lowest -= 1
+                self.order[node] = self.lowest
+            else:
+                self.highest += 1
+                self.order[node] = self.highest
+            self.successors[node] = []
+            self.predecessors[node] = []
+
+    def search(self, start, edges, in_region):
+        """Iterative DFS from start along edges, through the nodes satisfying in_region."""
+        visited = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for neighbor in edges[node]:
+                if neighbor not in visited and in_region(self.order[neighbor]):
+                    visited.add(neighbor)
+                    stack.append(neighbor)
+        return visited
+
+    def creates_cycle(self, lhs, rhs):
+        """Returns whether adding the edge lhs -> rhs would close a cycle."""
+        if lhs == rhs:
             return True
+        if lhs not in self.order or rhs not in self.order:
+            return False
+        upper_bound = self.order[lhs]
+        if self.order[rhs] > upper_bound:
+            return False
+        return lhs in self.search(
+            rhs, self.successors, lambda position: position <= upper_bound
+        )
 
-    rec_stack.remove(node)
-    return False
-
-
-def has_cycle(graph):
-    visited = set()
-    rec_stack = set()
-
-    for node in list(graph.keys()):
-        if node not in visited:
-            if has_cycle_util(graph, node, visited, rec_stack):
-                return True
+    def add_edge(self, lhs, rhs):
+        """Adds the edge lhs -> rhs, which must not close a cycle."""
+        # New concepts are placed so that the edge needs no reordering
+        self.add_node(lhs, first=True)
+        self.add_node(rhs)
+        lower_bound = self.order[rhs]
+        upper_bound = self.order[lhs]
+        if lower_bound <= upper_bound:
+            forward = self.search(
+                rhs, self.successors, lambda position: position < upper_bound
+            )
+            backward = self.search(
+                lhs, self.predecessors, lambda position: position > lower_bound
+            )
+            if not forward.isdisjoint(backward):
+                raise ValueError(f"Edge {lhs} -> {rhs} closes a cycle")
+            # Reassign the affected positions: the LHS region first, then the RHS one
+            affected = sorted(backward, key=self.order.get) + sorted(
+                forward, key=self.order.get
+            )
+            positions = sorted(self.order[node] for node in affected)
+            for node, position in zip(affected, positions):
+                self.order[node] = position
+        self.successors[lhs].append(rhs)
+        self.predecessors[rhs].append(lhs)
 
-    return False
+    def add_axiom(self, axiom):
+        self.add_edge(axiom.LHS_concept, axiom.RHS_concept)
 
 
-def concept_assertion_constrain_check(
-    generated_abox_assertion, generated_abox_assertions
-):
+def concept_assertion_constrain_check(generated_abox_assertion, negated_concepts):
     """
     Checks whether a generated ABox assertion is valid according to some rules.
+    negated_concepts maps each individual to the canonical negations of the concepts
+    already asserted for it.
     """
     concept = generated_abox_assertion.concept
     individual = generated_abox_assertion.individual
@@ -429,7 +621,7 @@ def concept_assertion_constrain_check(
         return False
 
     # Check if the negated concept is in the generated ABox
-    if ConceptAssertion(alcq_negate(concept), individual) in generated_abox_assertions:
+    if canonicalize(concept) in negated_concepts.get(individual, ()):
         return False
 
     return True
@@ -533,12 +725,19 @@ def alcq_negate(concept):
     concept: The ALCQ concept to negate.
 
     Returns:
-    A new ALCQ concept that represents the negation of the input.
+    The ALCQ concept that represents the negation of the input. It is computed once per
+    concept and linked to it both ways, so negating it again returns the input. A
+    "!= n" negation is not linked back, since opposite_restriction does not support
+    it, so negating it still raises ValueError.
 
     Raises:
     TypeError: If the concept is not an instance of a recognized ALCQ concept type.
+    ValueError: If the concept is a restriction opposite_restriction does not support.
     """
-    negated_concept = None
+    negated_concept = concept.negation
+    if negated_concept is not None:
+        return negated_concept
+
     if isinstance(concept, AtomicConcept):
         if concept.concept_name == "⊤":
             negated_concept = AtomicConcept(concept.polarity, "⊥")
@@ -568,10 +767,115 @@ def alcq_negate(concept):
             alcq_negate(concept.lhs_concept),
             opposite_connective(concept.relationship),
             alcq_negate(concept.rhs_concept),
-            concept.atomic_in_lhs,
-            concept.atomic_in_rhs,
         )
     else:
         raise TypeError(f"Unexpected concept type: {type(concept)}")
 
+    concept.link_negation(
+        negated_concept,
+        involution=not (
+            isinstance(negated_concept, RestrictionConcept)
+            and negated_concept.restriction.startswith("!=")
+        ),
+    )
     return negated_concept
+
+
+def junction_operands(concept, connective):
+    """Yields the operands of a (possibly nested) junction of the given connective."""
+    stack = [concept]
+    while stack:
+        concept = stack.pop()
+        if isinstance(concept, JunctionConcept) and concept.relationship == connective:
+            stack.append(concept.rhs_concept)
+            stack.append(concept.lhs_concept)
+        else:
+            yield concept
+
+
+def canonicalize(concept):
+    """
+    Returns the canonical form of an ALCQ concept, so that semantically equal
+    variants of a concept share the same canonical form. It is computed once per
+    concept, and kept on it rather than in a cache, so that it does not keep the
+    concept alive.
+    """
+    canonical = concept._canonical
+    if canonical is None:
+        canonical = canonical_form(concept)
+        concept.link_canonical(canonical)
+    return canonical
+
+
+def canonical_form(concept):
+    """
+    Computes the canonical form of an ALCQ concept, for canonicalize.
+
+    The canonical form is in negation normal form with only positive ⊤ and ⊥,
+    strict cardinalities are made non-strict (> n is >= n+1, < n is <= n-1,
+    >= 1 is ∃ and <= 0 is ∀ over the negated filler) and nested ⊓/⊔ junctions
+    are flattened, their operands deduplicated and sorted, with ⊤ and ⊥ absorbed,
+    and then rebuilt right-nested.
+    """
+    if isinstance(concept, AtomicConcept):
+        if concept.polarity == "¬" and concept.concept_name in {"⊤", "⊥"}:
+            return AtomicConcept("+", "⊥" if concept.concept_name == "⊤" else "⊤")
+        return concept
+
+    if isinstance(concept, RestrictionConcept):
+        restriction = concept.restriction
+        filler = concept.concept
+        if restriction not in QUANTIFIERS:
+            quantifier, quantity = restriction.split()
+            quantity = int(quantity)
+            if quantifier == ">":
+                quantifier, quantity = ">=", quantity + 1
+            elif quantifier == "<":
+                quantifier, quantity = "<=", quantity - 1
+            if quantifier == ">=" and quantity == 1:
+                restriction = "∃"
+            elif quantifier == "<=" and quantity == 0:
+                restriction, filler = "∀", alcq_negate(filler)
+            else:
+                restriction = f"{quantifier} {quantity}"
+        return RestrictionConcept(restriction, concept.role_name, canonicalize(filler))
+
+    if isinstance(concept, JunctionConcept):
+        connective = concept.relationship
+        unit, zero = ("⊤", "⊥") if connective == "⊓" else ("⊥", "⊤")
+        operands = dict()
+        for operand in junction_operands(concept, connective):
+            for canonical_operand in junction_operands(
+                canonicalize(operand), connective
+            ):
+                operands[repr(canonical_operand)] = canonical_operand
+
+        if repr(AtomicConcept("+", zero)) in operands:
+            return AtomicConcept("+", zero)
+        operands.pop(repr(AtomicConcept("+", unit)), None)
+        if not operands:
+            return AtomicConcept("+", unit)
+
+        operands = [operands[key] for key in sorted(operands)]
+        canonical_concept = operands.pop()
+        for operand in reversed(operands):
+            canonical_concept = JunctionConcept(operand, connective, canonical_concept)
+        return canonical_concept
+
+    raise TypeError(f"Unexpected concept type: {type(concept)}")
+
+
+def canonical_key(statement):
+    """
+    Returns a hashable key shared by all semantically duplicate variants of an
+    ABox assertion or TBox axiom, i.e. the statement over canonical concepts.
+    """
+    if isinstance(statement, ConceptAssertion):
+        return ConceptAssertion(canonicalize(statement.concept), statement.individual)
+    if isinstance(statement, TBoxAxiom):
+        lhs_concept = canonicalize(statement.LHS_concept)
+        rhs_concept = canonicalize(statement.RHS_concept)
+        if statement.Relationship == "≡" and repr(rhs_concept) < repr(lhs_concept):
+            lhs_concept, rhs_concept = rhs_concept, lhs_concept
+        return TBoxAxiom(lhs_concept, statement.Relationship, rhs_concept)
+    return statement